@@ -0,0 +1,182 @@
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+# The stage modules import the config as Aggregate_data.config, so the root of the repository must be importable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ENRICHMENT_STEPS = {
+    'format_debt_in_america_datasets': ('handle_debt_in_america', 'format_debt_in_america_datasets'),
+    'format_census_deluxe_business_dataset': ('census_deluxe_business', 'format_census_deluxe_business_dataset'),
+    'format_federal_reserve_bank_philadelphia_dataset': ('federal_reserve_bank_philadelphia',
+                                                         'format_federal_reserve_bank_philadelphia_dataset'),
+}
+
+
+def load_environment(env_file: str):
+    # The variables of the environment take precedence over .env, so the stages read the synthetic sources
+    with open(env_file, 'r') as f:
+        for line in f:
+            key, value = line.rstrip('\n').split('=', 1)
+            os.environ[key] = value
+
+
+def time_helper(name: str, rows: int, function: Callable, repeat: int = 3) -> dict:
+    # We keep the best of a few repetitions, the slower ones measure noise of the machine
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return {'helper': name, 'rows': rows, 'seconds': round(best, 4), 'rows_per_second': round(rows / best)}
+
+
+def benchmark_helpers(rows: int, directory: str) -> List[dict]:
+    """
+    Description: Times the helpers of reusable_functions that run on whole columns of the biggest dataframes
+    :param rows: The number of rows of the fake column
+    :param directory: Where the pickle files are written
+    :return: The timing of each helper
+    """
+    import normalization as nz
+    import reusable_functions as rf
+    from storage_backends import BACKENDS
+    from Aggregate_data.config.__init__ import Config
+
+    rng = np.random.default_rng(0)
+    numbers = pd.Series(rng.integers(1000000000, 9999999999, rows)).astype(str)
+    reference_ids = numbers.str[:5] + '-' + numbers.str[5:] + '-' + pd.Series(rng.choice(['A', 'B'], rows))
+    df = pd.DataFrame({'DM Reference ID': numbers.where(rng.random(rows) < 0.9, numbers.str[:9])})
+    # A wide frame like the ones the stages exchange, with a numeric block, text and the int64 keys of the leads
+    wide_df = pd.DataFrame(rng.random((rows, 30)), columns=[f'feature_{i}' for i in range(30)])
+    wide_df['DM Reference ID'] = reference_ids
+    wide_df['UUID'] = rng.integers(-2 ** 63, 2 ** 63 - 1, rows, dtype=np.int64)
+
+    purls = 'www.pdoffer.com/Sharon' + numbers.str[:5]
+    phones = pd.Series(rng.integers(100000000, 19999999999, rows)).astype(str)
+
+    results = [
+        time_helper('keep_number', rows, lambda: reference_ids.apply(lambda x: rf.keep_number(x))),
+        time_helper('nz.digits_only', rows, lambda: nz.digits_only(reference_ids)),
+        time_helper('keep_letters', rows, lambda: reference_ids.apply(lambda x: rf.keep_letters(x))),
+        time_helper('nz.letters_only', rows, lambda: nz.letters_only(reference_ids)),
+        time_helper('nz.mail_wave_number', rows, lambda: nz.mail_wave_number(reference_ids)),
+        time_helper('nz.purl_reference_id', rows, lambda: nz.purl_reference_id(purls)),
+        time_helper('nz.trim_and_pad_phone_number', rows, lambda: nz.trim_and_pad_phone_number(phones)),
+        time_helper('check_number_of_digits', rows, lambda: rf.check_number_of_digits(df)),
+    ]
+    for storage_format in BACKENDS:
+        conf = Config(debug_mode=True, path_to_store_pickle_files=os.path.join(directory, 'Benchmark_pickle_files'),
+                      intermediate_storage_format=storage_format)
+        results += [
+            time_helper(f'store_df_in_pickle_format[{storage_format}]', rows,
+                        lambda: rf.store_df_in_pickle_format(conf, benchmark_df=wide_df)),
+            time_helper(f'read_df_from_pickle_format[{storage_format}]', rows,
+                        lambda: rf.read_df_from_pickle_format(conf, 'benchmark_df')),
+            time_helper(f'read_df_from_pickle_format[{storage_format}, 2 columns]', rows,
+                        lambda: rf.read_df_from_pickle_format(conf, 'benchmark_df', ['feature_0', 'UUID'])),
+        ]
+    return results
+
+
+def benchmark_stages(leads: int) -> List[dict]:
+    """
+    Description: Runs every stage of the pipeline and every feature enrichment step once, with telemetry, against the
+    sources the environment points to.
+    :param leads: The number of leads of the sources, used to compute the throughput
+    :return: The telemetry of each stage with its throughput
+    """
+    import importlib
+    import pipeline
+    import telemetry
+    from Aggregate_data.config.__init__ import Config
+
+    conf = Config(debug_mode=True)
+    logger = logging.getLogger()
+
+    results = []
+    for stage in pipeline.STAGES:
+        results.append(pipeline.run_stage(stage, conf, logger))
+
+    # The enrichment steps do not depend on each other, so one that fails does not stop the others from being measured
+    for name, (module_name, function_name) in ENRICHMENT_STEPS.items():
+        step_telemetry = telemetry.StageTelemetry(name)
+        try:
+            function = getattr(importlib.import_module(module_name), function_name)
+            with step_telemetry:
+                features_df, _ = function(logger)
+                telemetry.record_output(features_df)
+        except Exception as e:
+            step_telemetry.metrics['status'] = 'failed'
+            logger.error(f"{name} failed: {e}")
+        results.append(step_telemetry.metrics)
+
+    for result in results:
+        wall_time = result.get('wall_time_seconds')
+        result['leads_per_second'] = round(leads / wall_time) if wall_time else None
+        result['rows_in_per_second'] = round(result['rows_in'] / wall_time) if wall_time else None
+    return results
+
+
+def benchmark_scale(directory: str, leads: int, seed: int) -> dict:
+    # Every stage module builds ConfigUtils.conf when it is imported, so each scale runs in a fresh process
+    data_directory = os.path.join(directory, f'{leads}_leads')
+    env_file = os.path.join(data_directory, 'synthetic.env')
+    if not os.path.exists(env_file):
+        import synthetic_data_generator as sdg
+        start = time.perf_counter()
+        sdg.generate_synthetic_sources(data_directory, leads, seed)
+        print(f"Generated the sources of {leads} leads in {time.perf_counter() - start:.1f}s")
+
+    result_file = os.path.join(data_directory, 'benchmark.json')
+    subprocess.run([sys.executable, os.path.abspath(__file__), '--child', data_directory, '--leads', str(leads)],
+                   check=True)
+    with open(result_file, 'r') as f:
+        return json.load(f)
+
+
+def print_results(results: Dict[int, dict]):
+    for leads, result in results.items():
+        print(f"\n{leads} leads")
+        print(f"{'stage':<55}{'status':>8}{'wall s':>10}{'cpu s':>10}{'peak MB':>10}{'leads/s':>12}")
+        for stage in result['stages']:
+            print(f"{stage['stage']:<55}{stage['status']:>8}{str(stage.get('wall_time_seconds')):>10}"
+                  f"{str(stage.get('cpu_time_seconds')):>10}{str(stage.get('peak_rss_mb')):>10}"
+                  f"{str(stage['leads_per_second']):>12}")
+        print(f"{'helper':<63}{'seconds':>10}{'rows/s':>22}")
+        for helper in result['helpers']:
+            print(f"{helper['helper']:<63}{helper['seconds']:>10}{helper['rows_per_second']:>22}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the stages of the pipeline on synthetic sources')
+    parser.add_argument('--scales', type=int, nargs='+', default=[10000],
+                        help='The numbers of leads to benchmark (e.g. 10000 1000000 10000000)')
+    parser.add_argument('--directory', default='../Datasets/Synthetic', help='Where the synthetic sources are stored')
+    parser.add_argument('--output', default='../Datasets/Synthetic/benchmark_report.json')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--leads', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        logging.basicConfig(level=logging.WARNING)
+        load_environment(os.path.join(args.child, 'synthetic.env'))
+        child_result = {'leads': args.leads, 'stages': benchmark_stages(args.leads),
+                        'helpers': benchmark_helpers(args.leads, args.child)}
+        with open(os.path.join(args.child, 'benchmark.json'), 'w') as result_file:
+            json.dump(child_result, result_file, indent=2)
+    else:
+        scale_results = {leads: benchmark_scale(args.directory, leads, args.seed) for leads in args.scales}
+        with open(args.output, 'w') as report_file:
+            json.dump(list(scale_results.values()), report_file, indent=2)
+        print_results(scale_results)
@@ -0,0 +1,186 @@
+import re
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+import composite_keys as ck
+import reusable_functions as rf
+import csv_schemas
+from incremental_store import IncrementalStore
+from Aggregate_data.config.__init__ import Config
+from Aggregate_data.config.config_utils import ConfigUtils
+from logger import Logger
+
+# The prefix of the call activity features in the final dataset
+FEATURE_PREFIX = 'input_feature_pd_call_activity_'
+
+# The columns that identify a call of the final call center table
+CALL_COLUMNS = ['Date', 'Queue', 'Trunk', 'Caller ID', 'Call Time', 'Exit Reason', 'CRM Status']
+
+# How every activity column of two sets of calls is combined. The exit reason counts (Exit_...) are summed.
+FOLD_FUNCTIONS = {'Total_calls': 'sum', 'Inbound_calls': 'sum', 'Outbound_calls': 'sum', 'Queue_calls': 'sum',
+                  'Total_call_seconds': 'sum', 'Max_call_seconds': 'max', 'First_contact': 'min',
+                  'Last_contact': 'max'}
+
+# The file (stored in CALL_ACTIVITY_PATH) that keeps the frames of the current activity
+MANIFEST_NAME = 'call_activity_manifest.json'
+
+# The bucket of the exit reasons that are not in CALL_ACTIVITY_EXIT_REASONS
+OTHER_EXIT_REASON = 'Other'
+
+
+def exit_reason_column(reason: str) -> str:
+    # 'Transferred' to Exit_Transferred, 'No Answer' to Exit_No_Answer
+    return 'Exit_' + re.sub(r'\W+', '_', str(reason)).strip('_')
+
+
+def exit_reasons_from_setting(setting: str) -> List[str]:
+    # CALL_ACTIVITY_EXIT_REASONS is a comma separated list (e.g. Answered,Abandoned,Voicemail)
+    return [reason.strip() for reason in setting.split(',') if reason.strip()]
+
+
+def exit_reason_counts(exit_reason: pd.Series, exit_reasons: List[str]) -> pd.DataFrame:
+    """
+    Description: One count column for every configured exit reason and one for all the others (Exit_Other), so the
+    features of the final dataset are the same whatever reasons the current reports contain. A call without an exit
+    reason is not counted in any of them.
+    :param exit_reason: The Exit Reason of every call
+    :param exit_reasons: The configured exit reasons
+    :return: The counts of every call (0 or 1), in the order of exit_reasons and then Exit_Other
+    """
+    codes = pd.Categorical(exit_reason.astype(object), categories=exit_reasons).codes.astype(np.int64)
+    # A reason that is not configured has the code -1 like a missing one, it goes to the last column
+    codes[(codes == -1) & exit_reason.notna().to_numpy()] = len(exit_reasons)
+    counts = np.zeros((len(codes), len(exit_reasons) + 1), dtype=np.int64)
+    counted = codes >= 0
+    counts[np.flatnonzero(counted), codes[counted]] = 1
+    columns = [exit_reason_column(reason) for reason in exit_reasons + [OTHER_EXIT_REASON]]
+    return pd.DataFrame(counts, columns=columns, index=exit_reason.index)
+
+
+def call_duration_seconds(call_time: pd.Series) -> np.ndarray:
+    # The Call Time of the reports is a duration (00:12:00), a value that can not be parsed is NaN. The reports repeat
+    # the same durations, so every distinct value is parsed once.
+    codes, uniques = pd.factorize(call_time.astype(str))
+    return pd.to_timedelta(pd.Series(uniques), errors='coerce').dt.total_seconds().to_numpy()[codes]
+
+
+def queue_contains(queue: pd.Series, pattern: str) -> np.ndarray:
+    # Whether the Queue of every call contains the pattern, ignoring the case. Every distinct queue is checked once.
+    codes, uniques = pd.factorize(queue.fillna('').astype(str))
+    return pd.Series(uniques).str.contains(pattern, case=False).to_numpy(dtype=np.int64)[codes]
+
+
+def fold_activity(activity: pd.DataFrame) -> pd.DataFrame:
+    """
+    Description: Combines the rows of every phone into one with FOLD_FUNCTIONS, in a single grouped pass. Sums, maxima
+    and minima can be combined again, so the activity of two sets of calls is the fold of their activities.
+    :param activity: Activity rows with a Phone column
+    :return: The activity of every phone, sorted by the phone
+    """
+    aggregations = {column: FOLD_FUNCTIONS.get(column, 'sum') for column in activity.columns if column != 'Phone'}
+    activity = activity.groupby('Phone', sort=True).agg(aggregations).reset_index()
+    counts = [column for column, function in aggregations.items()
+              if function == 'sum' and column != 'Total_call_seconds']
+    activity[counts] = activity[counts].astype(np.int64)
+    # The exit reason columns follow the fixed ones, in the order of CALL_ACTIVITY_EXIT_REASONS
+    exit_columns = [column for column in activity.columns if column not in FOLD_FUNCTIONS and column != 'Phone']
+    return activity[['Phone'] + list(FOLD_FUNCTIONS) + exit_columns]
+
+
+def aggregate_call_activity(calls: pd.DataFrame, exit_reasons: List[str]) -> pd.DataFrame:
+    """
+    Description: The call activity of every phone of the call center table: the number of calls, of inbound, outbound
+    and queue calls, the total and the longest duration, the first and the last contact and the number of calls of
+    every configured exit reason (see exit_reason_counts). The direction comes from the Queue column, which holds the
+    queue of a queue call (e.g. Sales_Inbound_Queue) and the direction of the other calls (e.g. Sales_Outbound), so a
+    queue call is also inbound.
+    :param calls: The calls, with the columns of the final call center table
+    :param exit_reasons: The exit reasons that get their own count column
+    :return: The activity of every phone, with a Phone column and one row per phone
+    """
+    seconds = call_duration_seconds(calls['Call Time'])
+    date = pd.to_datetime(calls['Date'], errors='coerce').to_numpy()
+    activity = pd.DataFrame({
+        'Phone': calls['Caller ID'].astype(str).to_numpy(),
+        'Total_calls': np.ones(len(calls), dtype=np.int64),
+        'Inbound_calls': queue_contains(calls['Queue'], 'inbound'),
+        'Outbound_calls': queue_contains(calls['Queue'], 'outbound'),
+        'Queue_calls': queue_contains(calls['Queue'], 'queue'),
+        'Total_call_seconds': seconds,
+        'Max_call_seconds': seconds,
+        'First_contact': date,
+        'Last_contact': date,
+    })
+    counts = exit_reason_counts(calls['Exit Reason'], exit_reasons)
+    return fold_activity(pd.concat([activity, counts.set_axis(activity.index)], axis=1))
+
+
+def call_keys(calls: pd.DataFrame) -> np.ndarray:
+    # A key of every call, the same in every run. Identical calls are told apart by their occurrence (see
+    # ck.stable_unique_keys), so a repeated call is counted as many times as it appears.
+    return ck.stable_unique_keys(calls[CALL_COLUMNS].astype(str), CALL_COLUMNS).view(np.uint64)
+
+
+class CallActivity(IncrementalStore):
+    """
+    Keeps the call activity of the final call center table in CALL_ACTIVITY_PATH, with the hash of every call it
+    contains, so that a run only aggregates the calls that were added to the table since the last one and folds them
+    into the stored activity. The table is rebuilt from the reports on every run, so when a call of the stored activity
+    is no longer in the table (e.g. a report was replaced) the activity is aggregated again from all the calls.
+    """
+
+    def __init__(self, directory: str, exit_reasons: List[str]):
+        # The stored activity is aggregated again when the configured exit reasons change
+        super().__init__(directory, MANIFEST_NAME, ('call_activity', 'incremental_store', 'composite_keys'),
+                         identity=','.join(exit_reasons))
+        self.exit_reasons = exit_reasons
+
+    def update(self, calls: pd.DataFrame) -> pd.DataFrame:
+        """
+        Description: Folds the calls that are not part of the stored activity into it
+        :param calls: The calls of the final call center table
+        :return: The activity of every phone of the table
+        """
+        keys = call_keys(calls)
+        rebuild = self.start([])
+        if not rebuild:
+            folded_keys = self.read_frame('calls')['call'].to_numpy(dtype=np.uint64)
+            rebuild = not np.isin(folded_keys, keys).all()
+
+        if rebuild:
+            activity, folded_keys = aggregate_call_activity(calls, self.exit_reasons), keys
+        else:
+            new_calls = ~np.isin(keys, folded_keys)
+            if not new_calls.any():
+                return self.read_frame('activity')
+            activity = fold_activity(pd.concat([self.read_frame('activity'),
+                                                aggregate_call_activity(calls[new_calls], self.exit_reasons)],
+                                               ignore_index=True))
+            folded_keys = np.concatenate([folded_keys, keys[new_calls]])
+        self.write_frames({'activity': activity, 'calls': pd.DataFrame({'call': folded_keys})})
+        return activity
+
+
+def aggregate_call_center_activity(conf: Config, logger: Logger):
+    """
+    Description: Stores the call activity of every phone of the final call center table. With CALL_ACTIVITY_INCREMENTAL
+    only the calls added since the last run are aggregated. The exit reasons are counted over
+    CALL_ACTIVITY_EXIT_REASONS, which has to be set, and an Exit_Other bucket.
+    :param conf: conf = Config(debug_mode=True)
+    :param logger: The logger of the procedure
+    """
+    calls = rf.read_csv_with_schema(conf, conf.path_final_call_center, csv_schemas.CALL_CENTER)
+    exit_reasons = exit_reasons_from_setting(conf.call_activity_exit_reasons)
+    if not exit_reasons:
+        # The exit reasons are features of the model, so they are chosen once and not taken from every run's reports
+        found = sorted(calls['Exit Reason'].dropna().astype(str).unique())
+        raise ValueError(f"CALL_ACTIVITY_EXIT_REASONS is not set. The exit reasons of the call center table are: "
+                         f"{','.join(found)}")
+    if conf.call_activity_incremental:
+        activity = CallActivity(conf.call_activity_path, exit_reasons).update(calls)
+    else:
+        activity = aggregate_call_activity(calls, exit_reasons)
+    logger.info(f"Aggregated {len(calls)} calls into the activity of {len(activity)} phones")
+    rf.store_df_in_pickle_format(ConfigUtils.conf, call_activity=activity)
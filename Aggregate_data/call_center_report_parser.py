@@ -0,0 +1,128 @@
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.cell.cell import ERROR_CODES
+from pandas._libs.parsers import STR_NA_VALUES
+
+# The columns we keep from a "Full Distribution Report"
+REPORT_COLUMNS = ['Date', 'Queue', 'Trunk', 'Caller ID', 'Call Time', 'Exit Reason', 'CRM Status']
+CALLER_ID = REPORT_COLUMNS.index('Caller ID')
+
+# Each "Details - ..." section of an agent sheet has ten columns:
+#   Queue Calls:  #, Date, Queue, Trunk, Caller ID, Agent, Wait, Call Time, Exit Reason, CRM Status
+#   The others:   #, Date, Direction, Trunk, Source, Destination, Caller ID, Call Time, Disposition, CRM Status
+# For each section we keep the positions of REPORT_COLUMNS within these ten. The caller of an inbound or an internal
+# call is in Source and the caller of an outbound call (i.e. the lead) is in Destination.
+SECTION_COLUMNS = {
+    'Details - Queue Calls': (1, 2, 3, 4, 7, 8, 9),
+    'Details - Inbound Calls': (1, 2, 3, 4, 7, 8, 9),
+    'Details - Outbound Calls': (1, 2, 3, 5, 7, 8, 9),
+    'Details - Internal Calls': (1, 2, 3, 4, 7, 8, 9),
+}
+
+# The sheets of a report that do not belong to an agent
+NON_AGENT_SHEETS = ['Cover Sheet', 'Agent Performance']
+
+
+def convert_cell(value):
+    """
+    Description: Converts a cell the way pd.read_excel does for a column that mixes strings and numbers, so the parsed
+    report is the same as the one we used to get from pandas: a whole number stored as a float becomes an int, and an
+    empty cell, an error (#DIV/0!) or a string such as 'N/A' becomes NaN
+    :param value: The value of the cell, as openpyxl gives it
+    :return: The converted value
+    """
+    if value is None:
+        return np.nan
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and (value in STR_NA_VALUES or value in ERROR_CODES):
+        return np.nan
+    return value
+
+
+def iter_sheet_rows(worksheet) -> Iterator[tuple]:
+    # A read-only sheet trusts the dimensions written in the file, which some exports get wrong
+    worksheet.reset_dimensions()
+    return worksheet.iter_rows(values_only=True)
+
+
+def parse_agent_sheet(rows: Iterator[tuple]) -> List[tuple]:
+    """
+    Description: Walks the rows of an agent sheet once. The rows before "Details - Queue Calls" (the agent performance
+    table) are skipped, the title row of each section tells which columns the following rows have, and the header rows
+    ('#' in the first column) and the empty rows are skipped.
+    :param rows: The values of the rows of the sheet
+    :return: A tuple with the REPORT_COLUMNS of every call of the agent
+    """
+    records = []
+    columns: Optional[Tuple[int, ...]] = None
+    positions: List[int] = []
+    for row in rows:
+        first = row[0] if row else None
+        if first in SECTION_COLUMNS:
+            columns = SECTION_COLUMNS[first]
+            continue
+        if columns is None or all(value is None for value in row):
+            continue
+        if first == '#':
+            # The ten columns of the section are the ones with a header, wherever the export placed them
+            positions = [i for i, value in enumerate(row) if value is not None]
+            continue
+        if len(positions) != 10:
+            raise ValueError(f"Expected a header row with 10 columns before the calls, found {len(positions)}")
+        record = tuple(convert_cell(row[positions[i]]) if positions[i] < len(row) else np.nan for i in columns)
+        # An internal call (a 3-digit Caller ID, or none at all, which final_preprocessing reads as 'nan') is dropped
+        # here instead of after the reports are concatenated
+        if len(str(record[CALLER_ID])) != 3:
+            records.append(record)
+    return records
+
+
+def records_to_frame(records: List[tuple]) -> pd.DataFrame:
+    # The columns stay object, like the sheets pandas gave us, so that e.g. the Caller ID keeps its ints and strings
+    return pd.DataFrame(records, columns=REPORT_COLUMNS, dtype=object)
+
+
+def parse_full_distribution_report(file: str) -> pd.DataFrame:
+    """
+    Description: Reads the calls of every agent sheet of a "Full Distribution Report" in a single pass over a read-only
+    workbook, so only the calls we keep are held in memory and not the sheets
+    :param file: The path of the report
+    :return: A dataframe with the REPORT_COLUMNS, in the order of the sheets and of the calls
+    """
+    workbook = load_workbook(file, read_only=True, data_only=True, keep_links=False)
+    try:
+        records = []
+        for worksheet in workbook.worksheets:
+            if worksheet.title not in NON_AGENT_SHEETS:
+                records.extend(parse_agent_sheet(iter_sheet_rows(worksheet)))
+    finally:
+        workbook.close()
+    return records_to_frame(records)
+
+
+def list_agent_sheets(file: str) -> List[str]:
+    # The titles of the agent sheets of a report, in the order parse_full_distribution_report reads them
+    workbook = load_workbook(file, read_only=True, data_only=True, keep_links=False)
+    try:
+        return [title for title in workbook.sheetnames if title not in NON_AGENT_SHEETS]
+    finally:
+        workbook.close()
+
+
+def parse_report_sheet(file: str, sheet: str) -> pd.DataFrame:
+    """
+    Description: Reads the calls of a single agent sheet of a report, the unit of work when the sheets are parsed in a
+    process pool. Concatenating the sheets of list_agent_sheets in order gives parse_full_distribution_report.
+    :param file: The path of the report
+    :param sheet: The title of the agent sheet
+    :return: A dataframe with the REPORT_COLUMNS of the calls of the agent
+    """
+    workbook = load_workbook(file, read_only=True, data_only=True, keep_links=False)
+    try:
+        return records_to_frame(parse_agent_sheet(iter_sheet_rows(workbook[sheet])))
+    finally:
+        workbook.close()
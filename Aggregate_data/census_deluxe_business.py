@@ -1,5 +1,6 @@
 import pandas as pd
 import reusable_functions as rf
+import csv_schemas
 import handle_debt_in_america as hdia
 from Aggregate_data.config.config_utils import ConfigUtils
 from logger import Logger
@@ -19,8 +20,7 @@ def merge_external_data(census_2010: pd.DataFrame, census_acs_2017_2021: pd.Data
 
 
 def ingest_census_zip_codes_place_fips() -> pd.DataFrame:
-    with open('../Datasets/3rd_Party_Datasets/zip-codes-database-DELUXE-BUSINESS-csv/zip-codes-database-PLACE-FIPS.csv',
-              'r', encoding='ISO-8859-1') as f:
+    with open(ConfigUtils.conf.path_to_store_census_place_fips_df, 'r', encoding='ISO-8859-1') as f:
         census_place_fips = pd.read_csv(f, encoding='utf-8')
 
     census_place_fips = rf.remove_all_columns_of_object_type(census_place_fips)
@@ -43,19 +43,18 @@ def ingest_census_zip_codes_db_deluxe_business() -> pd.DataFrame:
     # Group by ZipCode and calculate mean for each group
     census_deluxe_means = census_deluxe.groupby('ZipCode').mean().reset_index()
 
-    census_deluxe_means['ZipCode'] = census_deluxe_means['ZipCode'].apply(lambda x: str(x).zfill(5))
+    census_deluxe_means['ZipCode'] = census_deluxe_means['ZipCode'].astype(str).str.zfill(5)
 
     census_deluxe_means.rename(columns={"ZipCode": "ZIPCODE"}, inplace=True)
     return census_deluxe_means
 
 
 def ingest_census_2017_2021() -> pd.DataFrame:
-    # The usecols parameter is used to specify a range of columns to be read from the CSV file. The range(524) specifies
-    # that only the first 524 columns should be read.
-    census_2017_2021 = rf.read_csv_file(ConfigUtils.conf.path_to_store_census_2017_2021_df,
-                                        header=1, usecols=range(524))
+    # Only the first 524 columns are read (see csv_schemas.CENSUS_2017_2021), in chunks of CSV_CHUNK_SIZE rows
+    census_2017_2021 = rf.read_csv_with_schema(ConfigUtils.conf, ConfigUtils.conf.path_to_store_census_2017_2021_df,
+                                               csv_schemas.CENSUS_2017_2021)
 
-    census_2017_2021['ZIPCODE'] = census_2017_2021['ZIPCODE'].apply(lambda x: str(x).zfill(5))
+    census_2017_2021['ZIPCODE'] = census_2017_2021['ZIPCODE'].astype(str).str.zfill(5)
 
     return census_2017_2021
 
@@ -63,7 +62,7 @@ def ingest_census_2017_2021() -> pd.DataFrame:
 def ingest_census_2010() -> pd.DataFrame:
     census_df_2010 = rf.read_csv_file(ConfigUtils.conf.path_to_store_census_2010_df)
 
-    census_df_2010['ZIPCode'] = census_df_2010['ZIPCode'].apply(lambda x: str(x).zfill(5))
+    census_df_2010['ZIPCode'] = census_df_2010['ZIPCode'].astype(str).str.zfill(5)
     census_df_2010.rename(columns={"ZIPCode": "ZIPCODE"}, inplace=True)
 
     return census_df_2010
@@ -1,5 +1,7 @@
 import pandas as pd
 import reusable_functions as rf
+import dataset_writer as dw
+import suppression_index as si
 from logger import Logger
 from typing import Tuple
 from Aggregate_data.config.config_utils import ConfigUtils
@@ -9,25 +11,16 @@ from Aggregate_data.config.__init__ import Config
 def write_to_csv_leads_that_need_to_be_excluded_from_our_dataset(df: pd.DataFrame, checker: bool, conf: Config):
     # if checker is True this means that our leads have a Reference ID
     if checker:
-        df.to_csv(conf.path_to_leads_with_id_that_need_to_be_excluded, sep=',',
-                  encoding='utf-8', index=False)
+        dw.write_csv(df, conf.path_to_leads_with_id_that_need_to_be_excluded)
     else:
-        df.to_csv(conf.path_to_leads_without_id_that_need_to_be_excluded, sep=',',
-                  encoding='utf-8', index=False)
+        dw.write_csv(df, conf.path_to_leads_without_id_that_need_to_be_excluded)
 
 
 def remove_prospects_with_reference_id(conf: Config, logger: Logger):
     initial_pdr_merged_df = rf.read_df_from_pickle_format(conf, 'initial_pdr_merged_df')
-    opt_out_prospects_with_reference_id = rf.read_df_from_pickle_format(conf, 'with_reference_id_df')
-    opt_out_prospects_with_reference_id.rename(columns={'Reference ID': 'DM Reference ID'}, inplace=True)
-    opt_out_prospects_with_reference_id['DM Reference ID'] = opt_out_prospects_with_reference_id['DM Reference ID']. \
-        apply(lambda x: rf.keep_number(x))
+    suppression_index = si.SuppressionIndex.read(conf, by=('reference_id',))
 
-    filtered_df = initial_pdr_merged_df[
-        ~initial_pdr_merged_df['DM Reference ID'].isin(opt_out_prospects_with_reference_id['DM Reference ID'])]
-
-    excluded_df = initial_pdr_merged_df[
-        initial_pdr_merged_df['DM Reference ID'].isin(opt_out_prospects_with_reference_id['DM Reference ID'])]
+    filtered_df, excluded_df = suppression_index.partition(initial_pdr_merged_df, by=('reference_id',))
 
     write_to_csv_leads_that_need_to_be_excluded_from_our_dataset(excluded_df, True, ConfigUtils.conf)
     rf.store_df_in_pickle_format(ConfigUtils.conf, pdr_merged_df=filtered_df)
@@ -35,46 +28,22 @@ def remove_prospects_with_reference_id(conf: Config, logger: Logger):
 
 def remove_prospects_without_reference_id(conf, logger: Logger):
     """
-     We are performing an inner join on the two dataframes, based on the four common columns. This will result in a new
-     dataframe that only contains the rows where the values of the four columns match in both original dataframes. You
-     can then drop these rows from one of the original dataframes to get the desired result.
+    Removes the prospects whose name, city and state match an opt-out without a Reference ID. The names are compared
+    stripped and in upper case, on the key set of the suppression index.
     :param conf: conf = Config(debug_mode=True)
     :param logger: A parameter passed for testing purposes
     :return: A dataframe that does not contain prospects that asked to be excluded
     """
-
-    opt_out_prospects_without_reference_id = rf.read_df_from_pickle_format(conf,
-                                                                           'without_reference_id_df')
+    suppression_index = si.SuppressionIndex.read(conf, by=('name',))
     initial_prospects_df = rf.read_df_from_pickle_format(conf, 'initial_prospects_df')
 
-    # perform an inner join based on the four common columns
-    merged = pd.merge(initial_prospects_df, opt_out_prospects_without_reference_id,
-                      on=['First Name', 'Last Name', 'City', 'State'], how='inner')
-
-    # We then use the isin() function to identify the matching rows in prospects_without_reference_id by comparing their
-    # values in the four common columns with those in merged. We convert the rows to tuples using apply(tuple,1) to
-    # allow for comparison, and use the ~ operator to invert the boolean mask that results from the comparison. Finally,
-    # we use the resulting boolean mask to select the non-matching rows in prospects_without_reference_id.
-    filtered_df = initial_prospects_df[~initial_prospects_df[
-        ['First Name', 'Last Name', 'City', 'State']].apply(tuple, 1).isin(merged[['First Name', 'Last Name', 'City',
-                                                                                   'State']].apply(tuple, 1))]
-    excluded_df = initial_prospects_df[initial_prospects_df[
-        ['First Name', 'Last Name', 'City', 'State']].apply(tuple, 1).isin(merged[['First Name', 'Last Name', 'City',
-                                                                                   'State']].apply(tuple, 1))]
+    filtered_df, excluded_df = suppression_index.partition(initial_prospects_df, by=('name',))
 
     write_to_csv_leads_that_need_to_be_excluded_from_our_dataset(excluded_df, False, ConfigUtils.conf)
 
     rf.store_df_in_pickle_format(ConfigUtils.conf, prospects_df=filtered_df)
 
 
-def convert_all_values_in_upper_case(df: pd.DataFrame) -> pd.DataFrame:
-    # convert all values in the "Address" column to uppercase
-    df[['Address', 'First Name', 'Last Name', 'City']] = df[['Address', 'First Name', 'Last Name', 'City']].applymap(
-        lambda x: x.upper() if isinstance(x, str) else x)
-
-    return df
-
-
 def split_into_2_dataframes(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Split the dataframe into two dataframes based on the Reference ID column by using the pandas.DataFrame.isnull
@@ -92,9 +61,12 @@ def split_into_2_dataframes(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFram
     return df1, df2
 
 
-def clear_opt_out_list():
+def build_suppression_index() -> si.SuppressionIndex:
     opt_out_prospects = rf.read_excel_files(ConfigUtils.conf.path_opt_out_list, 'Mail-OptOut Supression List')
     with_reference_id_df, without_reference_id_df = split_into_2_dataframes(opt_out_prospects)
-    without_reference_id_df = convert_all_values_in_upper_case(without_reference_id_df.copy())
-    rf.store_df_in_pickle_format(ConfigUtils.conf, with_reference_id_df=with_reference_id_df,
-                                 without_reference_id_df=without_reference_id_df)
+    return si.SuppressionIndex.from_opt_out_list(with_reference_id_df, without_reference_id_df)
+
+
+def clear_opt_out_list():
+    # The opt-out list is only used through its key sets, which are built once here
+    build_suppression_index().store(ConfigUtils.conf)
@@ -1,16 +1,14 @@
 import pandas as pd
 import os
 import glob
-import pickle
-import re
-
-
-def keep_number(x):
-    return "".join(re.sub("[^0-9]", "", str(x)))
+import composite_keys as ck
+import normalization as nz
+import reusable_functions as rf
+from Aggregate_data.config.__init__ import Config
 
 
 def clear_reference_id(df: pd.DataFrame) -> pd.DataFrame:
-    df['DM Reference ID'] = df['DM Reference ID'].apply(lambda x: keep_number(x))
+    df['DM Reference ID'] = nz.digits_only(df['DM Reference ID'])
     return df
 
 
@@ -23,9 +21,8 @@ def unzip_zipcode(pdr_file: pd.DataFrame) -> pd.DataFrame:
 
 
 def read_df_from_pickle_format():
-    with open('../Datasets/Output_datasets/Pickle_files/pdr_merged_df.pickle', 'rb') as f:
-        df = pickle.load(f)
-    return df
+    # The intermediate files are stored in the format of INTERMEDIATE_STORAGE_FORMAT
+    return rf.read_df_from_pickle_format(Config(debug_mode=True), 'pdr_merged_df')
 
 
 def merge_scored_prospects(df1, df2):
@@ -41,7 +38,7 @@ def merge_scored_prospects(df1, df2):
     merge_columns = ['First Name', 'Last Name', 'Debt Amount', 'Zip1', 'Zip2']
     # columns_to_keep_df2 = [col for col in df2.columns if col not in merge_columns and
     #                        col != ['mailing_date', 'Ranking', 'Decision']]
-    merged_df = df1.merge(df2, how='inner', left_on=merge_columns, right_on=merge_columns)
+    merged_df = ck.join_on_keys(df1, df2, merge_columns, how='inner')
 
     # Drop the duplicate columns (columns from df2 that are the same as in df1)
     # merged_df.drop(columns_to_keep_df2, axis=1, inplace=True)
@@ -101,9 +98,9 @@ if __name__ == "__main__":
     pdr_prospects.drop(['Lead Source', 'Direct Mail DID', 'DM PURL', 'gender', 'Mail_number'], axis=1, inplace=True)
     pdr_prospects_with_unzipped_zipcode = unzip_zipcode(pdr_prospects)
 
-    merged_df = pd.merge(ranked_prospects_more_info, pdr_prospects_with_unzipped_zipcode,
-                         on=['First Name', 'Last Name', 'Zip1', 'Zip2', 'Debt Amount', 'Address', 'City', 'State'],
-                         how='left')
+    merged_df = ck.join_on_keys(ranked_prospects_more_info, pdr_prospects_with_unzipped_zipcode,
+                                ['First Name', 'Last Name', 'Zip1', 'Zip2', 'Debt Amount', 'Address', 'City', 'State'],
+                                how='left')
     merged_df = merged_df.drop_duplicates(subset=merged_df.columns.difference(['DM Reference ID']))
     merged_df = clear_reference_id(merged_df)
 
@@ -0,0 +1,119 @@
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+# The largest mixed-radix key that fits in an int64
+MAX_KEY_SIZE = 2 ** 63 - 1
+
+
+def factorize_columns(columns: List[pd.Series]) -> np.ndarray:
+    """
+    Description: Encodes every distinct combination of values of the columns as an integer, with the same equality as
+    drop_duplicates and merge: NaN equals NaN and 5 equals 5.0. Each column is factorized once and the codes are
+    combined into a single int64, which is compressed again whenever it would overflow.
+    :param columns: Columns of the same length
+    :return: A code from 0 to (number of distinct combinations - 1) for every row
+    """
+    key = np.zeros(len(columns[0]), dtype=np.int64)
+    size = 1
+    for column in columns:
+        codes, uniques = pd.factorize(column, use_na_sentinel=False)
+        if size * max(len(uniques), 1) > MAX_KEY_SIZE:
+            key, key_uniques = pd.factorize(key)
+            size = len(key_uniques)
+        key = key * max(len(uniques), 1) + codes
+        size *= max(len(uniques), 1)
+    return pd.factorize(key)[0].astype(np.int64)
+
+
+def composite_key(df: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    # The integer code of the combination of columns of every row (see factorize_columns)
+    return factorize_columns([df[column] for column in columns])
+
+
+def hash_key(df: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    """
+    Description: A 64-bit hash of the combination of columns of every row. Unlike composite_key, the same values give
+    the same hash in every dataframe and every run, so the hashes can be stored and compared later. The hash depends on
+    the dtype (5 and '5' differ), so the columns must be normalized first.
+    :param df: The dataframe
+    :param columns: The columns of the key
+    :return: A uint64 hash for every row
+    """
+    return pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+
+
+def stable_unique_keys(df: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    """
+    Description: A distinct int64 key for every row that only depends on the values of the columns (see hash_key), so
+    the same row gets the same key in every run. Rows with the same values are told apart by their occurrence: the
+    first one keeps the hash of its values and the n-th one gets the hash of that hash and n.
+    :param df: The dataframe, with normalized columns
+    :param columns: The columns that identify a row
+    :return: An int64 key for every row
+    """
+    hashes = hash_key(df, columns)
+    occurrences = pd.Series(hashes).groupby(hashes, sort=False).cumcount().to_numpy()
+    repeated = occurrences > 0
+    if repeated.any():
+        hashes = hashes.copy()
+        hashes[repeated] = hash_key(pd.DataFrame({'hash': hashes[repeated], 'occurrence': occurrences[repeated]}),
+                                    ['hash', 'occurrence'])
+    return hashes.view(np.int64)
+
+
+def key_counts(keys: np.ndarray) -> np.ndarray:
+    # How many rows share the key of every row
+    return np.bincount(keys)[keys]
+
+
+def first_of_each_key(keys: np.ndarray, priority: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Description: Selects a single row for every key in one pass over the codes
+    :param keys: The codes of composite_key
+    :param priority: If given, the row with the highest priority is selected (e.g. the highest Mail_number), and rows
+    with the same priority are selected by their position. Without it, the first row of every key is selected.
+    :return: A boolean mask of the selected rows
+    """
+    if priority is None:
+        order = np.arange(len(keys))
+    else:
+        # lexsort sorts by the last array first and it is stable, so the position breaks the ties
+        order = np.lexsort((np.arange(len(keys)), -np.asarray(priority, dtype=np.float64), keys))
+    selected = np.zeros(len(keys), dtype=bool)
+    _, first_positions = np.unique(keys[order], return_index=True)
+    selected[order[first_positions]] = True
+    return selected
+
+
+def drop_duplicate_keys(df: pd.DataFrame, columns: List[str], priority: Optional[str] = None) -> pd.DataFrame:
+    """
+    Description: drop_duplicates(subset=columns, keep='first') on the integer key of the columns, optionally keeping the
+    row with the highest value of the priority column instead of the first one. The rows keep their order.
+    :param df: The dataframe
+    :param columns: The columns that identify a row
+    :param priority: A numeric column, the highest value wins
+    :return: The dataframe with a single row for every key
+    """
+    keys = composite_key(df, columns)
+    # A row without a priority (NaN) is kept only when its key has no other row
+    priorities = None if priority is None else df[priority].to_numpy(dtype=float, na_value=-np.inf)
+    return df[first_of_each_key(keys, priorities)]
+
+
+def join_on_keys(left: pd.DataFrame, right: pd.DataFrame, columns: List[str], how: str = 'inner') -> pd.DataFrame:
+    """
+    Description: pd.merge(left, right, on=columns, how=how) on a single integer key. The key columns of both sides are
+    encoded together, so the merge compares one int64 instead of every string column.
+    :param left: The left dataframe
+    :param right: The right dataframe
+    :param columns: The columns to join on, with the same names on both sides
+    :param how: 'inner' or 'left'
+    :return: The merged dataframe, with the same columns as pd.merge
+    """
+    keys = factorize_columns([pd.concat([left[column], right[column]], ignore_index=True) for column in columns])
+    key_column = '__composite_key__'
+    left = left.assign(**{key_column: keys[:len(left)]})
+    right = right.drop(columns=columns).assign(**{key_column: keys[len(left):]})
+    return pd.merge(left, right, on=key_column, how=how).drop(columns=[key_column])
@@ -21,7 +21,9 @@ class Config(BaseSettings):
     path_phone_20230308: str = Field(..., env='PATH_PHONE_20230308')
     path_status: str = Field(..., env='PATH_STATUS')
     path_status_description: str = Field(..., env='PATH_STATUS_DESCRIPTION')
+    path_status_taxonomy: str = Field('config/status_taxonomy.csv', env='PATH_STATUS_TAXONOMY')
     path_final_dataset: str = Field(..., env='PATH_FINAL_DATASET')
+    number_of_features: int = Field(0, env='NUMBER_OF_FEATURES')
     path_to_us_census_bureau_3rd_party_data: str = Field(..., env='PATH_TO_US_CENSUS_BUREAU_3RD_PARTY_DATA')
     path_debt_in_america_june_2022_auto: str = Field(..., env='PATH_DEBT_IN_AMERICA_JUNE_2022_AUTO')
     path_debt_in_america_june_2022_delinquency: str = Field(..., env='PATH_DEBT_IN_AMERICA_JUNE_2022_DELINQUENCY')
@@ -38,7 +40,38 @@ class Config(BaseSettings):
     path_to_store_census_2010_df: str = Field(..., env='PATH_TO_STORE_CENSUS_2010_DF')
     path_to_store_census_2017_2021_df: str = Field(..., env='PATH_TO_STORE_CENSUS_2017_2021_DF')
     path_to_store_census_deluxe_df: str = Field(..., env='PATH_TO_STORE_CENSUS_DELUXE_DF')
+    path_to_store_census_place_fips_df: str = Field(
+        '../Datasets/3rd_Party_Datasets/zip-codes-database-DELUXE-BUSINESS-csv/zip-codes-database-PLACE-FIPS.csv',
+        env='PATH_TO_STORE_CENSUS_PLACE_FIPS_DF')
+    path_to_store_duplicates_to_score: str = Field('../Datasets/Output_datasets/duplicates_to_score.csv',
+                                                   env='PATH_TO_STORE_DUPLICATES_TO_SCORE')
     path_to_store_pickle_files: str = Field(..., env='PATH_TO_STORE_PICKLE_FILES')
+    intermediate_storage_format: str = Field('feather', env='INTERMEDIATE_STORAGE_FORMAT')
+    intermediate_storage_compression: str = Field('', env='INTERMEDIATE_STORAGE_COMPRESSION')
+    excel_cache_path: str = Field('../Datasets/Output_datasets/Excel_cache', env='EXCEL_CACHE_PATH')
+    excel_cache_max_size_mb: int = Field(2048, env='EXCEL_CACHE_MAX_SIZE_MB')
+    csv_chunk_size: int = Field(200000, env='CSV_CHUNK_SIZE')
+    gender_lookup_path: str = Field('../Datasets/Output_datasets/gender_lookup.json', env='GENDER_LOOKUP_PATH')
+    gender_lookup_max_names: int = Field(100000, env='GENDER_LOOKUP_MAX_NAMES')
+    prospect_incremental: bool = Field(False, env='PROSPECT_INCREMENTAL')
+    prospect_base_path: str = Field('../Datasets/Output_datasets/Prospect_base', env='PROSPECT_BASE_PATH')
+    status_incremental: bool = Field(False, env='STATUS_INCREMENTAL')
+    status_snapshot_path: str = Field('../Datasets/Output_datasets/Status_snapshot', env='STATUS_SNAPSHOT_PATH')
+    call_center_workers: int = Field(1, env='CALL_CENTER_WORKERS')
+    call_activity_incremental: bool = Field(False, env='CALL_ACTIVITY_INCREMENTAL')
+    call_activity_exit_reasons: str = Field('', env='CALL_ACTIVITY_EXIT_REASONS')
+    call_activity_path: str = Field('../Datasets/Output_datasets/Call_activity', env='CALL_ACTIVITY_PATH')
+    feature_store_path: str = Field('../Datasets/Output_datasets/Feature_store', env='FEATURE_STORE_PATH')
+    final_dataset_partition_by: str = Field('', env='FINAL_DATASET_PARTITION_BY')
+    final_dataset_format: str = Field('csv', env='FINAL_DATASET_FORMAT')
+    output_writer_threads: int = Field(4, env='OUTPUT_WRITER_THREADS')
+    pipeline_force_full_run: bool = Field(False, env='PIPELINE_FORCE_FULL_RUN')
+    pipeline_workers: int = Field(1, env='PIPELINE_WORKERS')
+    pipeline_in_memory: bool = Field(False, env='PIPELINE_IN_MEMORY')
+    pipeline_checkpoint: bool = Field(True, env='PIPELINE_CHECKPOINT')
+    pipeline_trace_memory: bool = Field(False, env='PIPELINE_TRACE_MEMORY')
+    path_to_store_run_report: str = Field('', env='PATH_TO_STORE_RUN_REPORT')
+    path_to_previous_run_report: str = Field('', env='PATH_TO_PREVIOUS_RUN_REPORT')
 
     class Config:
         case_sensitive = False
@@ -0,0 +1,52 @@
+from typing import Callable, Dict, NamedTuple, Optional, Sequence, Tuple
+
+import pandas as pd
+
+
+class CsvSchema(NamedTuple):
+    """
+    How a CSV source is read by rf.read_csv_in_chunks:
+    columns: The columns to read, as the usecols of pd.read_csv (None for all of them)
+    dtype: The dtype of the columns we must not let pandas infer, the other columns are inferred for every chunk
+    header: The row that contains the column names
+    filters: Functions that take a chunk and return a boolean mask of the rows to keep. The rows they drop are never
+    concatenated, so a filter must not depend on the rows of the other chunks.
+    """
+    columns: Optional[Sequence] = None
+    dtype: Dict[str, object] = {}
+    header: int = 0
+    filters: Tuple[Callable[[pd.DataFrame], pd.Series], ...] = ()
+
+
+def has_reference_id(chunk: pd.DataFrame) -> pd.Series:
+    return chunk['DM Reference ID'].notna()
+
+
+def is_not_test_lead(chunk: pd.DataFrame) -> pd.Series:
+    return chunk['Status'] != 'Test Lead'
+
+
+def has_numeric_caller_id(chunk: pd.DataFrame) -> pd.Series:
+    # Drops values like ('Restricted','0Anonymous','00asterisk'), which can not be matched with a phone
+    return chunk['Caller ID'].str.isnumeric().fillna(False).astype(bool)
+
+
+def has_zip_code(chunk: pd.DataFrame) -> pd.Series:
+    return chunk['ZIPCODE'].notna()
+
+
+# Reference ids and phone numbers are read as strings: an id or a phone that pandas infers as a number loses its
+# leading zeros, and it becomes a float (5551234567.0) when the column has empty values
+PHONE_DTYPES = {'Home Phone': str, 'Mobile Phone': str, 'Work Phone': str}
+
+SABINO_STATUS = CsvSchema(dtype={'DM Reference ID': str}, filters=(has_reference_id, is_not_test_lead))
+
+SABINO_STATUS_WITH_PHONE = CsvSchema(dtype={'DM Reference ID': str, **PHONE_DTYPES},
+                                     filters=(has_reference_id, is_not_test_lead))
+
+SABINO_PHONE = CsvSchema(dtype={'DM Reference ID': str, **PHONE_DTYPES}, filters=(has_reference_id,))
+
+CALL_CENTER = CsvSchema(dtype={'Caller ID': str}, filters=(has_numeric_caller_id,))
+
+# Only the first 524 columns of the American Community Survey are features, the first row is the title of the survey
+CENSUS_2017_2021 = CsvSchema(columns=range(524), dtype={'ZIPCODE': str}, header=1, filters=(has_zip_code,))
@@ -0,0 +1,177 @@
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+import reusable_functions as rf
+
+# The formats of the written files, as (extension, function that writes a dataframe to a path)
+FILE_FORMATS = {
+    'csv': ('csv', lambda df, path: df.to_csv(path, sep=',', encoding='utf-8', index=False)),
+    'csv.gz': ('csv.gz', lambda df, path: df.to_csv(path, sep=',', encoding='utf-8', index=False,
+                                                    compression='gzip')),
+    'parquet': ('parquet', lambda df, path: df.to_parquet(path, index=False, compression='zstd')),
+}
+
+# The name of the manifest of a partitioned dataset, stored in its directory
+PARTITION_MANIFEST_NAME = '_manifest.json'
+
+# The directory name of the rows without a value in the partition column
+NULL_PARTITION = '__null__'
+
+
+def manifest_path(path: str) -> str:
+    # The manifest of a single file is stored next to it
+    return f'{path}.manifest.json'
+
+
+def partition_directory(path: str) -> str:
+    # A partitioned dataset is written in a directory named after the file it replaces (final_dataset.csv to
+    # final_dataset/)
+    for extension, _ in FILE_FORMATS.values():
+        if path.endswith(f'.{extension}'):
+            return path[:-len(extension) - 1]
+    return os.path.splitext(path)[0]
+
+
+def single_file_path(path: str, file_format: str) -> str:
+    # A dataset that is not partitioned is written with the extension of its format (final_dataset.csv to
+    # final_dataset.parquet)
+    extension, _ = FILE_FORMATS[file_format]
+    return f'{partition_directory(path)}.{extension}'
+
+
+def dataset_exists(path: str, partition_by: str = '', file_format: str = 'csv') -> bool:
+    # Whether the dataset was written in the layout of partition_by and file_format
+    if partition_by:
+        return os.path.exists(os.path.join(partition_directory(path), PARTITION_MANIFEST_NAME))
+    return os.path.exists(single_file_path(path, file_format))
+
+
+def remove_other_layouts(path: str, partition_by: str, file_format: str):
+    """
+    Description: Removes what a previous run wrote in another layout (e.g. final_dataset.csv and its manifest after a
+    switch to partitioned or parquet output), so only the current dataset is left next to path
+    :param path: The path of the dataset as a single file
+    :param partition_by: The partition spec of the current dataset, '' for a single file
+    :param file_format: The format of the current dataset
+    """
+    for other_format in FILE_FORMATS:
+        if partition_by or other_format != file_format:
+            other_path = single_file_path(path, other_format)
+            for stale_path in (other_path, manifest_path(other_path)):
+                if os.path.exists(stale_path):
+                    os.remove(stale_path)
+    if not partition_by:
+        shutil.rmtree(partition_directory(path), ignore_errors=True)
+
+
+def write_manifest(path: str, manifest: dict):
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def write_file(df: pd.DataFrame, path: str, file_format: str) -> dict:
+    """
+    Description: Writes a dataframe to a temporary file next to path and renames it to path, so a reader never sees a
+    half-written file
+    :param df: The dataframe
+    :param path: The path of the file
+    :param file_format: One of FILE_FORMATS
+    :return: The entry of the file in the manifest: its rows, its size and its content hash
+    """
+    _, write = FILE_FORMATS[file_format]
+    temporary_path = f'{path}.{os.getpid()}.tmp'
+    write(df, temporary_path)
+    os.replace(temporary_path, path)
+    return {'rows': len(df), 'bytes': os.path.getsize(path), 'sha256': rf.compute_file_fingerprint(path)}
+
+
+def partition_labels(df: pd.DataFrame, partition_by: str) -> Tuple[str, pd.Series]:
+    """
+    Description: The partition of every row. partition_by is a column (e.g. input_feature_pd_customer_state), or a
+    date column with ':month' (e.g. input_feature_pd_date_of_lead_purchased:month) to partition by the month.
+    :param df: The dataframe
+    :param partition_by: The partition spec
+    :return: The name of the partition key and the value of every row, as a string
+    """
+    column, _, granularity = partition_by.partition(':')
+    if granularity == 'month':
+        labels = pd.to_datetime(df[column], errors='coerce').dt.strftime('%Y-%m')
+        name = f'{column}_month'
+    elif granularity:
+        raise ValueError(f"Unknown partition granularity {granularity}, only 'month' is supported")
+    else:
+        # A value is a directory name, so it can not contain a separator
+        labels = df[column].astype(object).map(str, na_action='ignore').str.replace(os.sep, '_', regex=False)
+        name = column
+    return name, labels.fillna(NULL_PARTITION)
+
+
+def write_dataset(df: pd.DataFrame, path: str, partition_by: str = '', file_format: str = 'csv',
+                  threads: int = 1) -> dict:
+    """
+    Description: Writes a dataset with a manifest of its files, their rows and their content hashes. Without
+    partition_by it is a single file at path, with the extension of file_format (see single_file_path). With
+    partition_by every partition is a file of the directory partition_directory(path) (e.g.
+    final_dataset/input_feature_pd_customer_state=CA/part-0.csv), so a reader can load only the partitions it needs.
+    The partitions are written by a pool of threads into a temporary directory that replaces the previous one when all
+    of them are written. A dataset of a previous run in another layout is removed.
+    :param df: The dataset
+    :param path: The path of the dataset as a single file
+    :param partition_by: The partition spec (see partition_labels), '' for a single file
+    :param file_format: One of FILE_FORMATS
+    :param threads: The number of threads that write the partitions
+    :return: The manifest
+    """
+    if file_format not in FILE_FORMATS:
+        raise ValueError(f"Unknown format {file_format}, use one of {sorted(FILE_FORMATS)}")
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    manifest = {'format': file_format, 'rows': len(df), 'columns': [str(column) for column in df.columns]}
+
+    if not partition_by:
+        path = single_file_path(path, file_format)
+        manifest['files'] = [{'path': os.path.basename(path), **write_file(df, path, file_format)}]
+        write_manifest(manifest_path(path), manifest)
+        remove_other_layouts(path, partition_by, file_format)
+        return manifest
+
+    extension, _ = FILE_FORMATS[file_format]
+    name, labels = partition_labels(df, partition_by)
+    target = partition_directory(path)
+    staging = f'{target}.{os.getpid()}.tmp'
+    shutil.rmtree(staging, ignore_errors=True)
+    partitions: List[Tuple[str, pd.DataFrame]] = []
+    for label, partition_df in df.groupby(labels.to_numpy(), sort=True):
+        partitions.append((os.path.join(f'{name}={label}', f'part-0.{extension}'), partition_df))
+        os.makedirs(os.path.join(staging, f'{name}={label}'))
+
+    with ThreadPoolExecutor(max_workers=max(threads, 1)) as executor:
+        entries = list(executor.map(lambda partition: write_file(partition[1], os.path.join(staging, partition[0]),
+                                                                 file_format), partitions))
+    manifest.update(partition_by=partition_by,
+                    files=[{'path': relative_path, 'partition': relative_path.split(os.sep)[0], **entry}
+                           for (relative_path, _), entry in zip(partitions, entries)])
+    write_manifest(os.path.join(staging, PARTITION_MANIFEST_NAME), manifest)
+
+    # The previous partitions are moved aside before the new ones take their place, and removed after
+    previous: Optional[str] = None
+    if os.path.exists(target):
+        previous = f'{target}.{os.getpid()}.old'
+        os.replace(target, previous)
+    os.replace(staging, target)
+    if previous is not None:
+        shutil.rmtree(previous, ignore_errors=True)
+    remove_other_layouts(path, partition_by, file_format)
+    return manifest
+
+
+def write_csv(df: pd.DataFrame, path: str) -> dict:
+    # A side output (e.g. the leads that need to be excluded): a single CSV written atomically, with its manifest
+    return write_dataset(df, path)
@@ -0,0 +1,260 @@
+import hashlib
+import inspect
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from storage_backends import FeatherBackend, PickleBackend, is_arrow_lossless
+
+# The name or the position of a sheet, as pd.read_excel takes it
+Sheet = Union[str, int]
+
+# The file (stored in the cache directory) that keeps the content hash of each workbook and the entries of the cache
+INDEX_NAME = 'excel_cache_index.json'
+
+
+class ExcelCache:
+    """
+    Keeps every sheet we have parsed from an Excel file as a Feather file, so that the next run loads it instead of
+    parsing the workbook again. The sheets are keyed by the content hash of the workbook, which is computed again only
+    when the size or the modification time of the workbook changes, so a workbook that is copied or touched keeps its
+    cache and a workbook that is edited gets a new one.
+
+    A sheet that Arrow can not store exactly as pandas read it (e.g. a column that mixes numbers and strings) is pickled
+    instead. When the cache grows over max_size_mb, the entries used least recently are removed.
+    """
+
+    def __init__(self, directory: str, max_size_mb: int):
+        self.directory = directory
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.index = self.read_index()
+        self.removed_entries = set()
+
+    def read_index(self) -> dict:
+        path = os.path.join(self.directory, INDEX_NAME)
+        if not os.path.exists(path):
+            return {'files': {}, 'workbooks': {}, 'entries': {}}
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def write_index(self):
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        # The stages may run in parallel processes, so we merge our changes with the ones the other processes have
+        # written since we read the index
+        current = self.read_index()
+        for section in ('files', 'workbooks', 'entries'):
+            current[section].update(self.index[section])
+        for name in self.removed_entries:
+            current['entries'].pop(name, None)
+        self.index = current
+
+        path = os.path.join(self.directory, INDEX_NAME)
+        temporary_path = f'{path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'w') as f:
+            json.dump(self.index, f, indent=2, sort_keys=True)
+        os.replace(temporary_path, path)
+
+    def fingerprint_workbook(self, file: str) -> str:
+        import reusable_functions as rf
+
+        path = os.path.abspath(file)
+        stat = os.stat(path)
+        cached = self.index['files'].get(path)
+        if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+            return cached['sha256']
+
+        sha256 = rf.compute_file_fingerprint(path)
+        if cached and cached['sha256'] != sha256:
+            self.remove_workbook(cached['sha256'])
+        self.index['files'][path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}
+        return sha256
+
+    def remove_workbook(self, sha256: str):
+        # The old version of an edited workbook will not be read again, unless another file has the same content
+        if any(file['sha256'] == sha256 for file in self.index['files'].values()):
+            return
+        self.index['workbooks'].pop(sha256, None)
+        for name in [name for name, entry in self.index['entries'].items() if entry['workbook'] == sha256]:
+            self.remove_entry(name)
+
+    def remove_entry(self, name: str):
+        self.index['entries'].pop(name, None)
+        self.removed_entries.add(name)
+        path = os.path.join(self.directory, name)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def sheet_names(self, file: str) -> List[str]:
+        sha256 = self.fingerprint_workbook(file)
+        workbook = self.index['workbooks'].setdefault(sha256, {})
+        if 'sheet_names' not in workbook:
+            with pd.ExcelFile(file) as excel_file:
+                workbook['sheet_names'] = excel_file.sheet_names
+            self.write_index()
+        return workbook['sheet_names']
+
+    def read_sheets(self, file: str, sheets: List[Sheet]) -> Dict[Sheet, pd.DataFrame]:
+        """
+        Description: Loads the cached sheets and parses the workbook once for all the sheets that are not cached yet
+        :param file: The path of the Excel file
+        :param sheets: The names or the positions of the sheets
+        :return: A dictionary with each sheet, keyed as in sheets
+        """
+        sha256 = self.fingerprint_workbook(file)
+        sheet_names = {sheet: self.sheet_names(file)[sheet] if isinstance(sheet, int) else sheet for sheet in sheets}
+
+        dfs = {}
+        missing = {}
+        for sheet, sheet_name in sheet_names.items():
+            key = entry_key(sha256, sheet_name)
+            df = self.load(key)
+            if df is None:
+                missing[sheet] = key
+            else:
+                dfs[sheet] = df
+
+        if missing:
+            parsed = pd.read_excel(file, sheet_name=[sheet_names[sheet] for sheet in missing])
+            for sheet, key in missing.items():
+                dfs[sheet] = parsed[sheet_names[sheet]]
+                self.store(dfs[sheet], key, sha256)
+            self.evict(keep=[f'{key}.{extension}' for key in missing.values() for extension in ('feather', 'pickle')])
+        self.write_index()
+        return dfs
+
+    def parsed_key(self, file: str, parse: Callable[[str], pd.DataFrame]) -> Tuple[str, str]:
+        # The entry of a parser is keyed by the source of its module too, so a change in the parser does not load what
+        # its previous version produced
+        sha256 = self.fingerprint_workbook(file)
+        parser_source = hashlib.sha256(inspect.getsource(inspect.getmodule(parse)).encode('utf-8')).hexdigest()
+        return sha256, entry_key(sha256, f'{parse.__module__}.{parse.__name__}:{parser_source}')
+
+    def read_parsed(self, file: str, parse: Callable[[str], pd.DataFrame]) -> pd.DataFrame:
+        """
+        Description: Loads the cached result of a parser that reads the whole workbook itself, or runs the parser and
+        caches its result
+        :param file: The path of the Excel file
+        :param parse: A function that takes the path and returns a dataframe
+        :return: The dataframe returned by parse
+        """
+        df = self.load_parsed(file, parse)
+        if df is None:
+            df = parse(file)
+            self.store_parsed(file, parse, df)
+        self.write_index()
+        return df
+
+    def load_parsed(self, file: str, parse: Callable[[str], pd.DataFrame]) -> Optional[pd.DataFrame]:
+        return self.load(self.parsed_key(file, parse)[1])
+
+    def store_parsed(self, file: str, parse: Callable[[str], pd.DataFrame], df: pd.DataFrame):
+        # For a result that was produced another way than by calling parse (e.g. sheet by sheet in a process pool)
+        sha256, key = self.parsed_key(file, parse)
+        self.store(df, key, sha256)
+        self.evict(keep=[f'{key}.{extension}' for extension in ('feather', 'pickle')])
+
+    def load(self, key: str) -> Optional[pd.DataFrame]:
+        for backend in (FeatherBackend(), PickleBackend()):
+            name = f'{key}.{backend.extension}'
+            path = os.path.join(self.directory, name)
+            if name in self.index['entries'] and os.path.exists(path):
+                self.index['entries'][name]['last_used'] = time.time()
+                return backend.read(path)
+        return None
+
+    def store(self, df: pd.DataFrame, key: str, sha256: str):
+        backend = FeatherBackend() if is_arrow_lossless(df) else PickleBackend()
+        name = f'{key}.{backend.extension}'
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        path = os.path.join(self.directory, name)
+        temporary_path = f'{path}.{os.getpid()}.tmp'
+        backend.write(df, temporary_path)
+        os.replace(temporary_path, path)
+        self.index['entries'][name] = {'workbook': sha256, 'bytes': os.path.getsize(path), 'last_used': time.time()}
+        self.removed_entries.discard(name)
+
+    def evict(self, keep: Optional[List[str]] = None):
+        """
+        Description: Removes the entries that were used least recently until the cache fits in max_size_mb
+        :param keep: The entries that must not be removed (the ones we have just stored)
+        """
+        entries = self.index['entries']
+        total = sum(entry['bytes'] for entry in entries.values())
+        for name in sorted(entries, key=lambda entry_name: entries[entry_name]['last_used']):
+            if total <= self.max_size_bytes:
+                break
+            if name in (keep or []):
+                continue
+            total -= entries[name]['bytes']
+            self.remove_entry(name)
+
+
+def entry_key(sha256: str, name: str) -> str:
+    # The name of the cached entry of a sheet (or of a parser) of the workbook with that content hash
+    return hashlib.sha256(f'{sha256}:{name}'.encode('utf-8')).hexdigest()[:40]
+
+
+def get_excel_cache() -> Optional[ExcelCache]:
+    # The cache is built for every call, since another process (or stage) may have updated the index in between
+    from Aggregate_data.config.config_utils import ConfigUtils
+
+    if not ConfigUtils.conf.excel_cache_path:
+        return None
+    return ExcelCache(ConfigUtils.conf.excel_cache_path, ConfigUtils.conf.excel_cache_max_size_mb)
+
+
+def read_excel_sheets(file: str,
+                      sheet: Union[Sheet, List[Sheet], None]) -> Union[pd.DataFrame, Dict[Sheet, pd.DataFrame]]:
+    """
+    Description: Reads an Excel file like pd.read_excel(file, sheet_name=sheet), through the cache if it is enabled
+    :param file: The path of the Excel file
+    :param sheet: The name or the position of the sheet, a list of them, or None for all the sheets
+    :return: The sheet, or a dictionary with the sheets if sheet is a list or None
+    """
+    cache = get_excel_cache()
+    if cache is None:
+        return pd.read_excel(file, sheet_name=sheet)
+    if sheet is None:
+        return cache.read_sheets(file, cache.sheet_names(file))
+    if isinstance(sheet, list):
+        return cache.read_sheets(file, sheet)
+    return cache.read_sheets(file, [sheet])[sheet]
+
+
+def read_excel_sheet_names(file: str) -> List[str]:
+    cache = get_excel_cache()
+    if cache is None:
+        with pd.ExcelFile(file) as excel_file:
+            return excel_file.sheet_names
+    return cache.sheet_names(file)
+
+
+def read_parsed_workbook(file: str, parse: Callable[[str], pd.DataFrame]) -> pd.DataFrame:
+    # Runs parse(file), through the cache if it is enabled
+    cache = get_excel_cache()
+    if cache is None:
+        return parse(file)
+    return cache.read_parsed(file, parse)
+
+
+def load_parsed_workbook(file: str, parse: Callable[[str], pd.DataFrame]) -> Optional[pd.DataFrame]:
+    # The cached result of parse(file), None if it is not cached or the cache is disabled
+    cache = get_excel_cache()
+    if cache is None:
+        return None
+    df = cache.load_parsed(file, parse)
+    cache.write_index()
+    return df
+
+
+def store_parsed_workbook(file: str, parse: Callable[[str], pd.DataFrame], df: pd.DataFrame):
+    # Caches df as the result of parse(file), if the cache is enabled
+    cache = get_excel_cache()
+    if cache is not None:
+        cache.store_parsed(file, parse, df)
+        cache.write_index()
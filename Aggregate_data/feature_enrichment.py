@@ -0,0 +1,39 @@
+import pandas as pd
+import reusable_functions as rf
+import dataset_writer as dw
+import feature_store as fs
+from telemetry import record_output
+from logger import Logger
+from Aggregate_data.config.__init__ import Config
+
+# The feature groups (see feature_store.FEATURE_GROUPS) added to the final dataset for each value of NUMBER_OF_FEATURES
+FEATURE_SOURCES = {
+    1: ['debt_in_america'],
+    2: ['census_deluxe_business'],
+    3: ['federal_reserve_bank_philadelphia'],
+    4: ['debt_in_america', 'federal_reserve_bank_philadelphia'],
+}
+
+# The column of the final dataset that holds every key of the feature store
+LEAD_KEYS = {fs.ZIP5: 'input_feature_pd_customer_zip1', fs.STATE: 'input_feature_pd_customer_state'}
+
+
+def add_external_features(conf: Config, logger: Logger):
+    """
+    Description: Adds the feature groups selected by NUMBER_OF_FEATURES to the final dataset and stores it. The groups
+    are looked up in the feature store, which builds them from the raw files only when they changed.
+    :param conf: conf = Config(debug_mode=True)
+    :param logger: The logger of the procedure
+    """
+    final_df = rf.read_df_from_pickle_format(conf, 'final_df_stage_one')
+    final_df['input_feature_pd_customer_zip1'] = final_df['input_feature_pd_customer_zip1'].astype(str)
+
+    names = FEATURE_SOURCES.get(conf.number_of_features, [])
+    logger.info(f"Add the features of {', '.join(names)}")
+    features = fs.FeatureStore(conf, logger).lookup(final_df, LEAD_KEYS, names)
+    final_df = pd.concat([final_df, features], axis=1)
+
+    # With FINAL_DATASET_PARTITION_BY the dataset is a directory of partitions, written by OUTPUT_WRITER_THREADS threads
+    dw.write_dataset(final_df, conf.path_final_dataset, conf.final_dataset_partition_by, conf.final_dataset_format,
+                     conf.output_writer_threads)
+    record_output(final_df)
@@ -0,0 +1,138 @@
+import glob
+import importlib
+from typing import Dict, List, NamedTuple, Tuple
+
+import pandas as pd
+
+from incremental_store import IncrementalStore, SourceFile
+from Aggregate_data.config.__init__ import Config
+from logger import Logger
+
+# The keys the feature groups are indexed by
+ZIP5 = 'zip5'
+STATE = 'state'
+
+
+class FeatureGroup(NamedTuple):
+    """
+    A group of third party features of the store.
+    module, function: Builds the group from the raw files, given the logger, and returns it with its key column
+    inputs: The Config attributes of the raw files (glob patterns are expanded)
+    key: What the group is indexed by, ZIP5 or STATE
+    code_modules: The modules whose code builds the group, besides module
+    """
+    module: str
+    function: str
+    inputs: Tuple[str, ...]
+    key: str
+    code_modules: Tuple[str, ...] = ()
+
+
+# The modules are imported only when their group is built, since they pull in heavy dependencies (e.g. us)
+FEATURE_GROUPS = {
+    'us_census_bureau': FeatureGroup('external_dataset_added', 'read_us_census_bureau_features',
+                                     ('path_to_us_census_bureau_3rd_party_data',), ZIP5,
+                                     ('reusable_functions',)),
+    'debt_in_america': FeatureGroup('handle_debt_in_america', 'format_debt_in_america_datasets',
+                                    ('path_debt_in_america_june_2022_auto',
+                                     'path_debt_in_america_june_2022_delinquency',
+                                     'path_debt_in_america_june_2022_medical', 'path_debt_in_america_june_2022_student',
+                                     'path_to_df_matching_zipcodes_to_geoids'), ZIP5,
+                                    ('reusable_functions', 'excel_cache')),
+    'census_deluxe_business': FeatureGroup('census_deluxe_business', 'format_census_deluxe_business_dataset',
+                                           ('path_to_store_census_2010_df', 'path_to_store_census_2017_2021_df',
+                                            'path_to_store_census_deluxe_df', 'path_to_store_census_place_fips_df'),
+                                           ZIP5, ('reusable_functions', 'csv_schemas', 'handle_debt_in_america')),
+    'federal_reserve_bank_philadelphia': FeatureGroup('federal_reserve_bank_philadelphia',
+                                                      'format_federal_reserve_bank_philadelphia_dataset',
+                                                      ('path_federal_reserve_bank_philadelphia',), STATE),
+}
+
+
+def zip5(zip_codes: pd.Series) -> pd.Series:
+    # The 5 digit zip code as a string. The raw files store it as a number, so 02134 is read as 2134 and has to be
+    # padded back to match the zip codes of the leads.
+    return zip_codes.astype(str).str.replace(r'\.0$', '', regex=True).str.zfill(5)
+
+
+def normalize_keys(keys: pd.Series, key: str) -> pd.Series:
+    return zip5(keys) if key == ZIP5 else keys.astype(str).str.strip()
+
+
+class FeatureStore:
+    """
+    Keeps every feature group in FEATURE_STORE_PATH as a table indexed by its key, with one row per zip code or state.
+    A group is built from its raw files the first time it is needed, and again only when one of its files or the code
+    that builds it changes (see IncrementalStore), so enrichment is a lookup of the stored table instead of a rebuild
+    and a merge. The generation of the manifest of a group is the version of its table.
+    """
+
+    def __init__(self, conf: Config, logger: Logger):
+        self.conf = conf
+        self.logger = logger
+
+    def group_store(self, name: str) -> IncrementalStore:
+        group = FEATURE_GROUPS[name]
+        return IncrementalStore(self.conf.feature_store_path, f'{name}_manifest.json',
+                                (group.module, 'feature_store', 'incremental_store') + group.code_modules,
+                                identity=group.key)
+
+    def source_files(self, name: str) -> List[SourceFile]:
+        files = []
+        for attribute in FEATURE_GROUPS[name].inputs:
+            files.extend((attribute, path) for path in sorted(glob.glob(getattr(self.conf, attribute))))
+        return files
+
+    def build(self, name: str) -> pd.DataFrame:
+        """
+        Description: Builds a feature group from its raw files, with its key normalized and one row per key (the first
+        one, if the raw files repeat a key)
+        :param name: The name of the group
+        :return: The table of the group, indexed by its key
+        """
+        group = FEATURE_GROUPS[name]
+        function = getattr(importlib.import_module(group.module), group.function)
+        features, key_column = function(self.logger)
+        features = features.dropna(subset=[key_column])
+        keys = normalize_keys(features[key_column], group.key)
+        table = features.drop(columns=key_column).set_axis(pd.Index(keys.to_numpy(), name=group.key))
+        duplicates = table.index.duplicated()
+        if duplicates.any():
+            self.logger.warning(f"The feature group {name} has {duplicates.sum()} repeated keys, the first one is kept")
+            table = table[~duplicates]
+        return table
+
+    def table(self, name: str) -> pd.DataFrame:
+        """
+        Description: The table of a feature group, built again only if its raw files or its code changed
+        :param name: The name of the group
+        :return: The table of the group, indexed by its key
+        """
+        store = self.group_store(name)
+        files = self.source_files(name)
+        if not store.start(files) and not store.new_files(files):
+            return store.read_frame(name).set_index(FEATURE_GROUPS[name].key)
+
+        self.logger.info(f"Build the feature group {name}")
+        table = self.build(name)
+        for kind, path in files:
+            store.record_file(kind, path, len(table))
+        store.write_frames({name: table.reset_index()})
+        self.logger.info(f"Stored version {store.manifest['generation']} of the feature group {name}")
+        return table
+
+    def lookup(self, leads: pd.DataFrame, key_columns: Dict[str, str], names: List[str]) -> pd.DataFrame:
+        """
+        Description: The features of the selected groups for every lead, aligned to the index of leads, so they can be
+        attached with a concat instead of a merge. A lead whose key is not in a table gets NaN features.
+        :param leads: The leads
+        :param key_columns: The column of leads that holds every key (e.g. {ZIP5: 'Zip_1'})
+        :param names: The groups, in the order their columns are returned
+        :return: The features of every lead
+        """
+        features = []
+        for name in names:
+            key = FEATURE_GROUPS[name].key
+            keys = normalize_keys(leads[key_columns[key]], key)
+            features.append(self.table(name).reindex(keys.to_numpy()).set_axis(leads.index))
+        return pd.concat(features, axis=1) if features else pd.DataFrame(index=leads.index)
@@ -0,0 +1,116 @@
+import json
+import os
+import time
+from importlib.metadata import version
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def map_gender(g: str) -> str:
+    if g == 'mostly_female':
+        return 'female'
+    elif g == 'mostly_male':
+        return 'male'
+    else:
+        return g
+
+
+class GenderInference:
+    """
+    Infers the gender of first names with gender_guesser. The detector parses its whole name dictionary when it is
+    created, so it is created once per process and shared by every stage that runs in the process.
+
+    The detector is case insensitive, so we look up every distinct lowercase name once, and we keep the genders we found
+    in a lookup table (a JSON file) that the next runs load instead of asking the detector again. When the table grows
+    over max_names, the names used least recently are removed.
+    """
+    detector = None
+
+    # The table is thrown away when the detector changes, since it may give other genders
+    DETECTOR_VERSION = f"gender-guesser {version('gender-guesser')}"
+
+    def __init__(self, path: str = '', max_names: int = 100000):
+        self.path = path
+        self.max_names = max_names
+        # name -> [gender, last time it was used]
+        self.table: Dict[str, list] = self.read_table()
+        self.changed = False
+
+    @classmethod
+    def get_detector(cls):
+        if cls.detector is None:
+            import gender_guesser.detector as gender
+
+            # The difference between andy and unknown is that the former is found to have the same probability to be
+            # male than to be female, while the later means that the name wasn’t found in the database.
+            cls.detector = gender.Detector(case_sensitive=False)
+            cls.detector._THRESHOLD_RATIO = 0.9
+        return cls.detector
+
+    def read_table(self) -> Dict[str, list]:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        with open(self.path, 'r') as f:
+            content = json.load(f)
+        return content['names'] if content.get('detector') == self.DETECTOR_VERSION else {}
+
+    def write_table(self):
+        if not self.path or not self.changed:
+            return
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        # The stages may run in parallel processes, so we merge our names with the ones the others have written
+        table = self.read_table()
+        table.update(self.table)
+        if len(table) > self.max_names:
+            recent = sorted(table, key=lambda name: table[name][1], reverse=True)[:self.max_names]
+            table = {name: table[name] for name in recent}
+        self.table = table
+
+        temporary_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'w') as f:
+            json.dump({'detector': self.DETECTOR_VERSION, 'names': table}, f)
+        os.replace(temporary_path, self.path)
+        self.changed = False
+
+    def infer(self, names: pd.Series) -> pd.Series:
+        """
+        Description: Finds the gender of every first name of a column. A name that is not a string (e.g. NaN) gets NaN.
+        :param names: The first names
+        :return: 'male', 'female', 'andy' or 'unknown' for each name
+        """
+        now = time.time()
+        genders = {}
+        for name in {value.lower() for value in names if isinstance(value, str)}:
+            if name not in self.table:
+                self.table[name] = [map_gender(self.get_detector().get_gender(name)), now]
+            self.table[name][1] = now
+            genders[name] = self.table[name][0]
+        self.changed = self.changed or bool(genders)
+        self.write_table()
+        return pd.Series([genders[value.lower()] if isinstance(value, str) else np.nan for value in names],
+                         index=names.index, dtype=object)
+
+
+def get_gender_inference() -> GenderInference:
+    from Aggregate_data.config.config_utils import ConfigUtils
+
+    return GenderInference(ConfigUtils.conf.gender_lookup_path, ConfigUtils.conf.gender_lookup_max_names)
+
+
+def create_gender_column(df: pd.DataFrame, name_column: str, inference: Optional[GenderInference] = None) \
+        -> pd.DataFrame:
+    """
+    Description: Adds the 'gender' column, inferred from the first names
+    :param df: The dataframe, it is not modified
+    :param name_column: The column with the first names ('First Name', 'FNAME' or 'First')
+    :param inference: The service to use, by default the one configured by GENDER_LOOKUP_PATH
+    :return: A copy of the dataframe with the 'gender' column
+    """
+    inference = inference or get_gender_inference()
+    df = df.copy()
+    df['gender'] = inference.infer(df[name_column])
+    return df
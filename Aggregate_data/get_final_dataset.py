@@ -1,60 +1,70 @@
-import os
-import pandas as pd
-import reusable_functions as rf
-import pdr_file_preprocessing as pfp
-import status_preprocessing as sp
-import unify_and_clean_call_center_datasets as ucd
-import phone_and_trunk_preprocessing as php
-import handle_zip_code as hzc
-import external_dataset_added as eda
-import rename_drop_columns as rdc
-import unify_and_clear_prospect_datasets as ucpd
-import unify_and_clear_purl_responder_datasets as ucord
-import unify_prospects_pdr_dataframes as upd
-import clear_opt_out_list_and_remove_opt_out_prospects as colarop
-import census_deluxe_business as cdb
-import handle_debt_in_america as hdia
-import federal_reserve_bank_philadelphia as frbp
+import argparse
+import pipeline
+import telemetry
+from datetime import datetime
+from pipeline_context import PipelineContext
 from logger import Logger
 from config import Config
 
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Builds the final dataset. Without arguments it runs every stage.')
+    selection = parser.add_mutually_exclusive_group()
+    selection.add_argument('--stage', action='append', dest='stages', metavar='STAGE',
+                           help='Run only this stage (can be given more than once)')
+    selection.add_argument('--features-only', action='store_true',
+                           help='Run only the feature enrichment selected by NUMBER_OF_FEATURES')
+    parser.add_argument('--from', dest='first', metavar='STAGE', help='The first stage to run')
+    parser.add_argument('--to', dest='last', metavar='STAGE', help='The last stage to run')
+    parser.add_argument('--list', action='store_true', help='List the stages and exit')
+    parser.add_argument('--force', action='store_true', default=None,
+                        help='Run the selected stages even if their inputs and code have not changed')
+    parser.add_argument('--workers', type=int, help='Run independent stages in a pool of that many processes')
+    parser.add_argument('--in-memory', action='store_true', default=None,
+                        help='Pass the dataframes between the stages in memory')
+    arguments = parser.parse_args()
+    if (arguments.stages or arguments.features_only) and (arguments.first or arguments.last):
+        parser.error('--from/--to can not be combined with --stage or --features-only')
+    return arguments
+
+
 if __name__ == "__main__":
+    arguments = parse_arguments()
+    if arguments.list:
+        for stage in pipeline.STAGES:
+            print(stage.name)
+        raise SystemExit(0)
+
+    # The stage modules are imported only when their stage runs, so a partial run does not load the rest
+    if arguments.features_only:
+        stages = pipeline.select_stages(['add_external_features'])
+    else:
+        stages = pipeline.select_stages(arguments.stages, arguments.first, arguments.last)
+
     conf = Config(debug_mode=True)
+    started_at = datetime.now()
 
     log = Logger("PACIFIC DEBT")
     logger = log.getLogger()
     logger.info("Start the procedure in order to contain the final dataset")
 
-    colarop.clear_opt_out_list()
-    ucpd.format_umg_datasets()
-    colarop.remove_prospects_without_reference_id(conf, logger)
-    pfp.format_pdr_file_dataset()
-    colarop.remove_prospects_with_reference_id(conf, logger)
-    upd.helper_concatenation_function(conf, logger)
-    sp.format_status_dataset(conf, logger)
-    ucd.format_call_center_dataset(logger)
-    php.format_phone_trunk_dataset(conf, logger)
-    hzc.format_description_dataset(conf, logger)
-    ucord.format_purl_responders(logger)
-    eda.format_external_dataset(conf, logger)
-    rdc.make_final_modifications(conf, logger)
-    final_df = rf.read_df_from_pickle_format(conf, 'final_df_stage_one')
-    final_df['input_feature_pd_customer_zip1'] = final_df['input_feature_pd_customer_zip1'].astype(str)
-
-    cases_df = None
-    onParam = None
-    if os.getenv('NUMBER_OF_FEATURES') == '1':
-        cases_df, onParam = hdia.format_debt_in_america_datasets(logger)
-    elif os.getenv('NUMBER_OF_FEATURES') == '2':
-        cases_df, onParam = cdb.format_census_deluxe_business_dataset(logger)
-    elif os.getenv('NUMBER_OF_FEATURES') == '3':
-        cases_df, onParam = frbp.format_federal_reserve_bank_philadelphia_dataset(logger)
-    elif os.getenv('NUMBER_OF_FEATURES') == '4':
-        cases_df, onParam = hdia.format_debt_in_america_datasets(logger)
-        final_df = pd.merge(final_df, cases_df, on=onParam, how='left', sort=False)
-        cases_df, onParam = frbp.format_federal_reserve_bank_philadelphia_dataset(logger)
-
-    if os.getenv('NUMBER_OF_FEATURES') in ['1', '2', '3', '4']:
-        final_df = pd.merge(final_df, cases_df, on=onParam, how='left', sort=False)
-
-    final_df.to_csv(os.environ.get('PATH_FINAL_DATASET'), sep=',', encoding='utf-8', index=False)
+    force = conf.pipeline_force_full_run if arguments.force is None else arguments.force
+    workers = conf.pipeline_workers if arguments.workers is None else arguments.workers
+    in_memory = conf.pipeline_in_memory if arguments.in_memory is None else arguments.in_memory
+
+    # With PIPELINE_IN_MEMORY the stages pass their dataframes to each other in memory and PIPELINE_CHECKPOINT decides
+    # if they are also written to disk. The stages that run in worker processes always go through the disk.
+    context = PipelineContext(pipeline.count_stage_readers(stages), in_memory=in_memory,
+                              checkpoint=conf.pipeline_checkpoint)
+    with context:
+        # Stages whose inputs and code have not changed since the last run are skipped, and independent stages run at
+        # the same time if PIPELINE_WORKERS > 1
+        stage_metrics = pipeline.run_pipeline(conf, logger, stages, force=force, workers=workers,
+                                              trace_memory=conf.pipeline_trace_memory)
+
+    if conf.path_to_store_run_report:
+        # By default we compare with the report of the previous run, before we overwrite it
+        previous_report = telemetry.read_run_report(conf.path_to_previous_run_report or conf.path_to_store_run_report)
+        telemetry.write_run_report(conf.path_to_store_run_report, stage_metrics, started_at, previous_report)
+        for stage in stage_metrics:
+            logger.info(f"Stage telemetry: {stage}")
@@ -1,6 +1,5 @@
 import pandas as pd
 import numpy as np
-from dotenv import dotenv_values
 import reusable_functions as rf
 from Aggregate_data.config.config_utils import ConfigUtils
 from typing import Tuple
@@ -58,8 +57,7 @@ def merge_external_data(df1: pd.DataFrame, df2: pd.DataFrame, df3: pd.DataFrame,
 
 
 def read_dataset_that_unifies_geoid_with_zipcodes() -> pd.DataFrame:
-    env = dotenv_values()
-    df = pd.read_csv(env['PATH_TO_DF_MATCHING_ZIPCODES_TO_GEOIDS'], dtype=str, delimiter=',')
+    df = pd.read_csv(ConfigUtils.conf.path_to_df_matching_zipcodes_to_geoids, dtype=str, delimiter=',')
     df = df.loc[:, ['ZCTA5', 'GEOID']]
     return df
 
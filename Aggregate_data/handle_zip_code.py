@@ -1,9 +1,16 @@
 import pandas as pd
 import reusable_functions as rf
+import read_planner as rp
 from Aggregate_data.config.config_utils import ConfigUtils
 from Aggregate_data.config.__init__ import Config
 from logger import Logger
 
+# The columns of add_description_df, in their order
+DESCRIPTION_COLUMNS = ['UUID', 'gender', 'Status', 'Description', 'Customer_contacted_status', 'Customer_intention',
+                       'Mail_number', 'Calls_number', 'Zip_1', 'Zip_2', 'Address', 'City', 'State', 'Debt Amount',
+                       'Date Added', 'Lead Source', 'Direct Mail DID', 'Phone', 'Date', 'Queue', 'Trunk', 'Call Time',
+                       'Exit Reason', 'First Name', 'Last Name', 'Lead purchased', 'New_lead']
+
 
 def unzip_zipcode(pdr_file: pd.DataFrame) -> pd.DataFrame:
     pdr_file['Zip'] = pdr_file['Zip'].astype(str).str.zfill(9)
@@ -14,14 +21,13 @@ def unzip_zipcode(pdr_file: pd.DataFrame) -> pd.DataFrame:
 
 
 def add_description(given_df: pd.DataFrame) -> pd.DataFrame:
-    new_df = rf.read_csv_file(ConfigUtils.conf.path_status_description)
-    new_df = new_df.drop_duplicates(subset='Status', keep="last")
-    df = pd.merge(given_df, new_df, on='Status', how='left')
-    df = df.loc[:, ['UUID', 'gender', 'Status', 'Description', 'Customer_contacted_status',
-                    'Customer_intention', 'Mail_number', 'Calls_number', 'Zip_1', 'Zip_2', 'Address', 'City', 'State',
-                    'Debt Amount', 'Date Added', 'Lead Source', 'Direct Mail DID', 'Phone', 'Date', 'Queue', 'Trunk',
-                    'Call Time', 'Exit Reason', 'First Name', 'Last Name', 'Lead purchased', 'New_lead']]
-    return df
+    # The description of the Status is merged only if a later stage needs it (see read_planner)
+    if rp.is_required('add_description_df', 'Description'):
+        new_df = rf.read_csv_file(ConfigUtils.conf.path_status_description)
+        new_df = new_df.drop_duplicates(subset='Status', keep="last")
+        given_df = pd.merge(given_df, new_df, on='Status', how='left')
+    columns = [column for column in DESCRIPTION_COLUMNS if rp.is_required('add_description_df', column)]
+    return given_df.loc[:, columns]
 
 
 def format_description_dataset(conf: Config, logger: Logger):
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+import reusable_functions as rf
+from storage_backends import FeatherBackend, PickleBackend, is_arrow_lossless
+
+# A source file of a store: its kind (e.g. 'to_be_scored' or 'status') and its path
+SourceFile = Tuple[str, str]
+
+
+class IncrementalStore:
+    """
+    Keeps frames built from append-only source files in a directory, so that a run only reads and folds the files that
+    arrived since the last one (e.g. the prospect base of PROSPECT_BASE_PATH).
+
+    The manifest keeps the kind, the size, the modification time and the content hash of every processed file. When a
+    processed file changes or disappears, or the code that builds the frames changes, the frames are built again from
+    all the files. Every update writes its frames under a new generation and the manifest points to them, so an
+    interrupted run leaves the previous frames intact.
+    """
+
+    def __init__(self, directory: str, manifest_name: str, code_modules: Tuple[str, ...], identity: str = ''):
+        """
+        :param directory: Where the manifest and the frames are stored
+        :param manifest_name: The file name of the manifest
+        :param code_modules: The modules whose code builds the frames
+        :param identity: Anything else the frames depend on (e.g. the key columns)
+        """
+        self.directory = directory
+        self.manifest_name = manifest_name
+        self.code_modules = code_modules
+        self.identity = identity
+        self.manifest = self.read_manifest()
+
+    def read_manifest(self) -> dict:
+        path = os.path.join(self.directory, self.manifest_name)
+        if not os.path.exists(path):
+            return {'code': '', 'generation': 0, 'frames': {}, 'files': {}}
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def write_manifest(self):
+        path = os.path.join(self.directory, self.manifest_name)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(path + '.tmp', path)
+
+    def code_fingerprint(self) -> str:
+        sha = hashlib.sha256(self.identity.encode('utf-8'))
+        directory = os.path.dirname(os.path.abspath(__file__))
+        for module in self.code_modules:
+            with open(os.path.join(directory, f'{module}.py'), 'rb') as f:
+                sha.update(f.read())
+        return sha.hexdigest()
+
+    def file_is_unchanged(self, kind: str, path: str) -> bool:
+        # The content hash is computed again only when the size or the modification time of the file changes
+        processed = self.manifest['files'][path]
+        if processed['kind'] != kind or not os.path.exists(path):
+            return False
+        stat = os.stat(path)
+        if processed['size'] == stat.st_size and processed['mtime_ns'] == stat.st_mtime_ns:
+            return True
+        if rf.compute_file_fingerprint(path) != processed['sha256']:
+            return False
+        processed.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        return True
+
+    def needs_rebuild(self, files: List[SourceFile]) -> bool:
+        if self.manifest['code'] != self.code_fingerprint():
+            return True
+        if not all(os.path.exists(os.path.join(self.directory, name)) for name in self.manifest['frames'].values()):
+            return True
+        kinds = dict((path, kind) for kind, path in files)
+        return not all(path in kinds and self.file_is_unchanged(kinds[path], path) for path in self.manifest['files'])
+
+    def start(self, files: List[SourceFile]) -> bool:
+        """
+        Description: Forgets the processed files if the frames have to be built again
+        :param files: The kind and the path of every source file
+        :return: True if the frames have to be built from all the files, False if the stored ones can be read
+        """
+        if not self.needs_rebuild(files):
+            return False
+        self.manifest.update(code=self.code_fingerprint(), files={})
+        return True
+
+    def new_files(self, files: List[SourceFile]) -> List[SourceFile]:
+        return [(kind, path) for kind, path in files if path not in self.manifest['files']]
+
+    def is_processed(self, path: str) -> bool:
+        return os.path.abspath(path) in {os.path.abspath(processed) for processed in self.manifest['files']}
+
+    def record_file(self, kind: str, path: str, rows: int, **details):
+        stat = os.stat(path)
+        self.manifest['files'][path] = {'kind': kind, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                                        'sha256': rf.compute_file_fingerprint(path), 'rows': rows, **details}
+
+    def read_frame(self, name: str) -> pd.DataFrame:
+        file_name = self.manifest['frames'][name]
+        backend = FeatherBackend() if file_name.endswith(FeatherBackend.extension) else PickleBackend()
+        return backend.read(os.path.join(self.directory, file_name))
+
+    def write_frame(self, name: str, df: pd.DataFrame) -> str:
+        # Like the Excel cache, a frame that Arrow can not store exactly as it is (e.g. a column that mixes numbers and
+        # strings) is pickled
+        backend = FeatherBackend() if is_arrow_lossless(df) else PickleBackend()
+        file_name = f"{name}_{self.manifest['generation']}.{backend.extension}"
+        backend.write(df, os.path.join(self.directory, file_name))
+        return file_name
+
+    def write_frames(self, frames: Dict[str, pd.DataFrame]):
+        # The frames of the new generation are written before the manifest points to them, the previous ones after
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        previous_frames = list(self.manifest['frames'].values())
+        self.manifest['generation'] += 1
+        self.manifest['frames'] = {name: self.write_frame(name, df) for name, df in frames.items()}
+        self.write_manifest()
+        for file_name in previous_frames:
+            if os.path.exists(os.path.join(self.directory, file_name)):
+                os.remove(os.path.join(self.directory, file_name))
@@ -0,0 +1,66 @@
+from typing import Callable, List, Tuple
+
+import pandas as pd
+
+from incremental_store import IncrementalStore, SourceFile
+
+# The file (stored in the snapshot directory) that keeps the folded exports and the frame of the current snapshot
+MANIFEST_NAME = 'latest_snapshot_manifest.json'
+
+
+def latest_per_key(df: pd.DataFrame, key: str, order: str) -> pd.DataFrame:
+    """
+    Description: Keeps the latest record of every key, i.e. the row with the highest value of the order column (e.g. the
+    latest date of a call). Rows with the same value are told apart by their position, the last one wins, so folding a
+    later export into a snapshot gives the same rows as taking the latest records of all the exports at once. A row
+    without an order value is kept only when its key has no other row, and rows without a key are dropped.
+    :param df: The records, in the order they arrived
+    :param key: The column that identifies a record (e.g. Phone or DM Reference ID)
+    :param order: The column that orders the records of a key (e.g. Date or Date Added)
+    :return: A single row for every key
+    """
+    df = df.dropna(subset=[key])
+    # A stable sort keeps the rows of the same value in the order they arrived
+    return df.sort_values(order, kind='stable', na_position='first').drop_duplicates(subset=key, keep='last')
+
+
+class LatestSnapshot(IncrementalStore):
+    """
+    Keeps the latest record of every key of append-only exports (e.g. the Sabino status exports) in a directory, so
+    that a run only reads the exports that arrived since the last one and folds them into the stored snapshot with
+    latest_per_key.
+    """
+
+    def __init__(self, directory: str, key: str, order: str, code_modules: Tuple[str, ...]):
+        """
+        :param directory: Where the manifest and the snapshot are stored
+        :param key: The column that identifies a record
+        :param order: The column that orders the records of a key
+        :param code_modules: The modules that read and clean the exports, besides this one
+        """
+        super().__init__(directory, MANIFEST_NAME, code_modules + ('latest_snapshot', 'incremental_store'),
+                         identity=f'{key},{order}')
+        self.key = key
+        self.order = order
+
+    def update(self, files: List[SourceFile], read_file: Callable[[str, str], pd.DataFrame]) -> pd.DataFrame:
+        """
+        Description: Folds the exports that have not been processed yet into the snapshot
+        :param files: The kind and the path of every export, in the order they arrived
+        :param read_file: Reads and cleans an export, given its kind and its path
+        :return: The latest record of every key of all the exports
+        """
+        snapshot = None if self.start(files) else self.read_frame('snapshot')
+
+        new_files = self.new_files(files)
+        if new_files:
+            new_dfs = []
+            for kind, path in new_files:
+                new_dfs.append(read_file(kind, path))
+                self.record_file(kind, path, len(new_dfs[-1]))
+            snapshot = latest_per_key(pd.concat(([] if snapshot is None else [snapshot]) + new_dfs, ignore_index=True),
+                                      self.key, self.order).reset_index(drop=True)
+            self.write_frames({'snapshot': snapshot})
+        if snapshot is None:
+            raise ValueError("No exports to build the snapshot from")
+        return snapshot
@@ -0,0 +1,88 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# The bytes of '0'-'9', 'A'-'Z' and 'a'-'z' in ASCII/UTF-8
+DIGITS = (48, 57)
+UPPERCASE_LETTERS = (65, 90)
+LOWERCASE_LETTERS = (97, 122)
+
+# Separates the values while we filter their bytes, it can not be part of a value
+SEPARATOR = '\x00'
+
+
+def keep_bytes(series: pd.Series, ranges: list, pattern: str) -> pd.Series:
+    """
+    Description: Removes every character that is not in the given byte ranges from every value of a column at once.
+    The values are joined in a single buffer, numpy keeps the wanted bytes and the buffer is split back to values. A
+    character outside ASCII takes more than one byte in UTF-8, but all of them are >= 128, so it is dropped as a whole.
+    :param series: The column, every value is converted with str() first (NaN becomes 'nan'), as rf.keep_number does
+    :param ranges: The (first, last) byte ranges to keep
+    :param pattern: The equivalent regex of the characters to remove, used if a value contains the separator
+    :return: A column of strings with the same index
+    """
+    values = series.astype(str).tolist()
+    joined = SEPARATOR.join(values)
+    if joined.count(SEPARATOR) != max(len(values) - 1, 0):
+        return pd.Series([re.sub(pattern, '', value) for value in values], index=series.index, dtype=object)
+
+    buffer = np.frombuffer(joined.encode('utf-8'), dtype=np.uint8)
+    keep = buffer == ord(SEPARATOR)
+    for first, last in ranges:
+        keep |= (buffer >= first) & (buffer <= last)
+    kept = buffer[keep].tobytes().decode('ascii').split(SEPARATOR) if values else []
+    return pd.Series(kept, index=series.index, dtype=object)
+
+
+def digits_only(series: pd.Series) -> pd.Series:
+    # The column version of rf.keep_number: 39407-68469-A becomes 3940768469 and NaN becomes ''
+    return keep_bytes(series, [DIGITS], '[^0-9]')
+
+
+def letters_only(series: pd.Series) -> pd.Series:
+    # The column version of rf.keep_letters: 39407-68469-A becomes A
+    return keep_bytes(series, [UPPERCASE_LETTERS, LOWERCASE_LETTERS], '[^a-zA-Z]')
+
+
+def purl_reference_id(series: pd.Series) -> pd.Series:
+    """
+    Description: Some exports keep the PURL of the lead instead of its reference id, so we keep the last part of the URL
+    and then its digits (www.pdoffer.com/Sharon94954 becomes 94954). Values that are not strings become ''.
+    :param series: The 'DM Reference ID' column
+    :return: The reference ids
+    """
+    last_parts = [(value.rsplit('/', 1)[-1] or value) if isinstance(value, str) else np.nan for value in series]
+    return digits_only(pd.Series(last_parts, index=series.index, dtype=object))
+
+
+def trim_and_pad_phone_number(series: pd.Series) -> pd.Series:
+    """
+    Description: An 11-digit number starts with the country code, so we drop its first digit, and a number that lost its
+    leading zero is padded back to 10 digits (999999999 becomes 0999999999). The same as the regex/zfill steps that
+    final_preprocessing used to run.
+    :param series: The phone numbers
+    :return: The phone numbers as strings
+    """
+    # A single pass over the values is several times faster than chaining the .str methods
+    numbers = [(value[1:] if len(value) == 11 and value.isdecimal() else value).zfill(10)
+               for value in series.astype(str).tolist()]
+    return pd.Series(numbers, index=series.index, dtype=object)
+
+
+def mail_wave_number(series: pd.Series) -> pd.Series:
+    """
+    Description: The letter at the end of a reference id tells which mail wave the lead received (39407-68469-A is the
+    first and 39407-68469-B the second one)
+    :param series: The 'DM Reference ID' column
+    :return: 1 or 2 for each lead, or the letters of the id if they are not A or B
+    """
+    letters = letters_only(series)
+    return letters.mask(letters == 'A', 1).mask(letters == 'B', 2)
+
+
+def upper_case_text(series: pd.Series) -> pd.Series:
+    # Strips and upper cases the strings of a column (' John ' becomes 'JOHN'), the other values (NaN, numbers) are kept
+    strings = series.astype(object)
+    normalized = strings.str.strip().str.upper()
+    return normalized.where(normalized.notna(), strings)
@@ -1,35 +1,15 @@
 import glob
-import gender_guesser.detector as gender
+import composite_keys as ck
+import gender_inference as gi
 import numpy as np
 import pandas as pd
 import reusable_functions as rf
+import normalization as nz
 from dotenv import load_dotenv
 from Aggregate_data.config.config_utils import ConfigUtils
 from typing import Tuple
 
 
-def map_gender(g: str):
-    if g == 'mostly_female':
-        return 'female'
-    elif g == 'mostly_male':
-        return 'male'
-    else:
-        return g
-
-
-def create_gender_column(df: pd.DataFrame) -> pd.DataFrame:
-    # The difference between andy and unknown is that the former is found to have the same probability to be male than
-    # to be female, while the later means that the name wasn’t found in the database.
-    # create a gender detector object
-    detector = gender.Detector(case_sensitive=False)
-    detector._THRESHOLD_RATIO = 0.9
-    # apply the get_gender function to the 'First name' column and store the result in a new 'gender' column
-    # It needs this check --> isinstance because we take a float somewhere in First Name column
-    df['gender'] = df['First Name'].apply(
-        lambda x: map_gender(detector.get_gender(x)) if isinstance(x, str) else np.nan)
-    return df
-
-
 def create_mail_number_column(new_df: pd.DataFrame) -> pd.DataFrame:
     new_df = new_df.copy()
     # If we do not reset the index we will take an error
@@ -38,9 +18,7 @@ def create_mail_number_column(new_df: pd.DataFrame) -> pd.DataFrame:
     # the number of emails that each lead has received.
     new_df = new_df.drop_duplicates(subset=['DM Reference ID', 'Zip'], keep='last')
     # Create the new column (Mail_number) based on the letter in 'DM Reference ID'
-    new_df['Mail_number'] = new_df['DM Reference ID'].apply(lambda x: rf.keep_letters(x))
-    new_df.loc[new_df["Mail_number"] == "A", "Mail_number"], new_df.loc[
-        new_df["Mail_number"] == "B", "Mail_number"] = 1, 2
+    new_df['Mail_number'] = nz.mail_wave_number(new_df['DM Reference ID'])
     return new_df
 
 
@@ -51,7 +29,7 @@ def clear_dataset(df1: pd.DataFrame, df2: pd.DataFrame) -> Tuple[pd.DataFrame, p
     for df in list1:
         df.drop(['Status'], axis=1, inplace=True)
         df = create_mail_number_column(df)
-        df['DM Reference ID'] = df['DM Reference ID'].apply(lambda x: rf.keep_number(x))
+        df['DM Reference ID'] = nz.digits_only(df['DM Reference ID'])
         df.drop_duplicates(subset=['DM Reference ID', 'Zip'], keep='last')
         df['DM Reference ID'].replace('', np.nan, inplace=True)
         df.dropna(subset=['DM Reference ID'], inplace=True)
@@ -67,8 +45,7 @@ def concatenate_dataframes(df1: pd.DataFrame, df2: pd.DataFrame) -> pd.DataFrame
     result = pd.concat(frames, axis=0)
     # This column drop duplicates with the same values in columns 'DM Reference ID', 'Zip'
     # by keeping the max value of Mail_number column
-    result = result.sort_values(by=['Mail_number'], ascending=False).drop_duplicates(subset=['DM Reference ID', 'Zip'],
-                                                                                     keep='first')
+    result = ck.drop_duplicate_keys(result, ['DM Reference ID', 'Zip'], priority='Mail_number')
     return result
 
 
@@ -86,7 +63,7 @@ def format_pdr_file_dataset():
     # Loop through all the Excel files found
     for file in glob.glob(path, recursive=True):
         # Check if Sheet4 exists in the Excel file
-        if 'Sheet4' in pd.ExcelFile(file).sheet_names:
+        if 'Sheet4' in rf.read_excel_sheet_names(file):
             # Read the Excel file with sheet_name='Sheet4'
             df = rf.read_excel_files(file, 'Sheet4')
             # Check if the sheet is empty
@@ -104,15 +81,15 @@ def format_pdr_file_dataset():
 
     # Concatenate all the dataframes into a single dataframe
     pdr_df = pd.concat(pdr_dfs, axis=0, ignore_index=True)
-    pdr_df = create_gender_column(pdr_df)
+    pdr_df = gi.create_gender_column(pdr_df, 'First Name')
     pdr_df = create_mail_number_column(pdr_df)
     pdr_df = pdr_df.drop(['Status'], axis=1)
     pdr_df = pdr_df.drop_duplicates(subset=['DM Reference ID', 'Zip'], keep='last')
-    pdr_df['DM Reference ID'] = pdr_df['DM Reference ID'].apply(lambda x: rf.keep_number(x))
+    pdr_df['DM Reference ID'] = nz.digits_only(pdr_df['DM Reference ID'])
     pdr_df['DM Reference ID'].replace('', np.nan, inplace=True)
     pdr_df.dropna(subset=['DM Reference ID'], inplace=True)
     pdr_df = rf.check_number_of_digits(pdr_df)
-    pdr_df = pdr_df.sort_values(by=['Mail_number'], ascending=False).drop_duplicates(subset=['DM Reference ID', 'Zip'],
-                                                                                     keep='first')
+    # Keeps the row with the max value of Mail_number for each 'DM Reference ID', 'Zip'
+    pdr_df = ck.drop_duplicate_keys(pdr_df, ['DM Reference ID', 'Zip'], priority='Mail_number')
     rf.store_df_in_pickle_format(ConfigUtils.conf, initial_pdr_merged_df=pdr_df)
 
@@ -0,0 +1,515 @@
+import ast
+import glob
+import hashlib
+import importlib
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, NamedTuple, Tuple
+
+import reusable_functions as rf
+import dataset_writer as dw
+from telemetry import StageTelemetry, skipped_stage_metrics
+from pipeline_context import PipelineContext
+from storage_backends import intermediate_path
+from logger import Logger
+from Aggregate_data.config.__init__ import Config
+
+# The name of the file (stored next to the pickle files) that keeps the fingerprints of the last successful run
+MANIFEST_NAME = 'pipeline_manifest.json'
+
+# Every stage also depends on the helpers it shares with the other stages. The modules a stage imports, directly or
+# through other modules, are found from their source (see stage_code_modules).
+SHARED_MODULES = ['reusable_functions', 'storage_backends', 'csv_schemas', 'schema_registry', 'composite_keys',
+                  'dataset_writer', 'normalization']
+
+# The Config attributes of the partition spec and the format of an output written with dw.write_dataset in a layout
+# other than a single CSV (see dw.dataset_exists)
+OUTPUT_LAYOUTS = {'path_final_dataset': ('final_dataset_partition_by', 'final_dataset_format')}
+
+
+class Stage(NamedTuple):
+    """
+    A single step of the procedure that builds the final dataset.
+    name: A unique name for the stage
+    module: The module that contains the function of the stage
+    function: The function that runs the stage
+    arguments: Which of ('conf', 'logger') the function expects, in the order it expects them
+    inputs: The Config attributes that hold the source files (or glob patterns) the stage reads
+    reads: The names of the pickle files the stage reads
+    writes: The names of the pickle files the stage writes
+    outputs: The Config attributes that hold any other file the stage writes
+    settings: The Config attributes, other than paths, that change what the stage produces
+    helpers: The other modules of the repository the stage uses, so that a change in them invalidates the stage. The
+    modules it imports are found from the source, so only the ones loaded by name (e.g. with importlib) have to be
+    listed.
+    """
+    name: str
+    module: str
+    function: str
+    arguments: Tuple[str, ...] = ()
+    inputs: Tuple[str, ...] = ()
+    reads: Tuple[str, ...] = ()
+    writes: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    settings: Tuple[str, ...] = ()
+    helpers: Tuple[str, ...] = ()
+
+
+# The stages in the order get_final_dataset used to call them. Any order that respects the reads/writes below is valid.
+STAGES = [
+    Stage('clear_opt_out_list', 'clear_opt_out_list_and_remove_opt_out_prospects', 'clear_opt_out_list',
+          inputs=('path_opt_out_list',),
+          writes=('opt_out_reference_ids', 'opt_out_name_keys'),
+          helpers=('suppression_index',)),
+    Stage('format_umg_datasets', 'unify_and_clear_prospect_datasets', 'format_umg_datasets',
+          inputs=('prospect_fullname_path', 'prospects_to_be_scored_path', 'prospect_path'),
+          writes=('initial_prospects_df',),
+          outputs=('path_to_store_duplicates_to_score',),
+          settings=('prospect_incremental',),
+          helpers=('gender_inference', 'prospect_base', 'incremental_store')),
+    Stage('remove_prospects_without_reference_id', 'clear_opt_out_list_and_remove_opt_out_prospects',
+          'remove_prospects_without_reference_id', arguments=('conf', 'logger'),
+          reads=('opt_out_name_keys', 'initial_prospects_df'),
+          writes=('prospects_df',),
+          outputs=('path_to_leads_without_id_that_need_to_be_excluded',),
+          helpers=('suppression_index',)),
+    Stage('format_pdr_file_dataset', 'pdr_file_preprocessing', 'format_pdr_file_dataset',
+          inputs=('pdr_files_path',),
+          writes=('initial_pdr_merged_df',),
+          helpers=('gender_inference',)),
+    Stage('remove_prospects_with_reference_id', 'clear_opt_out_list_and_remove_opt_out_prospects',
+          'remove_prospects_with_reference_id', arguments=('conf', 'logger'),
+          reads=('initial_pdr_merged_df', 'opt_out_reference_ids'),
+          writes=('pdr_merged_df',),
+          outputs=('path_to_leads_with_id_that_need_to_be_excluded',),
+          helpers=('suppression_index',)),
+    Stage('helper_concatenation_function', 'unify_prospects_pdr_dataframes', 'helper_concatenation_function',
+          arguments=('conf', 'logger'),
+          reads=('prospects_df', 'pdr_merged_df'),
+          writes=('prospects_pdr_files', 'lead_reference_lookup')),
+    Stage('format_status_dataset', 'status_preprocessing', 'format_status_dataset', arguments=('conf', 'logger'),
+          inputs=('path_status', 'path_phone_20230308', 'path_status_taxonomy'),
+          reads=('prospects_pdr_files', 'lead_reference_lookup'),
+          writes=('add_status_df',),
+          settings=('status_incremental',),
+          helpers=('status_taxonomy', 'latest_snapshot', 'incremental_store', 'read_planner')),
+    Stage('format_call_center_dataset', 'unify_and_clean_call_center_datasets', 'format_call_center_dataset',
+          arguments=('logger',),
+          inputs=('call_center_path', 'call_center_inbound_path'),
+          outputs=('path_final_call_center',),
+          helpers=('call_center_report_parser', 'excel_cache')),
+    Stage('aggregate_call_center_activity', 'call_activity', 'aggregate_call_center_activity',
+          arguments=('conf', 'logger'),
+          inputs=('path_final_call_center',),
+          writes=('call_activity',),
+          settings=('call_activity_incremental', 'call_activity_exit_reasons'),
+          helpers=('incremental_store',)),
+    Stage('format_phone_trunk_dataset', 'phone_and_trunk_preprocessing', 'format_phone_trunk_dataset',
+          arguments=('conf', 'logger'),
+          inputs=('path_phone', 'path_final_call_center', 'path_status_taxonomy'),
+          reads=('add_status_df', 'lead_reference_lookup'),
+          writes=('add_phone_and_trunk_df',),
+          helpers=('status_taxonomy', 'latest_snapshot', 'read_planner')),
+    Stage('format_description_dataset', 'handle_zip_code', 'format_description_dataset', arguments=('conf', 'logger'),
+          inputs=('path_status_description',),
+          reads=('add_phone_and_trunk_df',),
+          writes=('add_description_df',),
+          helpers=('read_planner',)),
+    Stage('format_purl_responders', 'unify_and_clear_purl_responder_datasets', 'format_purl_responders',
+          arguments=('logger',),
+          inputs=('purl_responders_1022_0123_path',),
+          writes=('purl_responders',),
+          helpers=('gender_inference',)),
+    Stage('format_external_dataset', 'external_dataset_added', 'format_external_dataset',
+          arguments=('conf', 'logger'),
+          inputs=('path_to_us_census_bureau_3rd_party_data',),
+          reads=('add_description_df',),
+          writes=('add_us_census_bureau_df',),
+          helpers=('read_planner', 'feature_store', 'incremental_store')),
+    Stage('make_final_modifications', 'rename_drop_columns', 'make_final_modifications',
+          arguments=('conf', 'logger'),
+          reads=('add_us_census_bureau_df', 'purl_responders', 'lead_reference_lookup', 'call_activity'),
+          writes=('final_df_stage_one',),
+          helpers=('call_activity', 'read_planner')),
+    Stage('add_external_features', 'feature_enrichment', 'add_external_features', arguments=('conf', 'logger'),
+          inputs=('path_debt_in_america_june_2022_auto', 'path_debt_in_america_june_2022_delinquency',
+                  'path_debt_in_america_june_2022_medical', 'path_debt_in_america_june_2022_student',
+                  'path_to_df_matching_zipcodes_to_geoids', 'path_to_store_census_2010_df',
+                  'path_to_store_census_2017_2021_df', 'path_to_store_census_deluxe_df',
+                  'path_to_store_census_place_fips_df', 'path_federal_reserve_bank_philadelphia'),
+          reads=('final_df_stage_one',),
+          outputs=('path_final_dataset',),
+          settings=('number_of_features', 'final_dataset_partition_by', 'final_dataset_format'),
+          helpers=('feature_store', 'incremental_store', 'handle_debt_in_america', 'census_deluxe_business',
+                   'federal_reserve_bank_philadelphia')),
+]
+
+
+def find_stage_dependencies(stages: List[Stage]) -> Dict[str, List[str]]:
+    """
+    Description: A stage depends on every stage that writes a pickle it reads or a file it takes as input
+    :param stages: The stages of the pipeline
+    :return: A dictionary that maps each stage name to the names of the stages it depends on
+    """
+    producers = {}
+    for stage in stages:
+        for name in stage.writes + stage.outputs:
+            producers[name] = stage.name
+
+    dependencies = {}
+    for stage in stages:
+        upstream = [producers[name] for name in stage.reads + stage.inputs if name in producers]
+        dependencies[stage.name] = sorted(set(upstream) - {stage.name})
+    return dependencies
+
+
+def count_stage_readers(stages: List[Stage]) -> Dict[str, int]:
+    """
+    :param stages: The stages of the pipeline
+    :return: A dictionary that maps each pickle name to the number of stages that read it
+    """
+    readers = {}
+    for stage in stages:
+        for name in stage.reads:
+            readers[name] = readers.get(name, 0) + 1
+    return readers
+
+
+def read_manifest(conf: Config) -> dict:
+    path = os.path.join(conf.path_to_store_pickle_files, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {'stages': {}, 'files': {}}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def write_manifest(conf: Config, manifest: dict):
+    if not os.path.exists(conf.path_to_store_pickle_files):
+        os.makedirs(conf.path_to_store_pickle_files)
+    path = os.path.join(conf.path_to_store_pickle_files, MANIFEST_NAME)
+    # Write to a temporary file first, so that an interrupted run does not leave a broken manifest behind
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def fingerprint_file(path: str, manifest: dict) -> str:
+    """
+    Description: Hashing the content of every Excel/CSV file on every run would cost a lot of time for nothing, so we
+    keep the content hash of each file in the manifest and compute it again only when the size or the modification time
+    of the file changes.
+    :param path: The path of the file
+    :param manifest: The manifest of the previous run, it is updated with the new hash
+    :return: The content hash of the file
+    """
+    stat = os.stat(path)
+    cached = manifest['files'].get(path)
+    if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+        return cached['sha256']
+
+    sha256 = rf.compute_file_fingerprint(path)
+    manifest['files'][path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}
+    return sha256
+
+
+def imported_modules(directory: str, module: str) -> List[str]:
+    # The modules of the repository that a module imports, read from its source
+    with open(os.path.join(directory, f'{module}.py'), 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    names = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.append(node.module)
+    return [name for name in names if os.path.exists(os.path.join(directory, f'{name}.py'))]
+
+
+def stage_code_modules(stage: Stage) -> List[str]:
+    """
+    Description: The modules whose code the stage runs: its module, its helpers, the shared modules and every module of
+    the repository they import, directly or through other modules (e.g. status_preprocessing imports
+    phone_and_trunk_preprocessing, and reusable_functions imports excel_cache)
+    :param stage: The stage
+    :return: The names of the modules, sorted
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    modules = set()
+    pending = [stage.module] + list(stage.helpers) + SHARED_MODULES
+    while pending:
+        module = pending.pop()
+        if module not in modules:
+            modules.add(module)
+            pending.extend(imported_modules(directory, module))
+    return sorted(modules)
+
+
+def fingerprint_code(stage: Stage) -> str:
+    # We read the source files instead of importing the modules, because importing them has side effects
+    # (e.g. every module builds ConfigUtils.conf)
+    sha = hashlib.sha256()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for module in stage_code_modules(stage):
+        with open(os.path.join(directory, f'{module}.py'), 'rb') as f:
+            sha.update(f.read())
+    sha.update(stage.function.encode('utf-8'))
+    return sha.hexdigest()
+
+
+def fingerprint_stage(conf: Config, stage: Stage, dependencies: List[str], fingerprints: Dict[str, str],
+                      manifest: dict) -> str:
+    """
+    Description: The fingerprint of a stage changes when its code, one of its input files or the fingerprint of a
+    stage it depends on changes. This way a change in a source file invalidates every stage downstream of it.
+    :param conf: conf = Config(debug_mode=True)
+    :param stage: The stage we want to fingerprint
+    :param dependencies: The names of the stages this stage depends on
+    :param fingerprints: The fingerprints of the stages computed so far in this run, and the last fingerprints of the
+    upstream stages that are not part of the run
+    :param manifest: The manifest of the previous run
+    :return: The sha256 hex digest of everything the stage depends on
+    """
+    sha = hashlib.sha256()
+    sha.update(fingerprint_code(stage).encode('utf-8'))
+
+    for attribute in stage.inputs:
+        pattern = getattr(conf, attribute)
+        sha.update(f'{attribute}={pattern}'.encode('utf-8'))
+        for path in sorted(glob.glob(pattern, recursive=True)):
+            if os.path.isfile(path):
+                sha.update(f'{path}:{fingerprint_file(path, manifest)}'.encode('utf-8'))
+
+    for attribute in stage.settings:
+        sha.update(f'{attribute}={getattr(conf, attribute)}'.encode('utf-8'))
+
+    for name in dependencies:
+        sha.update(f'{name}:{fingerprints[name]}'.encode('utf-8'))
+
+    return sha.hexdigest()
+
+
+def stage_results_exist(conf: Config, stage: Stage) -> bool:
+    pickles = [intermediate_path(conf, name) for name in stage.writes]
+    files = [(getattr(conf, attribute), [getattr(conf, setting) for setting in OUTPUT_LAYOUTS.get(attribute, ())])
+             for attribute in stage.outputs]
+    return all(os.path.exists(path) for path in pickles) and all(dw.dataset_exists(path, *layout)
+                                                                  for path, layout in files)
+
+
+def stage_is_up_to_date(conf: Config, stage: Stage, fingerprint: str, manifest: dict, force: bool) -> bool:
+    return not force and manifest['stages'].get(stage.name) == fingerprint and stage_results_exist(conf, stage)
+
+
+def stored_results_are_current(conf: Config, name: str) -> bool:
+    """
+    Description: Whether the stored results of a stage are the ones it would produce now from its input files, code and
+    settings, so that a tool outside the pipeline (e.g. screen_to_be_scored) can reuse them. The stages it depends on
+    are taken as the last run recorded them.
+    :param conf: conf = Config(debug_mode=True)
+    :param name: The name of the stage
+    :return: True if the manifest has the current fingerprint of the stage and its results exist
+    """
+    stage = next(stage for stage in STAGES if stage.name == name)
+    dependencies = find_stage_dependencies(STAGES)[name]
+    manifest = read_manifest(conf)
+    if any(dependency not in manifest['stages'] for dependency in dependencies):
+        return False
+    fingerprint = fingerprint_stage(conf, stage, dependencies, manifest['stages'], manifest)
+    return stage_is_up_to_date(conf, stage, fingerprint, manifest, force=False)
+
+
+def stage_results_were_written(stage: Stage) -> bool:
+    # With PIPELINE_CHECKPOINT=false the dataframes of an in memory run are only passed on in memory
+    context = PipelineContext.current
+    return context is None or context.checkpoint or not stage.writes
+
+
+def record_stage(conf: Config, manifest: dict, stage: Stage, fingerprint: str, written: bool):
+    """
+    Description: Records the fingerprint of a finished stage in the manifest, so that the next run can skip it. A stage
+    whose dataframes were not written to disk is not recorded, and the intermediate files an older run left behind are
+    removed, since they do not hold what the stage produced this time.
+    :param conf: conf = Config(debug_mode=True)
+    :param manifest: The manifest of the run
+    :param stage: The stage that finished
+    :param fingerprint: Its fingerprint
+    :param written: Whether its dataframes were written to disk
+    """
+    if written:
+        manifest['stages'][stage.name] = fingerprint
+    else:
+        manifest['stages'].pop(stage.name, None)
+        for name in stage.writes:
+            if os.path.exists(intermediate_path(conf, name)):
+                os.remove(intermediate_path(conf, name))
+    write_manifest(conf, manifest)
+
+
+def run_stage(stage: Stage, conf: Config, logger: Logger, trace_memory: bool = False) -> dict:
+    """
+    :param stage: The stage to run
+    :param conf: conf = Config(debug_mode=True)
+    :param logger: The logger of the procedure
+    :param trace_memory: If True the telemetry of the stage includes the tracemalloc peak
+    :return: The telemetry of the stage
+    """
+    module = importlib.import_module(stage.module)
+    function = getattr(module, stage.function)
+    available_arguments = {'conf': conf, 'logger': logger}
+    with StageTelemetry(stage.name, trace_memory) as telemetry:
+        function(*[available_arguments[argument] for argument in stage.arguments])
+    return telemetry.metrics
+
+
+def run_stage_in_worker(stage: Stage, conf: Config, trace_memory: bool) -> dict:
+    # The dataframes of a worker can not reach the other processes through memory, so the workers always exchange
+    # them through the disk
+    PipelineContext.current = None
+    # Loggers can not be shared between processes, each worker logs through its own root logger
+    return run_stage(stage, conf, logging.getLogger(), trace_memory)
+
+
+def run_stages_in_order(conf: Config, logger: Logger, stages: List[Stage], dependencies: Dict[str, List[str]],
+                        fingerprints: Dict[str, str], manifest: dict, force: bool, trace_memory: bool) -> List[dict]:
+    metrics = []
+
+    for stage in stages:
+        fingerprint = fingerprint_stage(conf, stage, dependencies[stage.name], fingerprints, manifest)
+        fingerprints[stage.name] = fingerprint
+
+        if stage_is_up_to_date(conf, stage, fingerprint, manifest, force):
+            logger.info(f"Skip stage {stage.name}, its inputs and code have not changed")
+            metrics.append(skipped_stage_metrics(stage.name))
+            continue
+
+        logger.info(f"Run stage {stage.name}")
+        metrics.append(run_stage(stage, conf, logger, trace_memory))
+        # Store the manifest after every stage, so that a failed run does not have to repeat the finished stages
+        record_stage(conf, manifest, stage, fingerprint, stage_results_were_written(stage))
+
+    return metrics
+
+
+def run_stages_in_parallel(conf: Config, logger: Logger, stages: List[Stage], dependencies: Dict[str, List[str]],
+                           fingerprints: Dict[str, str], manifest: dict, force: bool, workers: int,
+                           trace_memory: bool) -> List[dict]:
+    """
+    Description: Submits every stage to a process pool as soon as all the stages it depends on have finished, so the
+    duration of the run is close to the duration of the longest chain of dependent stages.
+    The fingerprint of a stage is computed only when it becomes ready, because it may take as input a file that an
+    upstream stage has just written (e.g. path_final_call_center).
+    :param conf: conf = Config(debug_mode=True)
+    :param logger: The logger of the procedure
+    :param stages: The stages to run
+    :param dependencies: The names of the stages each stage depends on
+    :param fingerprints: The last fingerprints of the upstream stages that are not part of the run
+    :param manifest: The manifest of the previous run
+    :param force: If True every stage runs, whatever its fingerprint is
+    :param workers: The maximum number of stages that run at the same time
+    :param trace_memory: If True the telemetry of each stage includes the tracemalloc peak
+    :return: The telemetry of each stage, in the order the stages finished
+    """
+    pending = {stage.name: stage for stage in stages}
+    # The upstream stages that are not part of the run count as finished, their results are already on disk
+    finished = set(fingerprints)
+    running = {}
+    metrics = []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while pending or running:
+            # Skipping a stage may make other stages ready, so we keep looking until nothing changes
+            progress = True
+            while progress:
+                progress = False
+                for name, stage in list(pending.items()):
+                    if not all(dependency in finished for dependency in dependencies[name]):
+                        continue
+                    del pending[name]
+                    progress = True
+                    fingerprint = fingerprint_stage(conf, stage, dependencies[name], fingerprints, manifest)
+                    fingerprints[name] = fingerprint
+                    if stage_is_up_to_date(conf, stage, fingerprint, manifest, force):
+                        logger.info(f"Skip stage {name}, its inputs and code have not changed")
+                        metrics.append(skipped_stage_metrics(name))
+                        finished.add(name)
+                        continue
+                    logger.info(f"Run stage {name}")
+                    running[executor.submit(run_stage_in_worker, stage, conf, trace_memory)] = (stage, fingerprint)
+
+            if not running:
+                if pending:
+                    raise ValueError(f"The stages {sorted(pending)} depend on stages that are not part of the run")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, fingerprint = running.pop(future)
+                # Raises the exception of the stage, if any. The stages that are still running finish before the
+                # executor shuts down, but no new stage is submitted.
+                metrics.append(future.result())
+                logger.info(f"Finished stage {stage.name}")
+                finished.add(stage.name)
+                # The workers always write their dataframes to disk (see run_stage_in_worker)
+                record_stage(conf, manifest, stage, fingerprint, written=True)
+
+    return metrics
+
+
+def run_pipeline(conf: Config, logger: Logger, stages: List[Stage] = None, force: bool = False, workers: int = 1,
+                 trace_memory: bool = False) -> List[dict]:
+    """
+    Description: Runs the stages of the pipeline and skips every stage whose fingerprint is the same as in the previous
+    successful run and whose results are still on disk.
+    :param conf: conf = Config(debug_mode=True)
+    :param logger: The logger of the procedure
+    :param stages: The stages to run, by default all the stages of the pipeline
+    :param force: If True every stage runs, whatever its fingerprint is
+    :param workers: If more than 1, independent stages run at the same time in a pool of that many processes
+    :param trace_memory: If True the telemetry of each stage includes the tracemalloc peak (it slows the stages
+    down several times)
+    :return: The telemetry of each stage
+    """
+    stages = STAGES if stages is None else stages
+    # The dependencies are found over the whole pipeline, so that a stage has the same fingerprint whether it runs
+    # alone or as part of a full run
+    dependencies = find_stage_dependencies(STAGES + [stage for stage in stages if stage not in STAGES])
+    manifest = read_manifest(conf)
+
+    # The upstream stages that are not part of the run take the fingerprint of their last successful run
+    selected = {stage.name for stage in stages}
+    upstream = {name for stage in stages for name in dependencies[stage.name]} - selected
+    fingerprints = {}
+    for name in sorted(upstream):
+        if name not in manifest['stages']:
+            logger.warning(f"Stage {name} is not part of the run and has never run, the stages that depend on it "
+                           f"will not find its results")
+        fingerprints[name] = manifest['stages'].get(name, '')
+
+    if workers > 1:
+        return run_stages_in_parallel(conf, logger, stages, dependencies, fingerprints, manifest, force, workers,
+                                      trace_memory)
+    return run_stages_in_order(conf, logger, stages, dependencies, fingerprints, manifest, force, trace_memory)
+
+
+def select_stages(names: List[str] = None, first: str = None, last: str = None) -> List[Stage]:
+    """
+    Description: Selects a part of the pipeline, either some stages by name or the stages from first to last
+    :param names: The names of the stages to run
+    :param first: The name of the first stage to run, by default the first stage of the pipeline
+    :param last: The name of the last stage to run, by default the last stage of the pipeline
+    :return: The selected stages, in the order of STAGES
+    """
+    positions = {stage.name: position for position, stage in enumerate(STAGES)}
+    for name in (names or []) + [name for name in (first, last) if name]:
+        if name not in positions:
+            raise ValueError(f"Unknown stage {name}, the stages are {list(positions)}")
+
+    if names:
+        return [stage for stage in STAGES if stage.name in names]
+    start = positions[first] if first else 0
+    end = positions[last] if last else len(STAGES) - 1
+    if start > end:
+        raise ValueError(f"Stage {first} comes after stage {last}")
+    return STAGES[start:end + 1]
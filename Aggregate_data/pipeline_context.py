@@ -0,0 +1,53 @@
+from typing import Dict, Optional
+
+import pandas as pd
+
+
+class PipelineContext:
+    """
+    Keeps the dataframes that the stages exchange in memory, so that a stage does not have to unpickle what the previous
+    stage has just pickled. rf.store_df_in_pickle_format and rf.read_df_from_pickle_format go through the active
+    context, so the stages do not need to know whether their dataframes live in memory or on disk.
+
+    A dataframe is handed to its last reader as is and dropped from the context, so that we never hold two copies of
+    it. Every other reader takes a copy, because some stages modify the dataframes they read.
+    """
+    current = None
+
+    def __init__(self, readers: Dict[str, int], in_memory: bool = True, checkpoint: bool = True):
+        """
+        :param readers: The number of stages that read each dataframe
+        :param in_memory: If False the context does nothing and every dataframe goes through the disk
+        :param checkpoint: If True the dataframes are also written to disk, so that a later run can skip the stages
+        that have not changed
+        """
+        self.remaining_readers = dict(readers)
+        self.in_memory = in_memory
+        # Without the memory the disk is the only way to pass a dataframe to the next stage
+        self.checkpoint = checkpoint or not in_memory
+        self.frames = {}
+
+    def __enter__(self):
+        PipelineContext.current = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        PipelineContext.current = None
+        self.frames.clear()
+
+    def put(self, name: str, df: pd.DataFrame):
+        if self.in_memory:
+            self.frames[name] = df
+
+    def take(self, name: str) -> Optional[pd.DataFrame]:
+        """
+        :param name: The name of the dataframe
+        :return: The dataframe, or None if it is not in memory (e.g. it was written by a stage that has been skipped)
+        """
+        if name not in self.frames:
+            return None
+
+        self.remaining_readers[name] = self.remaining_readers.get(name, 0) - 1
+        if self.remaining_readers[name] > 0:
+            return self.frames[name].copy()
+        return self.frames.pop(name)
@@ -0,0 +1,169 @@
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import composite_keys as ck
+from incremental_store import IncrementalStore, SourceFile
+
+# A prospect file: its kind ('fullname', 'to_be_scored' or 'prospect') and its path
+ProspectFile = SourceFile
+
+# The file (stored in the base directory) that keeps the processed files and the frames of the current base
+MANIFEST_NAME = 'prospect_base_manifest.json'
+
+# The column of the base that keeps the hash of the dedup key of every prospect
+KEY_COLUMN = 'prospect_key'
+
+TO_BE_SCORED = 'to_be_Scored'
+
+# The base is built by the code of these modules, a change in any of them means it has to be built again. The
+# prospect files are read with reusable_functions (see unify_and_clear_prospect_datasets.read_prospect_file).
+CODE_MODULES = ('unify_and_clear_prospect_datasets', 'prospect_base', 'incremental_store', 'composite_keys',
+                'reusable_functions')
+
+
+def select_prospects(keys: np.ndarray, to_be_scored: np.ndarray) -> np.ndarray:
+    """
+    Description: The dedup rule of the prospects. A prospect that appears once is kept. A prospect that appears more
+    than once keeps only its 'to_be_Scored' rows, and if it still has more than one row, the first of them.
+    :param keys: The dedup key of every row (the codes of ck.composite_key)
+    :param to_be_scored: True for the rows of the 'To Be Scored' files
+    :return: A boolean mask of the kept rows
+    """
+    keep = np.flatnonzero((ck.key_counts(keys) == 1) | to_be_scored)
+    selected = np.zeros(len(keys), dtype=bool)
+    selected[keep[ck.first_of_each_key(keys[keep])]] = True
+    return selected
+
+
+def prospect_keys(df: pd.DataFrame, key_columns: List[str]) -> np.ndarray:
+    """
+    Description: The dedup key of every prospect as a hash that stays the same across runs, so that the keys of the
+    stored base can be compared with the keys of the new files. A number is hashed as a float, so that a debt read as
+    5000 from one file and as 5000.0 from another gives the same key, as it does when the files are concatenated.
+    :param df: The prospects
+    :param key_columns: The columns of the dedup key
+    :return: A uint64 hash for every row
+    """
+    normalized = pd.DataFrame({column: df[column].astype(np.float64) if pd.api.types.is_numeric_dtype(df[column])
+                               else df[column].astype(object) for column in key_columns})
+    return ck.hash_key(normalized, key_columns)
+
+
+def is_to_be_scored(df: pd.DataFrame) -> np.ndarray:
+    return (df['New_lead'] == TO_BE_SCORED).to_numpy(dtype=bool)
+
+
+def merge_prospects(base: Optional[pd.DataFrame], counts: pd.Series, duplicates_to_score: Optional[pd.DataFrame],
+                    new_df: pd.DataFrame, key_columns: List[str]) -> Tuple[pd.DataFrame, pd.Series, pd.DataFrame]:
+    """
+    Description: Adds the prospects of the new files to the deduplicated base with the rules of select_prospects, as if
+    the new files were concatenated after the files of the base. Only the keys of the new rows are looked up, so the
+    cost grows with the new files and not with the base.
+    :param base: The kept prospects of the processed files, with their KEY_COLUMN (None when there are none)
+    :param counts: The number of rows of every key in the processed files, indexed by the key
+    :param duplicates_to_score: The 'to_be_Scored' rows of the keys that appear more than once (None when there are
+    no processed files)
+    :param new_df: The prospects of the new files
+    :param key_columns: The columns of the dedup key
+    :return: The new base, counts and duplicates_to_score
+    """
+    if base is None:
+        base = new_df.iloc[:0].assign(**{KEY_COLUMN: np.array([], dtype=np.uint64)})
+        duplicates_to_score = new_df.iloc[:0]
+    if new_df.empty:
+        return base, counts, duplicates_to_score
+    new_keys = prospect_keys(new_df, key_columns)
+    new_to_be_scored = is_to_be_scored(new_df)
+
+    # The number of rows of every key of the new files, before and after them
+    unique_keys, new_counts = np.unique(new_keys, return_counts=True)
+    old_counts = counts.reindex(unique_keys, fill_value=0).to_numpy(dtype=np.int64)
+    total_counts = old_counts + new_counts
+    row_totals = total_counts[np.searchsorted(unique_keys, new_keys)]
+
+    # The prospects of the base that the new files duplicate
+    base_keys = base[KEY_COLUMN].to_numpy(dtype=np.uint64)
+    base_to_be_scored = is_to_be_scored(base)
+    positions = np.minimum(np.searchsorted(unique_keys, base_keys), len(unique_keys) - 1)
+    duplicated = unique_keys[positions] == base_keys
+    # A kept row that is not to be scored appeared once, so it is dropped now that its key appears again
+    removed = duplicated & ~base_to_be_scored
+    newly_duplicated = duplicated & base_to_be_scored & (old_counts[positions] == 1)
+
+    # The new rows whose key appears once, and the first 'to_be_Scored' row of the keys the base does not keep
+    kept_keys = base_keys[~removed]
+    candidates = (row_totals == 1) | (new_to_be_scored & ~np.isin(new_keys, kept_keys))
+    selected = np.zeros(len(new_df), dtype=bool)
+    candidate_positions = np.flatnonzero(candidates)
+    selected[candidate_positions[ck.first_of_each_key(new_keys[candidate_positions])]] = True
+
+    duplicates_to_score = pd.concat([duplicates_to_score, base[newly_duplicated].drop(columns=[KEY_COLUMN]),
+                                     new_df[new_to_be_scored & (row_totals > 1)]], ignore_index=True)
+    base = pd.concat([base[~removed], new_df[selected].assign(**{KEY_COLUMN: new_keys[selected]})],
+                     ignore_index=True)
+    counts = counts.add(pd.Series(new_counts, index=unique_keys), fill_value=0).astype(np.int64)
+    return base, counts, duplicates_to_score
+
+
+def empty_counts() -> pd.Series:
+    return pd.Series([], index=pd.Index([], dtype=np.uint64), dtype=np.int64)
+
+
+class ProspectBase(IncrementalStore):
+    """
+    Keeps the deduplicated prospects of the files processed so far in PROSPECT_BASE_PATH, with the number of rows of
+    every dedup key (the key index) and the 'to_be_Scored' duplicates, so that a run only reads and merges the prospect
+    files that arrived since the last one. The manifest also keeps the Lead purchased date of every processed file.
+    """
+
+    def __init__(self, directory: str, key_columns: List[str]):
+        super().__init__(directory, MANIFEST_NAME, CODE_MODULES, identity=','.join(key_columns))
+        self.key_columns = key_columns
+
+    def read_key_index(self) -> pd.Series:
+        # The number of rows of every dedup key in the processed files, indexed by the key
+        counts = self.read_frame('counts')
+        return pd.Series(counts['count'].to_numpy(), index=counts['key'].to_numpy())
+
+    def read(self) -> Tuple[pd.DataFrame, pd.Series, pd.DataFrame]:
+        return self.read_frame('base'), self.read_key_index(), self.read_frame('duplicates_to_score')
+
+    def write(self, base: pd.DataFrame, counts: pd.Series, duplicates_to_score: pd.DataFrame):
+        self.write_frames({
+            'base': base,
+            'counts': pd.DataFrame({'key': counts.index.to_numpy(dtype=np.uint64), 'count': counts.to_numpy()}),
+            'duplicates_to_score': duplicates_to_score,
+        })
+
+    def record_prospect_file(self, kind: str, path: str, df: pd.DataFrame):
+        lead_purchased = df['Lead purchased'].iloc[0] if len(df) else pd.NaT
+        self.record_file(kind, path, len(df),
+                         lead_purchased=None if pd.isna(lead_purchased) else lead_purchased.strftime('%Y-%m-%d'))
+
+    def update(self, files: List[ProspectFile], read_file: Callable[[str, str], pd.DataFrame]) \
+            -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Description: Merges the prospect files that have not been processed yet into the base
+        :param files: The kind and the path of every prospect file, in the order they are concatenated
+        :param read_file: Reads and cleans a prospect file, given its kind and its path
+        :return: The deduplicated prospects of all the files and the 'to_be_Scored' duplicates
+        """
+        if self.start(files):
+            base, counts, duplicates_to_score = None, empty_counts(), None
+        else:
+            base, counts, duplicates_to_score = self.read()
+
+        new_files = self.new_files(files)
+        if new_files:
+            new_dfs = []
+            for kind, path in new_files:
+                new_dfs.append(read_file(kind, path))
+                self.record_prospect_file(kind, path, new_dfs[-1])
+            base, counts, duplicates_to_score = merge_prospects(base, counts, duplicates_to_score, pd.concat(new_dfs),
+                                                                self.key_columns)
+            self.write(base, counts, duplicates_to_score)
+        if base is None:
+            raise ValueError("No prospect files to build the base from")
+        return base.drop(columns=[KEY_COLUMN]), duplicates_to_score
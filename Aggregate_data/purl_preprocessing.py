@@ -1,6 +1,7 @@
 import pandas as pd
 import os
 import reusable_functions as rf
+import normalization as nz
 
 
 def preprocess_merge_df(df1, df2):
@@ -10,7 +11,7 @@ def preprocess_merge_df(df1, df2):
                   axis=1, inplace=True)
 
     # Step_1: keep only digits from df['DM Reference ID']
-    new_df['DM Reference ID'] = new_df['DM Reference ID'].apply(lambda x: rf.keep_number(x))
+    new_df['DM Reference ID'] = nz.digits_only(new_df['DM Reference ID'])
     # Step_2: check if the df['DM_Reference_ID'] is 10 digits else drop it
     temp_df = rf.check_number_of_digits(new_df)
     df = temp_df
@@ -20,8 +21,8 @@ def preprocess_merge_df(df1, df2):
 
 
 def clear_dataset(df):
-    df['DM Reference ID'] = df['DM Reference ID'].apply(lambda x: rf.keep_number(x))
-    df['Zip'] = df['Zip'].apply(lambda x: rf.keep_number(x))
+    df['DM Reference ID'] = nz.digits_only(df['DM Reference ID'])
+    df['Zip'] = nz.digits_only(df['Zip'])
     df.dropna(subset=['DM Reference ID'], inplace=True)
     purl_dataset = df.drop_duplicates(subset=['DM Reference ID', 'Zip'], keep='last').copy()
     purl_dataset.drop(['DM PURL'], axis=1, inplace=True)
@@ -0,0 +1,114 @@
+from functools import lru_cache
+from typing import FrozenSet, NamedTuple, Tuple
+
+import pandas as pd
+
+# The third party features merged by the zip code in format_external_dataset
+ZIP_CODE_FEATURES = ('Mean_Income', 'Number_of_people_in_housing_units', 'People_Income_Below_Poverty_Level',
+                     'Housing_Units', 'Occupied_Housing_Units', 'Monthly_Housing_Costs',
+                     'Number_of_noninstitutionalized_civilians', 'Insured_Civilians', 'Uninsured_Civilians',
+                     'Population_Over_16', 'Employment_Rate', 'Number_of_Returns', 'Number_of_individuals',
+                     'Total_Taxes_Paid_Amount')
+
+# The schema of the final dataset: every column make_final_modifications keeps, with its name in the final dataset.
+# The other columns are dropped, so the stages before it do not need to produce or carry them.
+FINAL_COLUMN_NAMES = {
+    'UUID': 'input_feature_pd_customer_uuid', 'Customer_contacted_status': 'target',
+    'Temporary_target': 'Temporary_target',
+    'New_lead': 'input_feature_pd_customer_lead_to_be_scored',
+    'gender': 'input_feature_pd_customer_gender',
+    'f.Email': 'f.Email', 'f.Phone': 'f.Phone', 'Phone': 'Phone',
+    'Mail_number': 'input_feature_pd_mailings_sent_so_far',
+    'Calls_number': 'input_feature_pd_number_of_calls_so_far',
+    'First Name': 'input_feature_pd_first_name',
+    'Last Name': 'input_feature_pd_last_name',
+    'Lead purchased': 'input_feature_pd_date_of_lead_purchased',
+    'Zip_1': 'input_feature_pd_customer_zip1', 'Zip_2': 'input_feature_pd_customer_zip2',
+    'Address': 'Address', 'City': 'City',
+    'State': 'input_feature_pd_customer_state',
+    'Debt Amount': 'input_feature_pd_customer_debt_amount',
+    'purl_fully_completed': 'input_feature_pd_customer_purl_fully_completed',
+    'Queue': 'input_phone_center_activity',
+    'Call Time': 'input_feature_pd_customer_duration_call',
+    'Mean_Income': 'input_feature_3rdParty_mean_income_per_zip',
+    'Number_of_people_in_housing_units': 'input_feature_3rdParty_number_of_people_in_housing_units_per_zip',
+    'People_Income_Below_Poverty_Level': 'input_feature_3rdParty_people_Income_Below_Poverty_Level_per_zip',
+    'Housing_Units': 'input_feature_3rdParty_Housing_Units_per_zip',
+    'Occupied_Housing_Units': 'input_feature_3rdParty_Occupied_Housing_Units_per_zip',
+    'Monthly_Housing_Costs': 'input_feature_3rdParty_Monthly_Housing_Costs_per_zip',
+    'Number_of_noninstitutionalized_civilians':
+        'input_feature_3rdParty_Number_of_noninstitutionalized_civilians_per_zip',
+    'Insured_Civilians': 'input_feature_3rdParty_Insured_Civilians_per_zip',
+    'Uninsured_Civilians': 'input_feature_3rdParty_Uninsured_Civilians_per_zip',
+    'Population_Over_16': 'input_feature_3rdParty_Population_Over_16_per_zip',
+    'Employment_Rate': 'input_feature_3rdParty_Employment_Rate_per_zip',
+    'Number_of_Returns': 'input_feature_3rdParty_Number_of_Returns_per_zip',
+    'Number_of_individuals': 'input_feature_3rdParty_Number_of_individuals_per_zip',
+    'Total_Taxes_Paid_Amount': 'input_feature_3rdParty_Total_Taxes_Paid_Amount_per_zip',
+}
+
+
+class ColumnFlow(NamedTuple):
+    """
+    How a stage turns the dataframe it reads into the one it writes, as far as the planner is concerned.
+    stage: The name of the stage
+    reads: The dataframe it reads, which no other stage reads
+    writes: The dataframe it writes
+    uses: The columns of reads it needs to compute its own, whether it carries them to writes or not
+    adds: The columns it creates, which are not needed from reads
+    """
+    stage: str
+    reads: str
+    writes: str
+    uses: Tuple[str, ...] = ()
+    adds: Tuple[str, ...] = ()
+
+
+# The chain of stages that leads to the final dataset, from the last one. Every other column of the dataframe a stage
+# reads is carried unchanged to the dataframe it writes.
+COLUMN_FLOWS = [
+    ColumnFlow('make_final_modifications', 'add_us_census_bureau_df', 'final_df_stage_one',
+               uses=('UUID', 'Customer_contacted_status', 'Calls_number'),
+               adds=('Temporary_target', 'purl_fully_completed', 'f.Email', 'f.Phone')),
+    ColumnFlow('format_external_dataset', 'add_description_df', 'add_us_census_bureau_df',
+               uses=('Zip_1',), adds=ZIP_CODE_FEATURES),
+    ColumnFlow('format_description_dataset', 'add_phone_and_trunk_df', 'add_description_df',
+               uses=('Zip', 'Status'), adds=('Zip_1', 'Zip_2', 'Description')),
+    ColumnFlow('format_phone_trunk_dataset', 'add_status_df', 'add_phone_and_trunk_df',
+               uses=('UUID', 'Status', 'Phone'),
+               adds=('Phone', 'Date', 'Queue', 'Trunk', 'Call Time', 'Exit Reason', 'CRM Status', 'Calls_number',
+                     'Customer_contacted_status')),
+]
+
+
+@lru_cache(maxsize=None)
+def required_columns(name: str) -> FrozenSet[str]:
+    """
+    Description: Works out, from the schema of the final dataset back, the columns of a dataframe of the chain that
+    some later stage needs: the ones its reader uses, and the ones it carries and a later stage needs
+    :param name: The name of a dataframe of COLUMN_FLOWS (e.g. 'add_description_df')
+    :return: The names of the needed columns
+    """
+    if name == COLUMN_FLOWS[0].writes:
+        return frozenset(FINAL_COLUMN_NAMES)
+    flow = next((flow for flow in COLUMN_FLOWS if flow.reads == name), None)
+    if flow is None:
+        raise ValueError(f"The read planner does not know the dataframe {name}")
+    return (required_columns(flow.writes) - set(flow.adds)) | set(flow.uses)
+
+
+def is_required(name: str, column: str) -> bool:
+    # Whether a stage has to produce the column of a dataframe at all (e.g. the Description of add_description_df)
+    return column in required_columns(name)
+
+
+def project(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Description: Keeps only the needed columns of a dataframe of the chain before it is stored, in the order they have,
+    so the next stages neither read nor merge the others
+    :param name: The name of the dataframe
+    :param df: The dataframe
+    :return: The dataframe with the needed columns
+    """
+    needed = required_columns(name)
+    return df[[column for column in df.columns if column in needed]]
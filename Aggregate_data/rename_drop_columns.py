@@ -1,6 +1,9 @@
 import pandas as pd
 import numpy as np
 import reusable_functions as rf
+import normalization as nz
+import call_activity as ca
+import read_planner as rp
 from logger import Logger
 from Aggregate_data.config.__init__ import Config
 from Aggregate_data.config.config_utils import ConfigUtils
@@ -28,7 +31,7 @@ def create_temp_target_feature(df: pd.DataFrame) -> pd.DataFrame:
 
 def add_reference_id_feature_to_purl_responders(ref_id_df: pd.DataFrame, responders_df: pd.DataFrame) -> pd.DataFrame:
     responders_df.rename(columns={'Reference ID': 'DM Reference ID'}, inplace=True)
-    responders_df['DM Reference ID'] = responders_df['DM Reference ID'].apply(lambda x: rf.keep_number(x))
+    responders_df['DM Reference ID'] = nz.digits_only(responders_df['DM Reference ID'])
     ref_id_df['DM Reference ID'] = ref_id_df['DM Reference ID'].astype(str)
     # merge purl responders df with the Reference ID
     merged_df = pd.merge(ref_id_df, responders_df, on='DM Reference ID', how='right')
@@ -47,6 +50,24 @@ def change_columns_order(df1: pd.DataFrame) -> pd.DataFrame:
     return df1.reindex(columns=df1.columns[new_order])
 
 
+def add_call_activity_features(df1: pd.DataFrame, call_activity: pd.DataFrame) -> pd.DataFrame:
+    """
+    Description: Adds the activity of the phone of every lead across all its calls (see call_activity), next to the
+    features of its latest call. A lead whose phone never called has no calls and no call seconds.
+    :param df1: The final dataset, with a Phone column
+    :param call_activity: The activity of every phone
+    :return: The final dataset with the input_feature_pd_call_activity_ columns
+    """
+    features = call_activity.rename(columns=lambda column: column if column == 'Phone'
+                                    else ca.FEATURE_PREFIX + column.lower())
+    df = pd.merge(df1, features, on='Phone', how='left')
+    for column in call_activity.columns:
+        if column not in ('Phone', 'Max_call_seconds', 'First_contact', 'Last_contact'):
+            feature = ca.FEATURE_PREFIX + column.lower()
+            df[feature] = df[feature].fillna(0).astype(call_activity[column].dtype)
+    return df
+
+
 def modify_input_phone_center_activity_values(df1: pd.DataFrame) -> pd.DataFrame:
     df1['input_phone_center_activity'] = df1['input_phone_center_activity'].fillna('').str. \
         replace('Sales_Inbound.*', 'Inbound', regex=True).str. \
@@ -55,59 +76,23 @@ def modify_input_phone_center_activity_values(df1: pd.DataFrame) -> pd.DataFrame
 
 
 def migrate_and_discard_df_columns(df1: pd.DataFrame) -> pd.DataFrame:
-    new_df1 = df1.drop(
-        columns=['Status', 'Description', 'Customer_intention', 'Date Added', 'Lead Source',
-                 'Direct Mail DID', 'Date', 'Trunk', 'Exit Reason'], axis=1)
-
-    temp_df = new_df1.rename(
-        columns={'UUID': 'input_feature_pd_customer_uuid', 'Customer_contacted_status': 'target',
-                 'New_lead': 'input_feature_pd_customer_lead_to_be_scored',
-                 'gender': 'input_feature_pd_customer_gender',
-                 'Mail_number': 'input_feature_pd_mailings_sent_so_far',
-                 'Calls_number': 'input_feature_pd_number_of_calls_so_far',
-                 'First Name': 'input_feature_pd_first_name',
-                 'Last Name': 'input_feature_pd_last_name',
-                 'Lead purchased': 'input_feature_pd_date_of_lead_purchased',
-                 'Zip_1': 'input_feature_pd_customer_zip1', 'Zip_2': 'input_feature_pd_customer_zip2',
-                 'State': 'input_feature_pd_customer_state',
-                 'Debt Amount': 'input_feature_pd_customer_debt_amount',
-                 'purl_fully_completed': 'input_feature_pd_customer_purl_fully_completed',
-                 'Queue': 'input_phone_center_activity',
-                 'Call Time': 'input_feature_pd_customer_duration_call',
-                 'Mean_Income': 'input_feature_3rdParty_mean_income_per_zip',
-                 'Number_of_people_in_housing_units':
-                     'input_feature_3rdParty_number_of_people_in_housing_units_per_zip',
-                 'People_Income_Below_Poverty_Level':
-                     'input_feature_3rdParty_people_Income_Below_Poverty_Level_per_zip',
-                 'Housing_Units': 'input_feature_3rdParty_Housing_Units_per_zip',
-                 'Occupied_Housing_Units': 'input_feature_3rdParty_Occupied_Housing_Units_per_zip',
-                 'Monthly_Housing_Costs': 'input_feature_3rdParty_Monthly_Housing_Costs_per_zip',
-                 'Number_of_noninstitutionalized_civilians':
-                     'input_feature_3rdParty_Number_of_noninstitutionalized_civilians_per_zip',
-                 'Insured_Civilians': 'input_feature_3rdParty_Insured_Civilians_per_zip',
-                 'Uninsured_Civilians': 'input_feature_3rdParty_Uninsured_Civilians_per_zip',
-                 'Population_Over_16': 'input_feature_3rdParty_Population_Over_16_per_zip',
-                 'Employment_Rate': 'input_feature_3rdParty_Employment_Rate_per_zip',
-                 'Number_of_Returns': 'input_feature_3rdParty_Number_of_Returns_per_zip',
-                 'Number_of_individuals': 'input_feature_3rdParty_Number_of_individuals_per_zip',
-                 'Total_Taxes_Paid_Amount': 'input_feature_3rdParty_Total_Taxes_Paid_Amount_per_zip'})
-
-    return temp_df
+    # Keep the columns of the schema of the final dataset (see read_planner), in their order, with their final names
+    new_df1 = df1.loc[:, [column for column in df1.columns if column in rp.FINAL_COLUMN_NAMES]]
+    return new_df1.rename(columns=rp.FINAL_COLUMN_NAMES)
 
 
 def make_final_modifications(conf: Config, logger: Logger):
     add_us_census_bureau_df = rf.read_df_from_pickle_format(conf, 'add_us_census_bureau_df')
     purl_responders = rf.read_df_from_pickle_format(conf, 'purl_responders')
     lead_reference_lookup = rf.read_df_from_pickle_format(conf, 'lead_reference_lookup')
+    call_activity = rf.read_df_from_pickle_format(conf, 'call_activity')
 
     purl_responders_with_reference_id = add_reference_id_feature_to_purl_responders(lead_reference_lookup,
                                                                                     purl_responders)
-    purl_responders_with_reference_id['UUID'] = purl_responders_with_reference_id['UUID'].astype(str)
-    add_us_census_bureau_df['UUID'] = add_us_census_bureau_df['UUID'].astype(str)
     # count the number of common UUID values in the two dataframes
     common_uuid_count = len(
         set(add_us_census_bureau_df['UUID']).intersection(set(purl_responders_with_reference_id['UUID'])))
-    print(f"The two dataframes have {common_uuid_count} common UUID values.")
+    logger.info(f"The two dataframes have {common_uuid_count} common UUID values.")
     final_df = pd.merge(add_us_census_bureau_df, purl_responders_with_reference_id, on='UUID', how='left')
     final_df = final_df.copy()
     temporary_target_df = create_temp_target_feature(final_df)
@@ -117,4 +102,5 @@ def make_final_modifications(conf: Config, logger: Logger):
     modified_df['input_feature_pd_customer_purl_fully_completed'] = modified_df[
         'input_feature_pd_customer_purl_fully_completed'].fillna('Not Clicked')
     final_df_stage_one = change_columns_order(modified_df)
+    final_df_stage_one = add_call_activity_features(final_df_stage_one, call_activity)
     rf.store_df_in_pickle_format(ConfigUtils.conf, final_df_stage_one=final_df_stage_one)
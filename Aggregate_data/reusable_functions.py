@@ -1,6 +1,13 @@
 import pandas as pd
-import re, pickle, os
+import re, os, hashlib
 from Aggregate_data.config.__init__ import Config
+from pipeline_context import PipelineContext
+from telemetry import record_input, record_output
+from storage_backends import get_storage_backend, intermediate_path
+import excel_cache
+import schema_registry
+from csv_schemas import CsvSchema
+from typing import Iterator
 
 
 def remove_all_columns_of_object_type(df):
@@ -36,25 +43,110 @@ def check_number_of_digits(df):
 
 
 def read_excel_files(file, sheet):
-    return pd.read_excel(file, sheet_name=sheet)
+    # Goes through the Excel cache (EXCEL_CACHE_PATH), so a workbook is parsed only the first time we read it
+    df = excel_cache.read_excel_sheets(file, sheet)
+    # With sheet=None pandas returns a dictionary with all the sheets
+    for sheet_df in (df.values() if isinstance(df, dict) else [df]):
+        record_input(sheet_df)
+    return df
+
+
+def read_excel_sheet_names(file):
+    return excel_cache.read_excel_sheet_names(file)
+
+
+def read_parsed_excel_file(file, parse):
+    # For the workbooks we parse ourselves (e.g. the call center reports), through the Excel cache as well
+    df = excel_cache.read_parsed_workbook(file, parse)
+    record_input(df)
+    return df
 
 
 def read_csv_file(file: str, **kwargs):
-    return pd.read_csv(file, sep=',', low_memory=False, **kwargs)
+    df = pd.read_csv(file, sep=',', low_memory=False, **kwargs)
+    record_input(df)
+    return df
+
+
+def read_csv_in_chunks(conf: Config, file: str, schema: CsvSchema) -> Iterator[pd.DataFrame]:
+    """
+    Description: Reads a CSV file in chunks of CSV_CHUNK_SIZE rows and drops the rows rejected by the filters of the
+    schema from every chunk, so the whole file is never held in memory at once
+    :param conf: conf = Config(debug_mode=True)
+    :param file: The path of the CSV file
+    :param schema: The columns, dtypes and filters of the source (see csv_schemas)
+    :return: The filtered chunks
+    """
+    with pd.read_csv(file, sep=',', usecols=schema.columns, dtype=schema.dtype, header=schema.header,
+                     chunksize=conf.csv_chunk_size) as reader:
+        for chunk in reader:
+            for keep in schema.filters:
+                chunk = chunk[keep(chunk)]
+            yield chunk
+
+
+def read_csv_with_schema(conf: Config, file: str, schema: CsvSchema) -> pd.DataFrame:
+    # The kept rows of every chunk, with a single index as read_csv_file gives
+    df = pd.concat(read_csv_in_chunks(conf, file, schema), ignore_index=True)
+    record_input(df)
+    return df
 
 
 def store_df_in_pickle_format(conf: Config, **kwargs):
+    # Every stored dataframe gets the compact dtypes of the schema registry, the same in memory and on disk
+    kwargs = {name: schema_registry.apply_schema(df) for name, df in kwargs.items()}
+    for name, df in kwargs.items():
+        schema_registry.check_schema(name, df)
+        record_output(df)
+
+    context = PipelineContext.current
+    if context is not None:
+        for name, df in kwargs.items():
+            context.put(name, df)
+        # The dataframes are passed to the next stages in memory, writing them to disk is optional
+        if not context.checkpoint:
+            return
+
     # Create the directory if it doesn't exist
     if not os.path.exists(conf.path_to_store_pickle_files):
         os.makedirs(conf.path_to_store_pickle_files)
 
-    # Store the dataframes as pickled objects in the directory
+    # Store the dataframes in the directory, in the format of INTERMEDIATE_STORAGE_FORMAT
+    backend = get_storage_backend(conf)
     for name, df in kwargs.items():
-        with open(os.path.join(conf.path_to_store_pickle_files, f'{name}.pickle'), 'wb') as f:
-            pickle.dump(df, f)
+        backend.write(df, intermediate_path(conf, name))
 
 
-def read_df_from_pickle_format(conf: Config, pickle_name):
-    with open(os.path.join(conf.path_to_store_pickle_files, f'{pickle_name}.pickle'), 'rb') as f:
-        df = pickle.load(f)
+def read_df_from_pickle_format(conf: Config, pickle_name, columns=None):
+    """
+    :param conf: conf = Config(debug_mode=True)
+    :param pickle_name: The name the dataframe was stored with
+    :param columns: The columns to load, by default all of them. The columnar formats only read these columns from disk.
+    :return: The dataframe
+    """
+    context = PipelineContext.current
+    if context is not None:
+        df = context.take(pickle_name)
+        if df is not None:
+            df = df if columns is None else df[columns]
+            record_input(df)
+            return df
+
+    # A file stored before the schema registry existed is converted when it is read
+    df = schema_registry.apply_schema(get_storage_backend(conf).read(intermediate_path(conf, pickle_name), columns))
+    record_input(df)
     return df
+
+
+def compute_file_fingerprint(file: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Description: Hashes the content of a file so that we can tell if it changed since the last time we processed it
+    :param file: The path of the file
+    :param chunk_size: The number of bytes we read at a time, so that big files are not loaded in memory at once
+    :return: The sha256 hex digest of the file content
+    """
+    sha = hashlib.sha256()
+    with open(file, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            sha.update(block)
+    return sha.hexdigest()
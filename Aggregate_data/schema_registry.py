@@ -0,0 +1,75 @@
+import logging
+from typing import Dict, List
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# The compact dtype of each canonical column of the pipeline dataframes. The columns that are not listed keep the
+# dtype pandas gives them.
+#   category: labels with few distinct values. A categorical column can not take a value outside its categories
+#             (e.g. fillna('') or .loc[..] = 'Aged - Uncontacted'), so the columns a stage fills in, such as Status
+#             and Queue, stay object.
+#   string[pyarrow]: free text that is only carried to the final dataset, stored in a single Arrow buffer instead of
+#             one Python object per value
+#   Int8: small counts, nullable so that a merge that finds no match does not turn them into floats
+#   Int64: the entity key of every lead, nullable for the same reason, since a float can not hold every 64-bit key
+# The zip parts are categorical and not integers, since an integer zip loses its leading zeros.
+COLUMN_DTYPES: Dict[str, str] = {
+    'State': 'category',
+    'City': 'category',
+    'gender': 'category',
+    'Lead Source': 'category',
+    'New_lead': 'category',
+    'Customer_contacted_status': 'category',
+    'Customer_intention': 'category',
+    'Exit Reason': 'category',
+    'Trunk': 'category',
+    'Zip_1': 'category',
+    'Zip_2': 'category',
+    'Address': 'string[pyarrow]',
+    'Description': 'string[pyarrow]',
+    'Mail_number': 'Int8',
+    'UUID': 'Int64',
+}
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Description: Converts the columns of the registry to their compact dtype. A column whose values do not fit (e.g. a
+    Mail_number that is a letter) keeps its dtype and is reported by schema_violations.
+    :param df: A dataframe of the pipeline, it is not modified
+    :return: The dataframe with the converted columns
+    """
+    converted = {}
+    for column, dtype in COLUMN_DTYPES.items():
+        if column not in df.columns or df[column].dtype == dtype:
+            continue
+        try:
+            converted[column] = df[column].astype(dtype)
+        except (TypeError, ValueError):
+            continue
+    if not converted:
+        return df
+    df = df.copy(deep=False)
+    for column, values in converted.items():
+        df[column] = values
+    return df
+
+
+def schema_violations(df: pd.DataFrame) -> List[str]:
+    # The columns of the registry that do not have their compact dtype
+    return [f"{column} is {df[column].dtype} instead of {dtype}" for column, dtype in COLUMN_DTYPES.items()
+            if column in df.columns and df[column].dtype != dtype]
+
+
+def check_schema(name: str, df: pd.DataFrame):
+    """
+    Description: Checks a dataframe at a stage boundary, i.e. when a stage stores it. A violation does not stop the
+    pipeline, since the stages still work with the original dtypes, but it means the frame takes more memory than it
+    should.
+    :param name: The name the dataframe is stored with
+    :param df: The dataframe, after apply_schema
+    """
+    for violation in schema_violations(df):
+        logger.warning(f"Schema of {name}: {violation}")
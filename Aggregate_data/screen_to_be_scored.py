@@ -0,0 +1,98 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+import clear_opt_out_list_and_remove_opt_out_prospects as opt_out
+import pipeline
+import prospect_base as pb
+import suppression_index as si
+import unify_and_clear_prospect_datasets as ucpd
+from Aggregate_data.config.__init__ import Config
+from Aggregate_data.config.config_utils import ConfigUtils
+
+# The labels of the screened rows. A row that is both suppressed and a duplicate is suppressed.
+NEW = 'new'
+DUPLICATE = 'duplicate'
+SUPPRESSED = 'suppressed'
+
+# The columns of a prospect file that the opt-outs without a Reference ID are matched on
+NAME_COLUMNS = {'FNAME': 'First Name', 'LNAME': 'Last Name', 'CITY': 'City', 'STATE': 'State'}
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description='Classifies every row of new "To Be Scored" files as new, duplicate (a prospect we already have) '
+                    'or suppressed (in the opt-out list), without running the pipeline.')
+    parser.add_argument('files', nargs='+', metavar='FILE', help='A prospect file in the "To Be Scored" format')
+    parser.add_argument('--output', metavar='DIRECTORY',
+                        help='Write every file with its Screening column to this directory')
+    return parser.parse_args()
+
+
+def load_suppression_index(conf: Config) -> si.SuppressionIndex:
+    # The key sets stored by the clear_opt_out_list stage, or the opt-out workbook if the stage has not run yet or the
+    # workbook changed since its last run
+    if pipeline.stored_results_are_current(conf, 'clear_opt_out_list'):
+        return si.SuppressionIndex.read(conf, by=('name',))
+    return opt_out.build_suppression_index()
+
+
+def load_prospect_base(conf: Config) -> pb.ProspectBase:
+    """
+    Description: The key index of the prospects we already have. The first call builds the base from every prospect
+    file and the next ones only merge the files that arrived since, so the index is always up to date.
+    :param conf: conf = Config(debug_mode=True)
+    :return: The prospect base of PROSPECT_BASE_PATH
+    """
+    prospect_base = pb.ProspectBase(conf.prospect_base_path, ucpd.PROSPECT_KEY_COLUMNS)
+    prospect_base.update(ucpd.list_prospect_files(), ucpd.read_prospect_file)
+    return prospect_base
+
+
+def screen_file(path: str, suppression_index: si.SuppressionIndex, prospect_base: pb.ProspectBase,
+                key_index: pd.Series) -> pd.DataFrame:
+    """
+    Description: Labels the rows of a prospect file with the same keys the pipeline uses: a row is suppressed if its
+    name, city and state match an opt-out, and a duplicate if its dedup key is in the prospect base or appears earlier
+    in the file
+    :param path: The path of the file
+    :param suppression_index: The key sets of the opt-out list
+    :param prospect_base: The prospect base, to tell if the file is already part of it
+    :param key_index: The number of rows of every dedup key in the prospect base
+    :return: The cleaned rows of the file with a Screening column
+    """
+    df = ucpd.read_prospect_file('to_be_scored', path)
+    keys = pb.prospect_keys(df, ucpd.PROSPECT_KEY_COLUMNS)
+
+    known = key_index.reindex(keys, fill_value=0).to_numpy()
+    if prospect_base.is_processed(path):
+        # The base already contains the rows of the file, which do not make them duplicates
+        _, inverse, own_counts = np.unique(keys, return_inverse=True, return_counts=True)
+        known = known - own_counts[inverse]
+    repeated = pd.Series(keys).duplicated().to_numpy()
+    suppressed = suppression_index.is_suppressed(df.rename(columns=NAME_COLUMNS), by=('name',))
+
+    df['Screening'] = np.select([suppressed, (known > 0) | repeated], [SUPPRESSED, DUPLICATE], NEW)
+    return df
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    conf = ConfigUtils.conf
+
+    suppression_index = load_suppression_index(conf)
+    prospect_base = load_prospect_base(conf)
+    key_index = prospect_base.read_key_index()
+
+    for file in arguments.files:
+        screened_df = screen_file(file, suppression_index, prospect_base, key_index)
+        labels = screened_df['Screening'].value_counts()
+        print(f"{file}: {len(screened_df)} rows, " +
+              ', '.join(f"{labels.get(label, 0)} {label}" for label in (NEW, DUPLICATE, SUPPRESSED)))
+        if arguments.output:
+            if not os.path.exists(arguments.output):
+                os.makedirs(arguments.output)
+            name = os.path.splitext(os.path.basename(file))[0]
+            screened_df.to_csv(os.path.join(arguments.output, f'{name}_screened.csv'), index=False)
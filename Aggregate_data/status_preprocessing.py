@@ -1,27 +1,33 @@
 import pandas as pd
+import glob
 import os, pickle
 import reusable_functions as rf
+import csv_schemas
+import dataset_writer as dw
+import normalization as nz
+import latest_snapshot as ls
+import read_planner as rp
 import phone_and_trunk_preprocessing as ptp
+import status_taxonomy as st
 from Aggregate_data.config.config_utils import ConfigUtils
 from Aggregate_data.config.__init__ import Config
 from logger import Logger
 
+# The modules whose code reads and cleans a status export (read_status_export)
+STATUS_READER_MODULES = ('status_preprocessing', 'reusable_functions', 'csv_schemas', 'normalization')
+
 
 def create_customer_intention_column(df: pd.DataFrame) -> pd.DataFrame:
+    # 'Positive' or 'Negative' by the bucket of the Status in the status taxonomy (PATH_STATUS_TAXONOMY)
     df_copy = df.copy()
-    df_copy.loc[:, 'Customer_intention'] = df_copy['Status'].apply(map_customer_intention)
+    taxonomy = st.read_status_taxonomy(ConfigUtils.conf.path_status_taxonomy)
+    df_copy['Customer_intention'] = taxonomy.customer_intention(df_copy['Status'])
     return df_copy
 
 
-def map_customer_intention(status: str) -> str:
-    if status in ['Client', 'C1 Client', 'Hot', 'Scheduled Appointment', 'Credit Counseling Lead']:
-        return 'Positive'
-    else:
-        return 'Negative'
-
-
 def clear_status_with_phone_dataset() -> pd.DataFrame:
-    phone_status_df = rf.read_csv_file(os.getenv('PATH_PHONE_20230308'))
+    phone_status_df = rf.read_csv_with_schema(ConfigUtils.conf, ConfigUtils.conf.path_phone_20230308,
+                                              csv_schemas.SABINO_STATUS_WITH_PHONE)
     cleared_ref_id_df = clear_status_dataset(phone_status_df)
     contained_phone_column_df = ptp.create_phone_column(cleared_ref_id_df)
     return contained_phone_column_df
@@ -36,9 +42,8 @@ def clear_status_dataset(df: pd.DataFrame) -> pd.DataFrame:
     # drop values from column --> status that have the value --> Test Lead
     df_copy = df_copy[df_copy.Status != 'Test Lead']
     df_copy = df_copy.reset_index(drop=True)
-    # Convert www.pdoffer.com/Sharon94954 to Sharon94954
-    df_copy.loc[:, 'DM Reference ID'] = df_copy['DM Reference ID'].str.replace(r'.*/([^/]+)$', r'\1', regex=True)
-    df_copy['DM Reference ID'] = df_copy['DM Reference ID'].apply(lambda x: rf.keep_number(x))
+    # Convert www.pdoffer.com/Sharon94954 to 94954
+    df_copy['DM Reference ID'] = nz.purl_reference_id(df_copy['DM Reference ID'])
     return rf.check_number_of_digits(df_copy)
 
 
@@ -52,26 +57,45 @@ def merge_2_dataframes(df1: pd.DataFrame, df2: pd.DataFrame) -> pd.DataFrame:
 
 def preprocess_merge_df(df: pd.DataFrame) -> pd.DataFrame:
     # Step_1: keep only digits from merged_df['DM Reference ID']
-    df['DM Reference ID'] = df['DM Reference ID'].apply(lambda x: rf.keep_number(x))
+    df['DM Reference ID'] = nz.digits_only(df['DM Reference ID'])
     return df
 
 
 def union_datasets_containing_status_feature_with_different_formats(df1: pd.DataFrame, df2: pd.DataFrame)\
         -> pd.DataFrame:
     """
-    This code will first concatenate the 2 dataframes with different format. Next we sort the DataFrame by the
-    'Date Added' column in descending order, and then drop duplicates based on the 'DM Reference ID' column while
-    keeping the first occurrence of each unique value. The resulting DataFrame will contain only the rows with the most
-    recent 'Date Added' value for each unique 'DM Reference ID' value.
+    This code will first concatenate the 2 dataframes with different format and then keep the row with the most recent
+    'Date Added' value for each unique 'DM Reference ID' value. When both rows of an ID have the same 'Date Added', the
+    row of the second dataset is kept.
     :param df1: A dataset that does not contain the feature 'Phone'
     :param df2: A dataset that contains the feature 'Phone'
     :return: The concatenated dataset
     """
     df_concatenated = pd.concat([df1, df2], axis=0,
                                 ignore_index=True, sort=False)
-    df_concatenated = df_concatenated.sort_values('Date Added', ascending=False).drop_duplicates(
-        subset='DM Reference ID', keep='first')
-    return df_concatenated
+    return ls.latest_per_key(df_concatenated, 'DM Reference ID', 'Date Added')
+
+
+def read_status_export(kind: str, file_path: str) -> pd.DataFrame:
+    # Reads and cleans a Sabino status export (kind 'status')
+    return clear_status_dataset(rf.read_csv_with_schema(ConfigUtils.conf, file_path, csv_schemas.SABINO_STATUS))
+
+
+def read_status_exports() -> pd.DataFrame:
+    """
+    Description: PATH_STATUS is a path or a pattern of the Sabino status exports. With STATUS_INCREMENTAL only the
+    exports that arrived since the last run are read and folded into the stored snapshot (STATUS_SNAPSHOT_PATH).
+    :return: The latest status of every DM Reference ID of all the exports
+    """
+    status_files = [('status', path) for path in sorted(glob.glob(ConfigUtils.conf.path_status, recursive=True))]
+    if not status_files:
+        raise FileNotFoundError(f"No status export matches {ConfigUtils.conf.path_status}")
+    if ConfigUtils.conf.status_incremental:
+        # The snapshot is folded again when the code that reads and cleans an export changes
+        return ls.LatestSnapshot(ConfigUtils.conf.status_snapshot_path, 'DM Reference ID', 'Date Added',
+                                 STATUS_READER_MODULES).update(status_files, read_status_export)
+    return ls.latest_per_key(pd.concat([read_status_export(kind, path) for kind, path in status_files],
+                                       ignore_index=True), 'DM Reference ID', 'Date Added')
 
 
 def find_clients_with_status_that_does_not_exist_in_pdr_files(df_reference: pd.DataFrame, df_status: pd.DataFrame):
@@ -84,16 +108,16 @@ def find_clients_with_status_that_does_not_exist_in_pdr_files(df_reference: pd.D
     """
     missing_dm_reference_ids = df_status[
         ~df_status['DM Reference ID'].isin(df_reference['DM Reference ID'])]
-    missing_dm_reference_ids.to_csv(os.environ.get('PATH_MISSING_CLIENTS'), sep=',', encoding='utf-8',
-                                    index=False)
+    # The report is optional, it is written only when PATH_MISSING_CLIENTS is set
+    if os.environ.get('PATH_MISSING_CLIENTS'):
+        dw.write_csv(missing_dm_reference_ids, os.environ.get('PATH_MISSING_CLIENTS'))
 
 
 def format_status_dataset(conf: Config, logger: Logger):
     prospects_pdr_files = rf.read_df_from_pickle_format(conf, 'prospects_pdr_files')
     lead_reference_lookup = rf.read_df_from_pickle_format(conf, 'lead_reference_lookup')
 
-    sabino_ingestion = rf.read_csv_file(ConfigUtils.conf.path_status)
-    status_dataset_without_phone_format = clear_status_dataset(sabino_ingestion)
+    status_dataset_without_phone_format = read_status_exports()
     status_dataset_with_phone_format = clear_status_with_phone_dataset()
     union_status_df = union_datasets_containing_status_feature_with_different_formats \
         (status_dataset_without_phone_format, status_dataset_with_phone_format)
@@ -104,8 +128,10 @@ def format_status_dataset(conf: Config, logger: Logger):
     second_merged_df = merge_2_dataframes(prospects_pdr_files, merged_df)
     final_status_df = preprocess_merge_df(second_merged_df)
     final_status_df.rename({'DM_Reference_ID': 'DM Reference ID'}, axis=1, inplace=True)
-    final_df = create_customer_intention_column(final_status_df)
-    final_df_copy = final_df.copy()
+    # The intention of the customer is computed only if a later stage needs it (see read_planner)
+    if rp.is_required('add_status_df', 'Customer_intention'):
+        final_status_df = create_customer_intention_column(final_status_df)
+    final_df_copy = final_status_df.copy()
     final_df_copy.drop(['DM Reference ID'], axis=1, inplace=True)
-    rf.store_df_in_pickle_format(ConfigUtils.conf, add_status_df=final_df_copy)
+    rf.store_df_in_pickle_format(ConfigUtils.conf, add_status_df=rp.project('add_status_df', final_df_copy))
 
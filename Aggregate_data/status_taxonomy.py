@@ -0,0 +1,84 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# The status a lead gets when Sabino has no status for it
+NO_STATUS = 'Aged - Uncontacted'
+
+# The row of the taxonomy that applies to every status it does not list (and to a missing status)
+OTHER_STATUSES = '*'
+
+CONTACTED_VALUES = {'contacted', 'uncontacted'}
+INTENTION_VALUES = {'Positive', 'Negative'}
+
+
+class StatusTaxonomy:
+    """
+    The buckets of the Sabino statuses, read from a CSV with the columns Status, Contacted ('contacted' or
+    'uncontacted') and Intention ('Positive' or 'Negative'), plus a '*' row for the statuses that are not listed. The
+    business can move a status to another bucket by editing the file (PATH_STATUS_TAXONOMY).
+
+    The table is compiled once into a categorical dtype of the listed statuses and an array of values per rule, so a
+    column is classified by converting it to the categorical codes and taking the values at these codes, without
+    looking at its rows one by one.
+    """
+
+    def __init__(self, table: pd.DataFrame):
+        missing_columns = {'Status', 'Contacted', 'Intention'} - set(table.columns)
+        if missing_columns:
+            raise ValueError(f"The status taxonomy has no column {sorted(missing_columns)}")
+        if table['Status'].duplicated().any():
+            raise ValueError(f"The status taxonomy lists {table['Status'][table['Status'].duplicated()].tolist()} twice")
+        if not set(table['Contacted']) <= CONTACTED_VALUES or not set(table['Intention']) <= INTENTION_VALUES:
+            raise ValueError(f"Contacted must be one of {sorted(CONTACTED_VALUES)} and Intention one of "
+                             f"{sorted(INTENTION_VALUES)}")
+        if OTHER_STATUSES not in set(table['Status']):
+            raise ValueError(f"The status taxonomy has no '{OTHER_STATUSES}' row for the statuses it does not list")
+
+        other = table[table['Status'] == OTHER_STATUSES].iloc[0]
+        listed = table[table['Status'] != OTHER_STATUSES]
+        self.statuses = pd.CategoricalDtype(listed['Status'].tolist())
+        # The code -1 of a status that is not listed takes the last value, the one of the '*' row
+        self.contacted = np.append(listed['Contacted'].to_numpy(dtype=object), other['Contacted'])
+        self.intention = np.append(listed['Intention'].to_numpy(dtype=object), other['Intention'])
+
+    @classmethod
+    def read(cls, path: str) -> 'StatusTaxonomy':
+        return cls(pd.read_csv(path, dtype=str, keep_default_na=False))
+
+    def codes(self, status: pd.Series) -> np.ndarray:
+        return pd.Categorical(status.astype(object), dtype=self.statuses).codes
+
+    def contacted_status(self, status: pd.Series, trunk: pd.Series) -> np.ndarray:
+        """
+        Description: A lead is 'contacted' when the bucket of its status is contacted, or when it called us, i.e. the
+        call center report has a Trunk for its phone
+        :param status: The Status column
+        :param trunk: The Trunk column
+        :return: 'contacted' or 'uncontacted' for every row
+        """
+        contacted = self.contacted[self.codes(status)]
+        contacted[trunk.notna().to_numpy()] = 'contacted'
+        return contacted
+
+    def customer_intention(self, status: pd.Series) -> np.ndarray:
+        # 'Positive' or 'Negative' for every row, by the bucket of its status
+        return self.intention[self.codes(status)]
+
+
+@lru_cache(maxsize=None)
+def read_status_taxonomy(path: str) -> StatusTaxonomy:
+    # The status and the phone stages use the same taxonomy, which is read once per process
+    return StatusTaxonomy.read(path)
+
+
+def consolidate_status(status: pd.Series, crm_status: pd.Series) -> pd.Series:
+    """
+    Description: A lead without a Sabino status (NO_STATUS) takes the status the call center gave it, if any
+    :param status: The Status column
+    :param crm_status: The CRM Status column of the call center report
+    :return: The consolidated Status column
+    """
+    has_crm_status = crm_status.notna() & (crm_status != '')
+    return status.mask((status == NO_STATUS) & has_crm_status, crm_status)
@@ -0,0 +1,132 @@
+import os
+import pickle
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import infer_dtype
+
+from Aggregate_data.config.__init__ import Config
+
+# The values of an object column that Arrow can store as they are. Any other column (e.g. numbers mixed with strings)
+# is stored as strings.
+ARROW_COMPATIBLE_OBJECT_TYPES = {'string', 'empty', 'integer', 'floating', 'mixed-integer-float', 'boolean', 'bytes',
+                                 'datetime', 'datetime64', 'date', 'decimal'}
+
+
+class PickleBackend:
+    """
+    Stores every dataframe as a pickled object. It keeps the dataframes exactly as they are, but it can only load them
+    whole.
+    """
+    extension = 'pickle'
+
+    def __init__(self, compression: str = ''):
+        self.compression = compression
+
+    def write(self, df: pd.DataFrame, path: str):
+        with open(path, 'wb') as f:
+            pickle.dump(df, f)
+
+    def read(self, path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        with open(path, 'rb') as f:
+            df = pickle.load(f)
+        return df if columns is None else df[columns]
+
+
+class ParquetBackend:
+    """
+    Stores every dataframe as a compressed Parquet file, the smallest files of the three backends. Reading a few
+    columns only decodes those columns.
+    """
+    extension = 'parquet'
+
+    def __init__(self, compression: str = ''):
+        self.compression = compression or 'snappy'
+
+    def write(self, df: pd.DataFrame, path: str):
+        import pyarrow.parquet as pq
+        pq.write_table(to_arrow_table(df), path, compression=self.compression)
+
+    def read(self, path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        import pyarrow.parquet as pq
+        return from_arrow_table(pq.read_table(path, columns=columns, memory_map=True))
+
+
+class FeatherBackend:
+    """
+    Stores every dataframe as a Feather (Arrow IPC) file, the fastest backend to read. The file is memory mapped, so
+    reading a few columns only touches the pages of those columns, and with compression 'uncompressed' the numeric
+    columns are loaded without a copy.
+    """
+    extension = 'feather'
+
+    def __init__(self, compression: str = ''):
+        self.compression = compression or 'lz4'
+
+    def write(self, df: pd.DataFrame, path: str):
+        import pyarrow.feather as feather
+        feather.write_feather(to_arrow_table(df), path, compression=self.compression)
+
+    def read(self, path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        import pyarrow.feather as feather
+        return from_arrow_table(feather.read_table(path, columns=columns, memory_map=True))
+
+
+BACKENDS = {backend.extension: backend for backend in [PickleBackend, ParquetBackend, FeatherBackend]}
+
+
+def get_storage_backend(conf: Config):
+    """
+    :param conf: conf = Config(debug_mode=True)
+    :return: The backend selected by INTERMEDIATE_STORAGE_FORMAT
+    """
+    if conf.intermediate_storage_format not in BACKENDS:
+        raise ValueError(f"Unknown INTERMEDIATE_STORAGE_FORMAT {conf.intermediate_storage_format}, "
+                         f"the formats are {list(BACKENDS)}")
+    return BACKENDS[conf.intermediate_storage_format](conf.intermediate_storage_compression)
+
+
+def intermediate_path(conf: Config, name: str) -> str:
+    return os.path.join(conf.path_to_store_pickle_files, f'{name}.{conf.intermediate_storage_format}')
+
+
+def to_arrow_table(df: pd.DataFrame):
+    """
+    Description: Arrow needs a single type per column, so the object columns that mix types are converted to strings
+    first. The missing values stay missing. The dataframe of the caller is not modified.
+    :param df: The dataframe to store
+    :return: A pyarrow Table that keeps the index and the dtypes of the dataframe
+    """
+    import pyarrow as pa
+
+    incompatible = [column for column in df.columns[df.dtypes == object]
+                    if infer_dtype(df[column], skipna=True) not in ARROW_COMPATIBLE_OBJECT_TYPES]
+    if incompatible:
+        df = df.copy(deep=False)
+        for column in incompatible:
+            df[column] = df[column].where(df[column].isna(), df[column].astype(str))
+    return pa.Table.from_pandas(df, preserve_index=None)
+
+
+def from_arrow_table(table) -> pd.DataFrame:
+    # Arrow gives None for the missing values of an object column, pandas (read_csv, read_excel, pickle) gives NaN.
+    # Code like astype(str) == 'nan' tells them apart, so we bring back the NaN.
+    df = table.to_pandas()
+    for column in df.columns[df.dtypes == object]:
+        if df[column].hasnans:
+            df[column] = df[column].where(df[column].notna(), np.nan)
+    return df
+
+
+def is_arrow_lossless(df: pd.DataFrame) -> bool:
+    """
+    Description: Tells if a dataframe comes back from Arrow exactly as it was, i.e. to_arrow_table does not need to
+    convert any of its columns and every column name is a string
+    :param df: The dataframe
+    :return: True if it can be stored in a columnar format without any change
+    """
+    if not all(isinstance(column, str) for column in df.columns) or df.columns.has_duplicates:
+        return False
+    return all(infer_dtype(df[column], skipna=True) in ('string', 'empty')
+               for column in df.columns[df.dtypes == object])
@@ -0,0 +1,92 @@
+from typing import Iterable, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import composite_keys as ck
+import normalization as nz
+import reusable_functions as rf
+from Aggregate_data.config.__init__ import Config
+
+# An opt-out without a Reference ID is matched on these columns
+NAME_COLUMNS = ['First Name', 'Last Name', 'City', 'State']
+
+# The names the two key sets are stored with, next to the other intermediate dataframes
+REFERENCE_IDS_NAME = 'opt_out_reference_ids'
+NAME_KEYS_NAME = 'opt_out_name_keys'
+
+
+def name_keys(df: pd.DataFrame) -> np.ndarray:
+    # The hash of the stripped, upper case name, city and state of every row, the same in every run
+    normalized = pd.DataFrame({column: nz.upper_case_text(df[column]) for column in NAME_COLUMNS})
+    return ck.hash_key(normalized, NAME_COLUMNS)
+
+
+class SuppressionIndex:
+    """
+    The prospects that asked to be excluded (the opt-out list), as two key sets: the Reference IDs, and the hashes of the
+    name, city and state of the opt-outs that have no Reference ID. Each set is a pandas Index, so its hash table is
+    built once and every lookup after that is a single vectorized pass over the keys of a dataframe, instead of the
+    tuples we used to build row by row.
+    """
+
+    def __init__(self, reference_ids: Iterable[str] = (), name_keys: Iterable[int] = ()):
+        self.reference_ids = pd.Index(pd.unique(np.asarray(list(reference_ids), dtype=object)), dtype=object)
+        self.name_keys = pd.Index(np.unique(np.asarray(list(name_keys), dtype=np.uint64)), dtype=np.uint64)
+
+    @classmethod
+    def from_opt_out_list(cls, with_reference_id_df: pd.DataFrame, without_reference_id_df: pd.DataFrame) \
+            -> 'SuppressionIndex':
+        """
+        :param with_reference_id_df: The opt-outs with a Reference ID
+        :param without_reference_id_df: The opt-outs without a Reference ID
+        :return: The index of the opt-out list
+        """
+        return cls(nz.digits_only(with_reference_id_df['Reference ID']), name_keys(without_reference_id_df))
+
+    def store(self, conf: Config):
+        rf.store_df_in_pickle_format(conf, **{
+            REFERENCE_IDS_NAME: pd.DataFrame({'DM Reference ID': self.reference_ids.to_numpy()}),
+            NAME_KEYS_NAME: pd.DataFrame({'name_key': self.name_keys.to_numpy()})})
+
+    @classmethod
+    def read(cls, conf: Config, by: Sequence[str] = ('reference_id', 'name')) -> 'SuppressionIndex':
+        """
+        :param conf: conf = Config(debug_mode=True)
+        :param by: The key sets to load, 'reference_id' and/or 'name'
+        :return: The index stored by the clear_opt_out_list stage
+        """
+        reference_ids = rf.read_df_from_pickle_format(conf, REFERENCE_IDS_NAME)['DM Reference ID'] \
+            if 'reference_id' in by else ()
+        keys = rf.read_df_from_pickle_format(conf, NAME_KEYS_NAME)['name_key'] if 'name' in by else ()
+        return cls(reference_ids, keys)
+
+    def matches_reference_id(self, df: pd.DataFrame) -> np.ndarray:
+        return self.reference_ids.get_indexer(df['DM Reference ID'].astype(object)) >= 0
+
+    def matches_name(self, df: pd.DataFrame) -> np.ndarray:
+        return self.name_keys.get_indexer(name_keys(df)) >= 0
+
+    def is_suppressed(self, df: pd.DataFrame, by: Sequence[str] = ('reference_id', 'name')) -> np.ndarray:
+        """
+        :param df: The prospects
+        :param by: The keys to match on, 'reference_id' ('DM Reference ID') and/or 'name' (NAME_COLUMNS)
+        :return: True for the rows that match an opt-out
+        """
+        suppressed = np.zeros(len(df), dtype=bool)
+        if 'reference_id' in by:
+            suppressed |= self.matches_reference_id(df)
+        if 'name' in by:
+            suppressed |= self.matches_name(df)
+        return suppressed
+
+    def partition(self, df: pd.DataFrame, by: Sequence[str] = ('reference_id', 'name')) \
+            -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Description: Splits the prospects in a single pass over their keys
+        :param df: The prospects
+        :param by: The keys to match on (see is_suppressed)
+        :return: The kept and the excluded prospects
+        """
+        suppressed = self.is_suppressed(df, by)
+        return df[~suppressed], df[suppressed]
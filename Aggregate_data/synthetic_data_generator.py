@@ -0,0 +1,500 @@
+import argparse
+import json
+import os
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+FIRST_NAMES = ['JAMES', 'MARY', 'ROBERT', 'PATRICIA', 'JOHN', 'JENNIFER', 'MICHAEL', 'LINDA', 'DAVID', 'ELIZABETH',
+               'WILLIAM', 'BARBARA', 'RICHARD', 'SUSAN', 'JOSEPH', 'JESSICA', 'THOMAS', 'SARAH', 'CHARLES', 'KAREN',
+               'CHRISTOPHER', 'LISA', 'DANIEL', 'NANCY', 'MATTHEW', 'BETTY', 'ANTHONY', 'SANDRA', 'MARK', 'ASHLEY',
+               'DONALD', 'KIMBERLY', 'STEVEN', 'EMILY', 'ANDREW', 'DONNA', 'PAUL', 'MICHELLE', 'JOSHUA', 'CAROL',
+               'KENNETH', 'AMANDA', 'KEVIN', 'MELISSA', 'BRIAN', 'DEBORAH', 'GEORGE', 'STEPHANIE', 'TIMOTHY',
+               'REBECCA', 'JORDAN', 'TAYLOR', 'CASEY', 'ALEX', 'JAMIE', 'ZYLPHA', 'QUINLAN', 'MARISOL']
+LAST_NAMES = ['SMITH', 'JOHNSON', 'WILLIAMS', 'BROWN', 'JONES', 'GARCIA', 'MILLER', 'DAVIS', 'RODRIGUEZ', 'MARTINEZ',
+              'HERNANDEZ', 'LOPEZ', 'GONZALEZ', 'WILSON', 'ANDERSON', 'THOMAS', 'TAYLOR', 'MOORE', 'JACKSON', 'MARTIN',
+              'LEE', 'PEREZ', 'THOMPSON', 'WHITE', 'HARRIS', 'SANCHEZ', 'CLARK', 'RAMIREZ', 'LEWIS', 'ROBINSON',
+              'WALKER', 'YOUNG', 'ALLEN', 'KING', 'WRIGHT', 'SCOTT', 'TORRES', 'NGUYEN', 'HILL', 'FLORES']
+STREETS = ['MAIN ST', 'OAK AVE', 'PINE RD', 'MAPLE DR', 'CEDAR LN', 'ELM ST', 'WASHINGTON BLVD', 'LAKE VIEW CT',
+           'HILLSIDE AVE', 'PARK PL']
+STATES = {'PA': 'Pennsylvania', 'CA': 'California', 'TX': 'Texas', 'NY': 'New York', 'FL': 'Florida', 'OH': 'Ohio',
+          'IL': 'Illinois', 'GA': 'Georgia', 'NC': 'North Carolina', 'AZ': 'Arizona'}
+CITIES = ['SPRINGFIELD', 'FRANKLIN', 'GREENVILLE', 'BRISTOL', 'CLINTON', 'FAIRVIEW', 'SALEM', 'MADISON', 'GEORGETOWN',
+          'ARLINGTON', 'ASHLAND', 'DOVER', 'OXFORD', 'JACKSON', 'BURLINGTON']
+STATUSES = ['Aged - Uncontacted', 'Hot', 'Nurture', 'Disconnected Number', 'New Lead', 'Duplicate Lead', 'DO NOT CALL',
+            'DM Opt-Out', 'Short Call', 'Client', 'C1 Client', 'Scheduled Appointment', 'Credit Counseling Lead',
+            'Not Interested', 'Bogus Lead', 'Test Lead']
+EXIT_REASONS = ['Answered', 'Abandoned', 'Voicemail', 'Timeout', 'Transferred']
+LEAD_SOURCES = ['UMG Direct Mail', 'PDR Direct Mail', 'UMG Direct Mail 2']
+US_CENSUS_BUREAU_FEATURES = ['Mean_Income', 'Number_of_people_in_housing_units', 'People_Income_Below_Poverty_Level',
+                             'Housing_Units', 'Occupied_Housing_Units', 'Monthly_Housing_Costs',
+                             'Number_of_noninstitutionalized_civilians', 'Insured_Civilians', 'Uninsured_Civilians',
+                             'Population_Over_16', 'Employment_Rate', 'Number_of_Returns', 'Number_of_individuals',
+                             'Total_Taxes_Paid_Amount']
+# Excel sheets can not hold more than 1048576 rows, so the big sources are split in several workbooks
+MAX_ROWS_PER_WORKBOOK = 200000
+MAX_ROWS_PER_AGENT_SHEET = 20000
+
+
+def make_directory(path: str) -> str:
+    if not os.path.exists(path):
+        os.makedirs(path)
+    return path
+
+
+def create_leads(number_of_leads: int, rng: np.random.Generator) -> pd.DataFrame:
+    """
+    Description: Creates the population of leads that every source file is made from, so that the sources match each
+    other the way the real ones do (same names, zip codes, reference ids and phones).
+    :param number_of_leads: The number of leads
+    :param rng: The random generator
+    :return: A dataframe with one row per lead
+    """
+    number_of_zipcodes = max(50, min(40000, number_of_leads // 20))
+    zipcodes = rng.choice(np.arange(1000, 99999), size=number_of_zipcodes, replace=False)
+    zip_states = rng.choice(list(STATES), size=number_of_zipcodes)
+    zip_index = rng.integers(0, number_of_zipcodes, number_of_leads)
+
+    leads = pd.DataFrame({
+        'first_name': rng.choice(FIRST_NAMES, number_of_leads),
+        'middle_initial': rng.choice(list('ABCDEJKLMR'), number_of_leads),
+        'last_name': rng.choice(LAST_NAMES, number_of_leads),
+        'address': [f'{number} {street}' for number, street in
+                    zip(rng.integers(1, 9999, number_of_leads), rng.choice(STREETS, number_of_leads))],
+        'city': rng.choice(CITIES, number_of_leads),
+        'state': zip_states[zip_index],
+        'zip1': pd.Series(zipcodes[zip_index]).astype(str).str.zfill(5),
+        'zip2': pd.Series(rng.integers(0, 9999, number_of_leads)).astype(str).str.zfill(4),
+        'debt': rng.integers(5, 150, number_of_leads) * 500,
+        # Unique 10-digit reference ids and phones
+        'reference_id': rng.choice(np.arange(1000000000, 1000000000 + 20 * number_of_leads), number_of_leads,
+                                   replace=False),
+        'phone': rng.choice(np.arange(2002000000, 2002000000 + 20 * number_of_leads), number_of_leads,
+                            replace=False),
+    })
+    leads['reference_id_text'] = leads['reference_id'].astype(str)
+    leads['formatted_reference_id'] = leads['reference_id_text'].str[:5] + '-' + leads['reference_id_text'].str[5:]
+    return leads
+
+
+def write_prospect_lists(leads: pd.DataFrame, directory: str, rng: np.random.Generator) -> Dict[str, str]:
+    # UMG sends prospect lists in two formats: the "fullname" format (CHA*_*.csv) and the PD format (*_MMDDYY.csv)
+    root = make_directory(os.path.join(directory, 'UMG_Prospect_Lists'))
+    to_be_scored_directory = make_directory(os.path.join(root, 'To Be Scored'))
+
+    shuffled = leads.sample(frac=1, random_state=int(rng.integers(0, 2 ** 31)))
+    number_of_leads = len(shuffled)
+    fullname_part = shuffled.iloc[:number_of_leads // 5]
+    pd_part = shuffled.iloc[number_of_leads // 5:number_of_leads * 19 // 20]
+    # The new leads we need to score, plus some leads we have already bought
+    to_be_scored_part = pd.concat([shuffled.iloc[number_of_leads * 19 // 20:],
+                                   pd_part.sample(frac=0.01, random_state=1)])
+
+    for i, chunk in enumerate(np.array_split(fullname_part, max(1, len(fullname_part) // 100000))):
+        batch = make_directory(os.path.join(root, f'Batch_{i}'))
+        pd.DataFrame({
+            'First Name': chunk['first_name'], 'Middle Initial': chunk['middle_initial'],
+            'Surname': chunk['last_name'], 'Gen Code': '', 'Street': chunk['address'], 'City': chunk['city'],
+            'State Abbreviation': chunk['state'], 'Zip Code': chunk['zip1'] + chunk['zip2'], 'EHV': chunk['debt'],
+            'UTL': rng.integers(10, 100, len(chunk)),
+        }).to_csv(os.path.join(batch, f'CHA{i}_0{(i % 9) + 1}1522.csv'), index=False)
+
+    def write_pd_format(chunk: pd.DataFrame, path: str):
+        pd.DataFrame({
+            'FNAME': chunk['first_name'], 'MI': chunk['middle_initial'], 'LNAME': chunk['last_name'], 'SUFFIX': '',
+            'ADDRESS': chunk['address'], 'CITY': chunk['city'], 'STATE': chunk['state'], 'ZIP': chunk['zip1'],
+            'ZIP4': chunk['zip2'], 'EST DEBT': chunk['debt'],
+        }).to_csv(path, index=False)
+
+    for i, chunk in enumerate(np.array_split(pd_part, max(1, len(pd_part) // 100000))):
+        batch = make_directory(os.path.join(root, f'Batch_{i}'))
+        write_pd_format(chunk, os.path.join(batch, f'PD_0{(i % 9) + 1}0123.csv'))
+    write_pd_format(to_be_scored_part, os.path.join(to_be_scored_directory, 'PD_TBS_041023.csv'))
+
+    return {
+        'PROSPECT_FULLNAME_PATH': os.path.join(root, '**', 'CHA*_*.csv'),
+        'PROSPECTS_TO_BE_SCORED_PATH': os.path.join(to_be_scored_directory, '*.csv'),
+        'PROSPECT_PATH': os.path.join(root, '**', '*.csv'),
+    }
+
+
+def write_pdr_files(mailed: pd.DataFrame, directory: str, rng: np.random.Generator) -> Dict[str, str]:
+    # Every mailed lead receives the first wave (A), some of them a second wave (B)
+    second_wave = mailed.sample(frac=0.3, random_state=2)
+    pdr = pd.concat([mailed.assign(wave='A'), second_wave.assign(wave='B')])
+    pdr_df = pd.DataFrame({
+        'Lead Source': rng.choice(LEAD_SOURCES, len(pdr)), 'Status': 'Mailed',
+        'First Name': pdr['first_name'], 'Surname': pdr['last_name'], 'Street': pdr['address'], 'City': pdr['city'],
+        'State Abbreviation': pdr['state'], 'Zip Code': pdr['zip1'] + '-' + pdr['zip2'], 'EHV': pdr['debt'],
+        'Reference ID': pdr['formatted_reference_id'] + '-' + pdr['wave'],
+        'DID': '888' + pd.Series(rng.integers(1000000, 9999999, len(pdr)), index=pdr.index).astype(str),
+        'DM PURL': 'www.pdoffer.com/' + pdr['reference_id_text'],
+    })
+
+    for i, chunk in enumerate(np.array_split(pdr_df, max(1, -(-len(pdr_df) // MAX_ROWS_PER_WORKBOOK)))):
+        folder = make_directory(os.path.join(directory, 'PDR_Files', f'04{i % 10}323'))
+        with pd.ExcelWriter(os.path.join(folder, f'PD_DM_D{i}_T1.xlsx')) as writer:
+            pd.DataFrame({'Summary': ['synthetic']}).to_excel(writer, sheet_name='Sheet1', index=False)
+            chunk.to_excel(writer, sheet_name='Sheet4', index=False)
+
+    return {'PDR_FILES_PATH': os.path.join(directory, 'PDR_Files', '**', '[!0-9]*.xlsx')}
+
+
+def write_opt_out_list(leads: pd.DataFrame, mailed: pd.DataFrame, directory: str) -> Dict[str, str]:
+    with_id = mailed.sample(frac=0.005, random_state=3)
+    without_id = leads.sample(frac=0.005, random_state=4)
+    opt_out = pd.concat([
+        pd.DataFrame({'Reference ID': with_id['formatted_reference_id'] + '-A', 'First Name': with_id['first_name'],
+                      'Last Name': with_id['last_name'], 'Address': with_id['address'], 'City': with_id['city'],
+                      'State': with_id['state']}),
+        pd.DataFrame({'Reference ID': np.nan, 'First Name': without_id['first_name'].str.title(),
+                      'Last Name': without_id['last_name'].str.title(), 'Address': without_id['address'],
+                      'City': without_id['city'].str.title(), 'State': without_id['state']}),
+    ])
+    path = os.path.join(make_directory(os.path.join(directory, 'Helper_Data')), 'Mail-OptOut Supression List.xlsx')
+    opt_out.to_excel(path, sheet_name='Mail-OptOut Supression List', index=False)
+    return {'PATH_OPT_OUT_LIST': path}
+
+
+def format_phones(phones: pd.Series) -> pd.Series:
+    text = phones.astype(str)
+    return '(' + text.str[:3] + ') ' + text.str[3:6] + '-' + text.str[6:]
+
+
+def write_sabino_exports(mailed: pd.DataFrame, directory: str, rng: np.random.Generator) -> Dict[str, str]:
+    folder = make_directory(os.path.join(directory, 'SabinoDB-DMIngestion'))
+
+    def status_rows(leads: pd.DataFrame, id_offset: int) -> pd.DataFrame:
+        # The reference id comes in three formats: plain, with dashes and as a PURL
+        formats = rng.integers(0, 3, len(leads))
+        reference_ids = np.where(formats == 0, leads['reference_id_text'],
+                                 np.where(formats == 1, leads['formatted_reference_id'] + '-A',
+                                          'www.pdoffer.com/' + leads['reference_id_text']))
+        return pd.DataFrame({
+            'Id': np.arange(id_offset, id_offset + len(leads)),
+            'Lead Source': rng.choice(LEAD_SOURCES, len(leads)),
+            'DM Reference ID': reference_ids,
+            'Status': rng.choice(STATUSES, len(leads)),
+            'Date Added': pd.to_datetime('2023-01-01') + pd.to_timedelta(rng.integers(0, 90 * 24 * 60, len(leads)),
+                                                                         unit='m'),
+        })
+
+    status = status_rows(mailed.sample(frac=0.3, random_state=5), 1)
+    status.to_csv(os.path.join(folder, 'SabinoDB-DMIngestion-Report.csv'), index=False)
+
+    with_phone_leads = mailed.sample(frac=0.2, random_state=6)
+    with_phone = status_rows(with_phone_leads, 10 ** 8)
+    phones = format_phones(with_phone_leads['phone']).values
+    missing = rng.random(len(with_phone))
+    with_phone['Home Phone'] = np.where(missing < 0.5, phones, None)
+    with_phone['Mobile Phone'] = np.where(missing >= 0.5, phones, None)
+    with_phone['Work Phone'] = None
+    with_phone.to_csv(os.path.join(folder, 'SabinoDB-DMIngestion-Report_20230308_091853e075.txt'), index=False)
+
+    phone_leads = mailed.sample(frac=0.3, random_state=7)
+    phone_numbers = format_phones(phone_leads['phone']).values
+    missing = rng.random(len(phone_leads))
+    pd.DataFrame({
+        'DM Reference ID': phone_leads['formatted_reference_id'].values + '-A',
+        'Home Phone': np.where(missing < 0.4, phone_numbers, None),
+        'Mobile Phone': np.where((missing >= 0.4) & (missing < 0.9), phone_numbers, None),
+        'Work Phone': np.where(missing >= 0.9, phone_numbers, None),
+    }).to_csv(os.path.join(folder, 'SabinoDB-DMIngestion-Report-PhoneNumber.csv'), index=False)
+
+    description = pd.DataFrame({'Status': STATUSES, 'Description': [f'{status} description' for status in STATUSES]})
+    description.to_csv(os.path.join(folder, 'Status Type - Description.xlsx - Sheet1.csv'), index=False)
+
+    return {
+        'PATH_STATUS': os.path.join(folder, 'SabinoDB-DMIngestion-Report.csv'),
+        'PATH_PHONE_20230308': os.path.join(folder, 'SabinoDB-DMIngestion-Report_20230308_091853e075.txt'),
+        'PATH_PHONE': os.path.join(folder, 'SabinoDB-DMIngestion-Report-PhoneNumber.csv'),
+        'PATH_STATUS_DESCRIPTION': os.path.join(folder, 'Status Type - Description.xlsx - Sheet1.csv'),
+    }
+
+
+def create_agent_sheet(calls: pd.DataFrame, rng: np.random.Generator) -> List[list]:
+    """
+    Description: Builds an agent sheet of a "Full Distribution Report": the agent performance table followed by the four
+    "Details - ..." tables, each one with its title row and its header row.
+    :param calls: The calls of the agent
+    :param rng: The random generator
+    :return: The rows of the sheet
+    """
+    rows = [['Agent Performance / Queue', 'Calls', 'Answered', 'Abandoned', None, None, None, None, None, None],
+            ['Sales_Inbound_Queue', len(calls), len(calls) // 2, len(calls) // 4, None, None, None, None, None, None],
+            [None] * 10]
+    sections = np.array_split(calls, 4)
+
+    rows.append(['Details - Queue Calls'] + [None] * 9)
+    rows.append(['#', 'Date', 'Queue', 'Trunk', 'Caller ID', 'Agent', 'Wait', 'Call Time', 'Exit Reason',
+                 'CRM Status'])
+    for i, call in enumerate(sections[0].itertuples(index=False), 1):
+        rows.append([i, call.date, 'Sales_Inbound_Queue', call.trunk, call.caller_id, 'Agent', '00:00:12',
+                     call.call_time, call.exit_reason, call.crm_status])
+
+    other_header = ['#', 'Date', 'Direction', 'Trunk', 'Source', 'Destination', 'Caller ID', 'Call Time',
+                    'Disposition', 'CRM Status']
+    for title, section, direction in [('Details - Inbound Calls', sections[1], 'Sales_Inbound'),
+                                      ('Details - Outbound Calls', sections[2], 'Sales_Outbound'),
+                                      ('Details - Internal Calls', sections[3], 'Internal')]:
+        rows.append([None] * 10)
+        rows.append([title] + [None] * 9)
+        rows.append(other_header)
+        for i, call in enumerate(section.itertuples(index=False), 1):
+            extension = int(rng.integers(100, 999))
+            if direction == 'Sales_Outbound':
+                source, destination = extension, call.caller_id
+            elif direction == 'Internal':
+                source, destination = extension, int(rng.integers(100, 999))
+            else:
+                source, destination = call.caller_id, extension
+            rows.append([i, call.date, direction, call.trunk, source, destination, 'Agent', call.call_time,
+                         call.exit_reason, call.crm_status])
+    return rows
+
+
+def create_calls(leads: pd.DataFrame, rng: np.random.Generator) -> pd.DataFrame:
+    callers = leads.sample(n=len(leads) * 2, replace=True, random_state=8)
+    caller_ids = callers['phone'].astype(object).values
+    # Some numbers come with the country code, some are hidden
+    country_code = rng.random(len(callers)) < 0.1
+    caller_ids[country_code] = (callers['phone'].values[country_code] + 10 ** 10)
+    caller_ids[rng.random(len(callers)) < 0.01] = 'Restricted'
+    return pd.DataFrame({
+        'date': (pd.to_datetime('2023-01-01') +
+                 pd.to_timedelta(rng.integers(0, 90 * 24 * 3600, len(callers)), unit='s')).strftime(
+            '%Y-%m-%d %H:%M:%S'),
+        'trunk': rng.choice(['PDR Trunk 1', 'PDR Trunk 2', None], len(callers)),
+        'caller_id': caller_ids,
+        'call_time': pd.to_timedelta(rng.integers(0, 1800, len(callers)), unit='s').astype(str).str[-8:],
+        'exit_reason': rng.choice(EXIT_REASONS, len(callers)),
+        'crm_status': rng.choice(STATUSES + [None, 'Hot, callback'], len(callers)),
+    })
+
+
+def write_call_center_reports(mailed: pd.DataFrame, directory: str, rng: np.random.Generator) -> Dict[str, str]:
+    folder = make_directory(os.path.join(directory, 'Call_Center'))
+    inbound_folder = make_directory(os.path.join(folder, 'Inbound_format_1'))
+
+    calls = create_calls(mailed.sample(frac=0.2, random_state=9), rng)
+    inbound_calls = calls.sample(frac=0.1, random_state=10)
+    calls = calls.drop(inbound_calls.index)
+
+    agent_sheets = np.array_split(calls, max(1, -(-len(calls) // MAX_ROWS_PER_AGENT_SHEET)))
+    sheets_per_report = 3
+    for report in range(0, len(agent_sheets), sheets_per_report):
+        path = os.path.join(folder, f'Report {2568404 + report} - Full Distribution Report.xlsx')
+        with pd.ExcelWriter(path) as writer:
+            pd.DataFrame({'Report': ['Full Distribution Report']}).to_excel(writer, sheet_name='Cover Sheet',
+                                                                           index=False)
+            pd.DataFrame({'Agent': ['Agent'], 'Calls': [len(calls)]}).to_excel(writer, sheet_name='Agent Performance',
+                                                                               index=False)
+            for number, sheet in enumerate(agent_sheets[report:report + sheets_per_report]):
+                rows = create_agent_sheet(sheet, rng)
+                pd.DataFrame(rows[1:], columns=rows[0]).to_excel(writer, sheet_name=f'Agent {report + number}',
+                                                                 index=False)
+
+    with pd.ExcelWriter(os.path.join(inbound_folder, 'Inbound Report 1.xlsx')) as writer:
+        pd.DataFrame({'Report': ['Inbound']}).to_excel(writer, sheet_name='Cover Sheet', index=False)
+        pd.DataFrame({'Queue': ['Sales_Inbound_Queue']}).to_excel(writer, sheet_name='Call Distribution',
+                                                                  index=False)
+        pd.DataFrame({'Hour': [9]}).to_excel(writer, sheet_name='Call Times', index=False)
+        for number, sheet in enumerate(np.array_split(inbound_calls, max(1, len(inbound_calls) // 50000))):
+            pd.DataFrame({'#': np.arange(1, len(sheet) + 1), 'Date': sheet['date'], 'Queue': 'Sales_Inbound_Queue',
+                          'Trunk': sheet['trunk'], 'Caller ID': sheet['caller_id'], 'Call Time': sheet['call_time'],
+                          'Exit Reason': sheet['exit_reason']}).to_excel(writer, sheet_name=f'Queue {number}',
+                                                                         index=False)
+
+    return {
+        'CALL_CENTER_PATH': os.path.join(folder, '*.xlsx'),
+        'CALL_CENTER_INBOUND_FORMAT_PATH': os.path.join(inbound_folder, '*.xlsx'),
+    }
+
+
+def write_purl_responders(mailed: pd.DataFrame, directory: str, rng: np.random.Generator) -> Dict[str, str]:
+    folder = make_directory(os.path.join(directory, 'PURL_Responders'))
+    responders = mailed.sample(frac=0.05, random_state=11)
+    completed = rng.random(len(responders)) < 0.6
+    pd.DataFrame({
+        'Reference ID': responders['formatted_reference_id'] + '-A', 'First': responders['first_name'].str.title(),
+        'Last': responders['last_name'].str.title(), 'Zip': responders['zip1'], 'Debt Amount': responders['debt'],
+        'f.First': np.where(completed, responders['first_name'], None),
+        'f.Last': np.where(completed, responders['last_name'], None),
+        'f.Email': np.where(completed, responders['last_name'].str.lower() + '@example.com', None),
+        'f.Phone': np.where(completed, responders['phone'], None),
+    }).to_csv(os.path.join(folder, 'purl_responders_1022_0123.csv'), index=False)
+    return {'PURL_RESPONDERS_1022_0123_PATH': os.path.join(folder, '*')}
+
+
+def write_third_party_datasets(leads: pd.DataFrame, directory: str, rng: np.random.Generator) -> Dict[str, str]:
+    folder = make_directory(os.path.join(directory, '3rd_Party_Datasets'))
+    zipcodes = leads['zip1'].drop_duplicates().reset_index(drop=True)
+    number_of_zipcodes = len(zipcodes)
+
+    # US Census Bureau: one row per zip code (the zip code is stored as a number)
+    us_census = pd.DataFrame({'Zipcode': zipcodes.astype(int)})
+    for feature in US_CENSUS_BUREAU_FEATURES:
+        us_census[feature] = rng.random(number_of_zipcodes).round(4) * 1000
+    us_census_path = os.path.join(make_directory(os.path.join(folder, 'US_Census_Bureau')),
+                                  'final_3rd_party_dataset.csv')
+    us_census.to_csv(us_census_path, index=False)
+
+    # Debt in America: one workbook per kind of debt, one row per county (GEOID)
+    debt_folder = make_directory(os.path.join(folder, 'Debt_in_America_June_2022'))
+    geoids = pd.Series(rng.choice(np.arange(1001, 56045), max(10, number_of_zipcodes // 10), replace=False))
+    paths = {}
+    for kind in ['auto', 'delinquency', 'medical', 'student']:
+        debt_df = pd.DataFrame({'GEOID': geoids.astype(str).str.zfill(5), 'NAME': 'County',
+                                'state_name': rng.choice(list(STATES.values()), len(geoids))})
+        for metric in ['share_with_debt', 'median_debt', 'share_of_white', 'share_of_color']:
+            values = (rng.random(len(geoids)) * 100).round(2).astype(object)
+            values[rng.random(len(geoids)) < 0.05] = 'n/a*'
+            debt_df[f'{kind}_{metric}'] = values
+        paths[kind] = os.path.join(debt_folder, f'county_dia_{kind}_ 7 Jun 2022.xlsx')
+        debt_df.to_excel(paths[kind], sheet_name='Sheet1', index=False)
+
+    relationship_path = os.path.join(debt_folder, 'zcta_county_rel_10.txt')
+    pd.DataFrame({'ZCTA5': zipcodes, 'STATE': '42',
+                  'GEOID': geoids.sample(n=number_of_zipcodes, replace=True, random_state=12).astype(str).str.zfill(5)
+                  .values}).to_csv(relationship_path, index=False)
+
+    # Zip codes database (census 2010, ACS 2017-2021, deluxe business and place fips)
+    census_folder = make_directory(os.path.join(folder, 'zip-codes-database-DELUXE-BUSINESS-csv'))
+    census_2010 = pd.DataFrame({'ZIPCode': zipcodes.astype(int)})
+    for i in range(20):
+        census_2010[f'Census2010_{i}'] = rng.integers(0, 10000, number_of_zipcodes)
+    census_2010.to_csv(os.path.join(census_folder, 'census-2010-zcta.csv'), index=False)
+
+    # The first line of the ACS file is a description line, the header is the second one. We read 524 columns of it.
+    acs = pd.DataFrame(rng.random((number_of_zipcodes, 530)).round(3),
+                       columns=[f'ACS_{i}' for i in range(530)])
+    acs.insert(0, 'ZIPCODE', zipcodes.astype(int))
+    acs_path = os.path.join(census_folder, 'census-acs-2017-2021-zcta.csv')
+    with open(acs_path, 'w') as f:
+        f.write('American Community Survey 2017-2021\n')
+        acs.to_csv(f, index=False)
+
+    deluxe = pd.DataFrame({'ZipCode': np.repeat(zipcodes.astype(int).values, 2),
+                           'City': 'CITY', 'Population': rng.integers(0, 50000, 2 * number_of_zipcodes),
+                           'HouseholdsPerZipCode': rng.integers(0, 20000, 2 * number_of_zipcodes),
+                           'IncomePerHousehold': rng.integers(20000, 200000, 2 * number_of_zipcodes)})
+    deluxe.to_csv(os.path.join(census_folder, 'zip-codes-database-DELUXE-BUSINESS.csv'), index=False)
+
+    place_fips = pd.DataFrame({'ZIPCODE': np.repeat(zipcodes.astype(int).values, 2), 'PLACE': 'PLACE',
+                               'PLACEFIPS': rng.integers(1000, 99999, 2 * number_of_zipcodes),
+                               'LANDAREA': rng.random(2 * number_of_zipcodes).round(3)})
+    place_fips.to_csv(os.path.join(census_folder, 'zip-codes-database-PLACE-FIPS.csv'), index=False)
+
+    return {
+        'PATH_TO_US_CENSUS_BUREAU_3RD_PARTY_DATA': us_census_path,
+        'PATH_DEBT_IN_AMERICA_JUNE_2022_AUTO': paths['auto'],
+        'PATH_DEBT_IN_AMERICA_JUNE_2022_DELINQUENCY': paths['delinquency'],
+        'PATH_DEBT_IN_AMERICA_JUNE_2022_MEDICAL': paths['medical'],
+        'PATH_DEBT_IN_AMERICA_JUNE_2022_STUDENT': paths['student'],
+        'PATH_TO_DF_MATCHING_ZIPCODES_TO_GEOIDS': relationship_path,
+        'PATH_TO_STORE_CENSUS_2010_DF': os.path.join(census_folder, 'census-2010-zcta.csv'),
+        'PATH_TO_STORE_CENSUS_2017_2021_DF': acs_path,
+        'PATH_TO_STORE_CENSUS_DELUXE_DF': os.path.join(census_folder, 'zip-codes-database-DELUXE-BUSINESS.csv'),
+        'PATH_TO_STORE_CENSUS_PLACE_FIPS_DF': os.path.join(census_folder, 'zip-codes-database-PLACE-FIPS.csv'),
+    }
+
+
+def write_federal_reserve_bank_philadelphia(directory: str, rng: np.random.Generator) -> Dict[str, str]:
+    folder = os.path.join(directory, '3rd_Party_Datasets', 'Federal_reserve_bank_philadelphia')
+    months = [(month, 2022) for month in range(1, 13)]
+
+    def series(key: str) -> list:
+        return [{'month': month, 'year': year, key: round(float(rng.random() * 100), 2)} for month, year in months]
+
+    def groups(names: List[str], key: str) -> dict:
+        return {name: series(key) for name in names}
+
+    credit_card = {'data': [{'state': state, 'total': series('dollars'),
+                             'neighborhood_income_groups': groups(['low', 'moderate', 'middle', 'upper'], 'dollars'),
+                             'age_groups': groups(['18-29', '30-39', '40-49', '50-59', '60+'], 'dollars'),
+                             'credit_score_groups': groups(['subprime', 'near_prime', 'prime'], 'dollars')}
+                            for state in STATES.values()]}
+    home_equity = {'data': [{'state': state, 'total': series('percentage')} for state in STATES.values()]}
+
+    for department, name, content in [('Credit Card', 'balance_per_consumer', credit_card),
+                                      ('Home Equity Line of Credit', 'origination_rate', home_equity)]:
+        department_folder = make_directory(os.path.join(folder, department))
+        with open(os.path.join(department_folder, f'{name}.json'), 'w') as f:
+            json.dump(content, f)
+
+    preprocessed = os.path.join(directory, '3rd_Party_Datasets', 'Store_Preprocessed_Philadelphia_bank_files')
+    return {
+        'PATH_FEDERAL_RESERVE_BANK_PHILADELPHIA': os.path.join(folder, '**', '*.json'),
+        'PATH_TO_STORE_PREPROCESSED_BANK_OF_PHILADELPHIA_FILES': preprocessed,
+        'PATH_TO_READ_ALL_PREPROCESSED_BANK_OF_PHILADELPHIA_FILES': os.path.join(preprocessed, '*.csv'),
+        'PATH_TO_STORE_BANK_OF_PHILADELPHIA_FINAL_FILE': os.path.join(folder, 'federal_reserve_bank_of_philadelphia.csv'),
+    }
+
+
+def generate_synthetic_sources(directory: str, number_of_leads: int, seed: int = 0) -> Dict[str, str]:
+    """
+    Description: Writes a fake version of every source file of the pipeline, with the same file formats, sheet names,
+    columns and quirks as the real ones, so that the pipeline can run (and be benchmarked) without client data.
+    :param directory: Where to write the files
+    :param number_of_leads: The size of the lead population, every other source is scaled from it
+    :param seed: The seed of the random generator, the same seed always produces the same files
+    :return: The environment variables (the same ones as in .env) that point the pipeline to the generated files
+    """
+    directory = os.path.abspath(make_directory(directory))
+    rng = np.random.default_rng(seed)
+    leads = create_leads(number_of_leads, rng)
+    mailed = leads.sample(frac=0.4, random_state=seed)
+
+    environment = {}
+    environment.update(write_prospect_lists(leads, directory, rng))
+    environment.update(write_pdr_files(mailed, directory, rng))
+    environment.update(write_opt_out_list(leads, mailed, directory))
+    environment.update(write_sabino_exports(mailed, directory, rng))
+    environment.update(write_call_center_reports(mailed, directory, rng))
+    environment.update(write_purl_responders(mailed, directory, rng))
+    environment.update(write_third_party_datasets(leads, directory, rng))
+    environment.update(write_federal_reserve_bank_philadelphia(directory, rng))
+
+    output = make_directory(os.path.join(directory, 'Output_datasets'))
+    helper = os.path.join(directory, 'Helper_Data')
+    environment.update({
+        'PATH_FINAL_CALL_CENTER': os.path.join(directory, 'Call_Center', 'concatenated_call_center_data.csv'),
+        'PATH_TO_LEADS_WITH_ID_THAT_NEED_TO_BE_EXCLUDED':
+            os.path.join(helper, 'leads_with_reference_id_that_needs_to_be_excluded_from_pdr_files.csv'),
+        'PATH_TO_LEADS_WITHOUT_ID_THAT_NEED_TO_BE_EXCLUDED':
+            os.path.join(helper, 'leads_without_reference_id_that_needs_to_be_excluded_from_umg_prospect_lists.csv'),
+        'PATH_PURL': os.path.join(directory, 'PURL_Responders', 'purl_responders_1022_0123.csv'),
+        'PATH_MISSING_CLIENTS': os.path.join(output, 'missing_clients.csv'),
+        'PATH_TO_STORE_DUPLICATES_TO_SCORE': os.path.join(output, 'duplicates_to_score.csv'),
+        'PATH_FINAL_DATASET': os.path.join(output, 'final_dataset.csv'),
+        'PATH_TO_STORE_PICKLE_FILES': os.path.join(output, 'Pickle_files'),
+        'EXCEL_CACHE_PATH': os.path.join(output, 'Excel_cache'),
+        'GENDER_LOOKUP_PATH': os.path.join(output, 'gender_lookup.json'),
+        'PROSPECT_BASE_PATH': os.path.join(output, 'Prospect_base'),
+        'STATUS_SNAPSHOT_PATH': os.path.join(output, 'Status_snapshot'),
+        'CALL_ACTIVITY_PATH': os.path.join(output, 'Call_activity'),
+        'CALL_ACTIVITY_EXIT_REASONS': ','.join(EXIT_REASONS),
+        'FEATURE_STORE_PATH': os.path.join(output, 'Feature_store'),
+        'PATH_TO_STORE_RUN_REPORT': os.path.join(output, 'run_report.json'),
+        'NUMBER_OF_FEATURES': '1',
+        'DEBUG_MODE': 'True',
+    })
+
+    with open(os.path.join(directory, 'synthetic.env'), 'w') as f:
+        for key, value in environment.items():
+            f.write(f'{key}={value}\n')
+    return environment
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate fake source files for the Pacific Debt pipeline')
+    parser.add_argument('--output', default='../Datasets/Synthetic', help='Where to write the files')
+    parser.add_argument('--leads', type=int, default=10000, help='The number of leads (e.g. 10000, 1000000)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    output_directory = os.path.join(args.output, f'{args.leads}_leads')
+    generate_synthetic_sources(output_directory, args.leads, args.seed)
+    print(f"Generated the sources of {args.leads} leads, the variables in "
+          f"{os.path.join(output_directory, 'synthetic.env')} point the pipeline to them")
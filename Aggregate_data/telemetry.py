@@ -0,0 +1,180 @@
+import json
+import os
+import resource
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+
+class StageTelemetry:
+    """
+    Measures a single stage of the pipeline: wall time, CPU time, peak RSS, tracemalloc peak, the rows and columns of
+    the dataframes it reads and writes, and the bytes it reads from and writes to files.
+    rf reports every dataframe that goes through its read/store functions to the active telemetry (current), the same
+    way it reports them to the active PipelineContext.
+    """
+    current = None
+
+    def __init__(self, name: str, trace_memory: bool = False):
+        self.name = name
+        self.trace_memory = trace_memory
+        self.metrics = {'stage': name, 'status': 'run', 'rows_in': 0, 'columns_in': 0, 'rows_out': 0,
+                        'columns_out': 0}
+
+    def __enter__(self):
+        StageTelemetry.current = self
+        reset_peak_rss()
+        self.io_start = read_process_io()
+        if self.trace_memory:
+            # tracemalloc slows the stage down several times (every allocation is traced), so it only runs when asked
+            # and only while we measure
+            self.started_tracemalloc = not tracemalloc.is_tracing()
+            if self.started_tracemalloc:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.metrics['wall_time_seconds'] = round(time.perf_counter() - self.wall_start, 3)
+        self.metrics['cpu_time_seconds'] = round(time.process_time() - self.cpu_start, 3)
+        self.metrics['peak_rss_mb'] = round(read_peak_rss_kb() / 1024, 1)
+
+        if self.trace_memory:
+            self.metrics['tracemalloc_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+            if self.started_tracemalloc:
+                tracemalloc.stop()
+
+        io_end = read_process_io()
+        if self.io_start and io_end:
+            self.metrics['bytes_read'] = io_end['rchar'] - self.io_start['rchar']
+            self.metrics['bytes_written'] = io_end['wchar'] - self.io_start['wchar']
+
+        if exc_type is not None:
+            self.metrics['status'] = 'failed'
+        StageTelemetry.current = None
+
+    def record_input(self, df):
+        if isinstance(df, pd.DataFrame):
+            self.metrics['rows_in'] += df.shape[0]
+            self.metrics['columns_in'] += df.shape[1]
+
+    def record_output(self, df):
+        if isinstance(df, pd.DataFrame):
+            self.metrics['rows_out'] += df.shape[0]
+            self.metrics['columns_out'] += df.shape[1]
+
+
+def record_input(df):
+    if StageTelemetry.current is not None:
+        StageTelemetry.current.record_input(df)
+
+
+def record_output(df):
+    if StageTelemetry.current is not None:
+        StageTelemetry.current.record_output(df)
+
+
+def read_process_io() -> Optional[Dict[str, int]]:
+    """
+    Description: Reads the bytes the process has read and written so far. rchar/wchar count every read/write call, so
+    they include the files that pandas opens directly and not only the ones that go through rf.
+    :return: A dictionary with the counters, or None if the platform does not provide them (only Linux does)
+    """
+    try:
+        with open('/proc/self/io', 'r') as f:
+            return {key: int(value) for key, value in (line.split(': ') for line in f.read().splitlines())}
+    except (OSError, ValueError):
+        return None
+
+
+def reset_peak_rss():
+    # On Linux writing 5 to clear_refs resets the peak RSS of the process, so that we can measure it per stage
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def read_peak_rss_kb() -> int:
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    # Elsewhere we can only take the peak of the whole process so far
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def skipped_stage_metrics(name: str) -> dict:
+    return {'stage': name, 'status': 'skipped'}
+
+
+def compare_run_reports(current: dict, previous: dict) -> List[dict]:
+    """
+    Description: Compares the stages of two runs, so that we can see which stage became slower or heavier
+    :param current: The report of this run
+    :param previous: The report of the run we compare against
+    :return: One entry for every stage that ran in both runs, with the difference of each measurement
+    """
+    previous_stages = {stage['stage']: stage for stage in previous.get('stages', []) if stage['status'] == 'run'}
+    measurements = ['wall_time_seconds', 'cpu_time_seconds', 'peak_rss_mb', 'tracemalloc_peak_mb', 'rows_out',
+                    'bytes_read', 'bytes_written']
+
+    comparison = []
+    for stage in current['stages']:
+        before = previous_stages.get(stage['stage'])
+        if stage['status'] != 'run' or before is None:
+            continue
+        entry = {'stage': stage['stage']}
+        for measurement in measurements:
+            if measurement in stage and measurement in before:
+                entry[f'{measurement}_change'] = round(stage[measurement] - before[measurement], 3)
+                if before[measurement]:
+                    entry[f'{measurement}_change_percent'] = round(
+                        100 * (stage[measurement] - before[measurement]) / before[measurement], 1)
+        comparison.append(entry)
+    return comparison
+
+
+def read_run_report(path: str) -> Optional[dict]:
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def write_run_report(path: str, stages: List[dict], started_at: datetime, previous: Optional[dict] = None) -> dict:
+    """
+    Description: Writes the measurements of every stage of the run in a json file
+    :param path: Where to store the report
+    :param stages: The measurements of each stage, in the order the stages finished
+    :param started_at: When the run started
+    :param previous: The report of a previous run to compare with, if any
+    :return: The report
+    """
+    finished_at = datetime.now()
+    report = {
+        'started_at': started_at.isoformat(timespec='seconds'),
+        'finished_at': finished_at.isoformat(timespec='seconds'),
+        # The stages may overlap when they run in parallel, so the duration of the run is not the sum of the stages
+        'wall_time_seconds': round((finished_at - started_at).total_seconds(), 3),
+        'stages': stages,
+    }
+    if previous is not None:
+        report['previous_run_started_at'] = previous.get('started_at')
+        report['comparison'] = compare_run_reports(report, previous)
+
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# The modules of Aggregate_data import each other by their flat names, and the config by Aggregate_data.config
+AGGREGATE_DATA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, AGGREGATE_DATA)
+sys.path.insert(0, os.path.dirname(AGGREGATE_DATA))
+
+# Config reads the .env of the repository root
+os.chdir(os.path.dirname(AGGREGATE_DATA))
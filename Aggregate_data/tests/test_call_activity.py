@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+import call_activity as ca
+
+EXIT_REASONS = ['Answered', 'Abandoned', 'Voicemail', 'Timeout', 'Transferred']
+
+
+def calls_with_exit_reasons(exit_reasons: list) -> pd.DataFrame:
+    rows = len(exit_reasons)
+    return pd.DataFrame({'Date': [f'2023-01-{day + 1:02d}' for day in range(rows)],
+                         'Queue': ['Sales_Inbound_Queue'] * rows, 'Trunk': ['Main'] * rows,
+                         'Caller ID': [f'55500000{day % 3:02d}' for day in range(rows)],
+                         'Call Time': ['00:01:30'] * rows,
+                         'Exit Reason': pd.Categorical(exit_reasons), 'CRM Status': [''] * rows})
+
+
+def test_exit_reason_columns_do_not_depend_on_the_reports():
+    seen = ca.aggregate_call_activity(calls_with_exit_reasons(['Answered', 'Hangup', np.nan]), EXIT_REASONS)
+    other = ca.aggregate_call_activity(calls_with_exit_reasons(['Timeout', 'Timeout', 'Voicemail']), EXIT_REASONS)
+    expected = [ca.exit_reason_column(reason) for reason in EXIT_REASONS + [ca.OTHER_EXIT_REASON]]
+    assert list(seen.columns[-len(expected):]) == expected
+    assert list(other.columns) == list(seen.columns)
+    # Hangup is not configured and a missing reason is not counted
+    assert seen['Exit_Other'].sum() == 1 and seen['Exit_Answered'].sum() == 1
+
+
+def test_folding_new_calls_matches_a_full_aggregation(tmp_path):
+    calls = calls_with_exit_reasons(['Answered', 'Hangup', 'Timeout', 'Answered', 'Abandoned', 'Busy'])
+    ca.CallActivity(str(tmp_path), EXIT_REASONS).update(calls.iloc[:3])
+    folded = ca.CallActivity(str(tmp_path), EXIT_REASONS).update(calls)
+    pd.testing.assert_frame_equal(folded.reset_index(drop=True),
+                                  ca.aggregate_call_activity(calls, EXIT_REASONS).reset_index(drop=True))
+
+
+def test_repeated_calls_are_folded_as_often_as_they_appear(tmp_path):
+    calls = calls_with_exit_reasons(['Answered'])
+    ca.CallActivity(str(tmp_path), EXIT_REASONS).update(calls)
+    repeated = pd.concat([calls, calls], ignore_index=True)
+    folded = ca.CallActivity(str(tmp_path), EXIT_REASONS).update(repeated)
+    assert folded['Total_calls'].tolist() == [2]
+    pd.testing.assert_frame_equal(folded.reset_index(drop=True),
+                                  ca.aggregate_call_activity(repeated, EXIT_REASONS).reset_index(drop=True))
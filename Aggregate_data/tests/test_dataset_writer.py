@@ -0,0 +1,27 @@
+import os
+
+import pandas as pd
+
+import dataset_writer as dw
+
+LEADS = pd.DataFrame({'input_feature_pd_customer_state': ['CA', 'TX', 'CA'], 'Debt': [1000, 2000, 3000]})
+
+
+def test_a_single_file_has_the_extension_of_its_format(tmp_path):
+    path = str(tmp_path / 'final_dataset.csv')
+    manifest = dw.write_dataset(LEADS, path, file_format='parquet')
+    assert manifest['files'][0]['path'] == 'final_dataset.parquet'
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / 'final_dataset.parquet'), LEADS)
+    assert dw.dataset_exists(path, file_format='parquet') and not dw.dataset_exists(path)
+
+
+def test_writing_a_layout_removes_the_others(tmp_path):
+    path = str(tmp_path / 'final_dataset.csv')
+    dw.write_dataset(LEADS, path)
+    dw.write_dataset(LEADS, path, 'input_feature_pd_customer_state', 'parquet')
+    assert sorted(os.listdir(tmp_path)) == ['final_dataset']
+    assert dw.dataset_exists(path, 'input_feature_pd_customer_state', 'parquet') and not dw.dataset_exists(path)
+
+    dw.write_dataset(LEADS, path, file_format='csv.gz')
+    assert sorted(os.listdir(tmp_path)) == ['final_dataset.csv.gz', 'final_dataset.csv.gz.manifest.json']
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / 'final_dataset.csv.gz'), LEADS)
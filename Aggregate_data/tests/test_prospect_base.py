@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+import composite_keys as ck
+import prospect_base as pb
+import unify_and_clear_prospect_datasets as ucp
+
+
+def fullname_file(rows: list, filename: str) -> pd.DataFrame:
+    raw = pd.DataFrame(rows, columns=['First Name', 'Middle Initial', 'Surname', 'Gen Code', 'Street', 'City',
+                                      'State Abbreviation', 'Zip Code', 'EHV', 'UTL'])
+    return ucp.clean_fullname_datasets(raw, filename)
+
+
+def to_be_scored_file(rows: list, filename: str) -> pd.DataFrame:
+    raw = pd.DataFrame(rows, columns=['FNAME', 'MI', 'LNAME', 'SUFFIX', 'ADDRESS', 'CITY', 'STATE', 'ZIP', 'ZIP4',
+                                      'EST DEBT'])
+    return ucp.clean_prospect_datasets(raw, f'/data/To Be Scored/{filename}.csv', filename)
+
+
+FULLNAME_FILES = [
+    fullname_file([['Ann', 'B', 'Lee', '', '1 Main St', 'Austin', 'TX', '787011234', 12000, 0.4],
+                   ['Bob', '', 'Ray', '', '2 Oak St', 'Dallas', 'TX', '752010000', 8000, 0.2]],
+                  'PATH_PROSPECTS_FULLNAME_CHA_010123'),
+    fullname_file([['Ann', 'B', 'Lee', '', '1 Main St', 'Austin', 'TX', '787011234', 12000, 0.4],
+                   ['Cid', '', 'Moe', '', '3 Elm St', 'Miami', 'FL', '331010001', 5000, 0.7]],
+                  'PATH_PROSPECTS_FULLNAME_CHA_020123'),
+    fullname_file([['Dee', '', 'Fox', '', '4 Pine St', 'Tampa', 'FL', '336010002', 9000, 0.1],
+                   ['Bob', '', 'Ray', '', '2 Oak St', 'Dallas', 'TX', '752010000', 8000, 0.2]],
+                  'PATH_PROSPECTS_FULLNAME_CHA_030123'),
+]
+
+TO_BE_SCORED_FILES = [
+    to_be_scored_file([['Cid', '', 'Moe', '', '3 Elm St', 'Miami', 'FL', '33101', '0001', 5000],
+                       ['Eve', '', 'Kim', '', '5 Ash St', 'Ocala', 'FL', '34470', '0003', 7000]],
+                      'PATH_PROSPECTS_PD_TO_BE_SCORED_040123'),
+]
+
+
+def merge_one_at_a_time(files: list) -> pd.DataFrame:
+    base, counts, duplicates_to_score = None, pb.empty_counts(), None
+    for new_df in files:
+        base, counts, duplicates_to_score = pb.merge_prospects(base, counts, duplicates_to_score, new_df,
+                                                               ucp.PROSPECT_KEY_COLUMNS)
+    return base.drop(columns=[pb.KEY_COLUMN]).reset_index(drop=True)
+
+
+def full_dedup(files: list) -> pd.DataFrame:
+    df = pd.concat(files)
+    keys = ck.composite_key(df, ucp.PROSPECT_KEY_COLUMNS)
+    return ucp.drop_all_new_leads_that_already_exist_to_our_df(df, keys).reset_index(drop=True)
+
+
+def test_fullname_files_have_the_new_lead_column():
+    assert all(df['New_lead'].isna().all() for df in FULLNAME_FILES)
+
+
+@pytest.mark.parametrize('files', [FULLNAME_FILES, FULLNAME_FILES + TO_BE_SCORED_FILES],
+                         ids=['fullname_only', 'fullname_then_to_be_scored'])
+def test_merging_one_file_at_a_time_matches_the_full_dedup(files):
+    expected = full_dedup(files)
+    merged = merge_one_at_a_time(files)
+    pd.testing.assert_frame_equal(merged[expected.columns], expected, check_dtype=False)
@@ -1,9 +1,13 @@
 import re, os, glob
-import pandas as pd
 import numpy as np
+import pandas as pd
+import composite_keys as ck
+import prospect_base as pb
 from dotenv import load_dotenv
+from typing import List
 import reusable_functions as rf
-import gender_guesser.detector as gender
+import dataset_writer as dw
+import gender_inference as gi
 from Aggregate_data.config.config_utils import ConfigUtils
 
 
@@ -35,62 +39,34 @@ def reshape_prospects_df_into_pdr(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def map_gender(g: str) -> str:
-    if g == 'mostly_female':
-        return 'female'
-    elif g == 'mostly_male':
-        return 'male'
-    else:
-        return g
-
-
-def create_gender_column(df: pd.DataFrame) -> pd.DataFrame:
-    # The difference between andy and unknown is that the former is found to have the same probability to be male than
-    # to be female, while the later means that the name wasn’t found in the database.
-    # create a gender detector object
-    detector = gender.Detector(case_sensitive=False)
-    detector._THRESHOLD_RATIO = 0.9
-    # apply the get_gender function to the 'First name' column and store the result in a new 'gender' column
-    # It needs this check --> isinstance because we take a float somewhere in First Name column
-    df.loc[:, 'gender'] = df['FNAME'].apply(
-        lambda x: map_gender(detector.get_gender(x)) if isinstance(x, str) else np.nan)
-    return df.copy()
-
+# The columns that identify a prospect across the purchased lists
+PROSPECT_KEY_COLUMNS = ['FNAME', 'LNAME', 'EST DEBT', 'CITY', 'Zip_1', 'Zip_2']
 
-def drop_all_new_leads_that_already_exist_to_our_df(df: pd.DataFrame) -> pd.DataFrame:
-    # Identify duplicates based on the columns 'FNAME', 'LNAME', 'EST DEBT', 'CITY', 'Zip_1', 'Zip_2'
-    duplicates = df.duplicated(subset=['FNAME', 'LNAME', 'EST DEBT', 'CITY', 'Zip_1', 'Zip_2'], keep=False)
 
-    # Keep the rows that are not duplicates or those that have value == 'to_be_Scored' for duplicates.
-    umg_prospects_df = df[~duplicates | (df['New_lead'] == 'to_be_Scored')]
-
-    # Create a copy of the dataframe and drop duplicates based on 'FNAME', 'LNAME', 'EST DEBT', 'CITY', 'Zip_1', 'Zip_2'
-    umg_prospects_df_copy = umg_prospects_df.drop_duplicates(
-        subset=['FNAME', 'LNAME', 'EST DEBT', 'CITY', 'Zip_1', 'Zip_2'], keep='first')
-
-    # Drop rows with '' in the 'New_lead' column, keeping the ones with an empty string ''
-    umg_prospects_df_copy = umg_prospects_df_copy.loc[
-        ~umg_prospects_df_copy[['FNAME', 'LNAME', 'EST DEBT', 'CITY', 'Zip_1', 'Zip_2']].duplicated(keep=False) | (
-                umg_prospects_df_copy['New_lead'] == 'to_be_Scored')]
-
-    return umg_prospects_df_copy
+def drop_all_new_leads_that_already_exist_to_our_df(df: pd.DataFrame, keys: np.ndarray) -> pd.DataFrame:
+    """
+    Description: Keeps the rows whose prospect appears only once, and the 'to_be_Scored' rows of the prospects that
+    appear more than once. A prospect that is still duplicated after that keeps its first row.
+    :param df: The concatenated prospects
+    :param keys: The composite key of PROSPECT_KEY_COLUMNS of every row (see ck.composite_key)
+    :return: The prospects with a single row each
+    """
+    # We use a positional mask, since the concatenated dataframe repeats the index of every file
+    return df[pb.select_prospects(keys, pb.is_to_be_scored(df))]
 
 
-def keep_record_of_new_leads_that_already_exist_to_previous_datasets(df: pd.DataFrame):
+def keep_record_of_new_leads_that_already_exist_to_previous_datasets(df: pd.DataFrame, keys: np.ndarray):
     """
-    The duplicated() method is used to identify the rows that are duplicates based on the specified columns
-    ('FNAME', 'LNAME', 'EST DEBT', 'CITY', 'Zip_1', 'Zip_2'). keep=False means that all duplicates are marked as True,
-    and the first occurrence of each duplicate is marked as False. The resulting boolean series is then combined
-    with another condition using the & operator to filter only the rows where the value in the 'New_lead' column is
-    equal to 'to_be_Scored'.
+    Description: Stores the 'to_be_Scored' rows of the prospects that appear more than once, i.e. the leads we were
+    asked to score that already exist in our datasets
+    :param df: The concatenated prospects
+    :param keys: The composite key of PROSPECT_KEY_COLUMNS of every row (see ck.composite_key)
     """
-    # filter the rows
-    duplicates_to_score = df.duplicated(subset=['FNAME', 'LNAME', 'EST DEBT', 'CITY', 'Zip_1', 'Zip_2'],
-                                        keep=False) & (df['New_lead'] == 'to_be_Scored')
+    duplicates_to_score = (ck.key_counts(keys) > 1) & pb.is_to_be_scored(df)
 
     # save the filtered DataFrame to a CSV file
     duplicates_to_score_df = df[duplicates_to_score]
-    duplicates_to_score_df.to_csv('../Datasets/Output_datasets/duplicates_to_score.csv', index=False)
+    dw.write_csv(duplicates_to_score_df, ConfigUtils.conf.path_to_store_duplicates_to_score)
 
 
 def create_column_new_lead(df: pd.DataFrame, file_path: str) -> pd.DataFrame:
@@ -156,55 +132,66 @@ def clean_fullname_datasets(new_df: pd.DataFrame, filename: str) -> pd.DataFrame
                                     'State Abbreviation': 'STATE', 'Zip Code': 'ZIP', 'EHV': 'EST DEBT'})
     new_df = split_zip_code_into_2_columns(new_df)
 
+    # The fullname lists are never to be scored. New_lead is NaN, as it is when they are concatenated with the other
+    # files, so the base has the same columns whether it is built at once or merged file by file.
+    new_df['New_lead'] = np.nan
+
     # Add the date the lead was purchased to the DataFrame
     new_df = create_column_date_purchased_new_lead(new_df, filename)
 
     return new_df
 
 
-def format_umg_datasets():
-    """"
-    The files we received follow 2 different formats (different column names and some minor differences in
-    column's content). For this reason we need to handle them differently, before we concatenate them to a unified df
+def list_prospect_files() -> List[pb.ProspectFile]:
+    """
+    Description: The files we received follow 2 different formats (different column names and some minor differences
+    in column's content). For this reason we need to handle them differently, before we concatenate them to a unified df
+    :return: The kind ('fullname', 'to_be_scored' or 'prospect') and the path of every prospect file, in the order
+    they are concatenated
     """
-    load_dotenv()
-
     fullname_prospect_files = glob.glob(ConfigUtils.conf.prospect_fullname_path, recursive=True)
     to_be_scored_files = glob.glob(ConfigUtils.conf.prospects_to_be_scored_path)
     prospect_files = glob.glob(ConfigUtils.conf.prospect_path, recursive=True)
     # remove the files that match the fullname pattern
-    prospect_files = list(set(prospect_files) - set(fullname_prospect_files) - set(to_be_scored_files))
+    prospect_files = sorted(set(prospect_files) - set(fullname_prospect_files) - set(to_be_scored_files))
+
+    return [('fullname', path) for path in fullname_prospect_files] + \
+        [('to_be_scored', path) for path in to_be_scored_files] + [('prospect', path) for path in prospect_files]
+
 
-    umg_prospects = []
-    for file_path in fullname_prospect_files:
+def read_prospect_file(kind: str, file_path: str) -> pd.DataFrame:
+    if kind == 'fullname':
         key = 'PATH_PROSPECTS_FULLNAME_' + file_path.split('/')[-1].split('.')[0].upper()
-        fullname_prospect_df = rf.read_csv_file(file_path)
-        cleaned_fullname_prospect_df = clean_fullname_datasets(fullname_prospect_df, key)
-        umg_prospects.append(cleaned_fullname_prospect_df)
+        return clean_fullname_datasets(rf.read_csv_file(file_path), key)
 
-    for file_path in to_be_scored_files:
-        key = 'PATH_PROSPECTS_PD_' + file_path.split('/')[-1].split('.')[0].upper()
-        prospect_df = rf.read_csv_file(file_path)
-        to_be_scored__prospects_df = clean_prospect_datasets(prospect_df, file_path, key)
-        umg_prospects.append(to_be_scored__prospects_df)
+    key = 'PATH_PROSPECTS_PD_' + file_path.split('/')[-1].split('.')[0].upper()
+    return clean_prospect_datasets(rf.read_csv_file(file_path), file_path, key)
 
-    for file_path in prospect_files:
-        key = 'PATH_PROSPECTS_PD_' + file_path.split('/')[-1].split('.')[0].upper()
-        prospect_df = rf.read_csv_file(file_path)
-        cleaned_prospect_df = clean_prospect_datasets(prospect_df, file_path, key)
-        umg_prospects.append(cleaned_prospect_df)
 
-    # concatenate all datasets in a unified dataframe
-    umg_prospects_df = pd.concat(umg_prospects)
+def format_umg_datasets():
+    load_dotenv()
+    prospect_files = list_prospect_files()
+
+    if ConfigUtils.conf.prospect_incremental:
+        # Only the files that arrived since the last run are read, and merged into the stored base (PROSPECT_BASE_PATH)
+        umg_prospects_df, duplicates_to_score_df = pb.ProspectBase(
+            ConfigUtils.conf.prospect_base_path, PROSPECT_KEY_COLUMNS).update(prospect_files, read_prospect_file)
+        dw.write_csv(duplicates_to_score_df, ConfigUtils.conf.path_to_store_duplicates_to_score)
+    else:
+        # concatenate all datasets in a unified dataframe
+        umg_prospects_df = pd.concat([read_prospect_file(kind, path) for kind, path in prospect_files])
+
+        # The duplicates are found on a single integer key, computed once for both steps
+        keys = ck.composite_key(umg_prospects_df, PROSPECT_KEY_COLUMNS)
 
-    # Keeps in a csv format all leads that needs to be scored and already exist to our datasets
-    keep_record_of_new_leads_that_already_exist_to_previous_datasets(umg_prospects_df)
+        # Keeps in a csv format all leads that needs to be scored and already exist to our datasets
+        keep_record_of_new_leads_that_already_exist_to_previous_datasets(umg_prospects_df, keys)
 
-    # keeps only unique rows. If we have a duplicate we keep drop the row where (umg_prospects_df['New_lead'] == ''
-    # and we keep the row that has umg_prospects_df['New_lead'] == 'to_be_Scored'
-    umg_prospects_df = drop_all_new_leads_that_already_exist_to_our_df(umg_prospects_df)
+        # keeps only unique rows. If we have a duplicate we keep drop the row where (umg_prospects_df['New_lead'] == ''
+        # and we keep the row that has umg_prospects_df['New_lead'] == 'to_be_Scored'
+        umg_prospects_df = drop_all_new_leads_that_already_exist_to_our_df(umg_prospects_df, keys)
 
-    final_umg_prospects_df = create_gender_column(umg_prospects_df)
+    final_umg_prospects_df = gi.create_gender_column(umg_prospects_df, 'FNAME')
     final_umg_prospects_df = final_umg_prospects_df.drop(['MI', 'SUFFIX'], axis=1)
     initial_prospects_df = reshape_prospects_df_into_pdr(final_umg_prospects_df)
     rf.store_df_in_pickle_format(ConfigUtils.conf, initial_prospects_df=initial_prospects_df)
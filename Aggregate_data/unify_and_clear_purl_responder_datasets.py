@@ -1,7 +1,7 @@
 import glob, os
 import pandas as pd
-import numpy as np
-import gender_guesser.detector as gender
+import gender_inference as gi
+import composite_keys as ck
 import reusable_functions as rf
 from Aggregate_data.config.config_utils import ConfigUtils
 from logger import Logger
@@ -23,28 +23,6 @@ def check_completed(row: pd.DataFrame) -> str:
         return 'Yes'
 
 
-def map_gender(g: str) -> str:
-    if g == 'mostly_female':
-        return 'female'
-    elif g == 'mostly_male':
-        return 'male'
-    else:
-        return g
-
-
-def create_gender_column(df: pd.DataFrame) -> pd.DataFrame:
-    # The difference between andy and unknown is that the former is found to have the same probability to be male than
-    # to be female, while the later means that the name wasn’t found in the database.
-    # create a gender detector object
-    detector = gender.Detector(case_sensitive=False)
-    detector._THRESHOLD_RATIO = 0.9
-    # apply the get_gender function to the 'First name' column and store the result in a new 'gender' column
-    # It needs this check --> isinstance because we take a float somewhere in First Name column
-    df.loc[:, 'gender'] = df['First'].apply(
-        lambda x: map_gender(detector.get_gender(x)) if isinstance(x, str) else np.nan)
-    return df.copy()
-
-
 def format_purl_responders(logger: Logger):
     umg_prospects = []
 
@@ -53,7 +31,7 @@ def format_purl_responders(logger: Logger):
         if extension == '.csv':
             fullname_prospect_df = pd.read_csv(path)
         elif extension == '.xlsx':
-            fullname_prospect_df = pd.read_excel(path)
+            fullname_prospect_df = rf.read_excel_files(path, 0)
         else:
             raise ValueError(f"Unsupported file type: {path}")
 
@@ -62,8 +40,8 @@ def format_purl_responders(logger: Logger):
     # concatenate all datasets in a unified dataframe
     purl_responders_df = pd.concat(umg_prospects)
 
-    purl_responders_df.drop_duplicates(subset=['Reference ID', 'Zip', 'Debt Amount'], keep='first', inplace=True)
-    final_purl_responders_df = create_gender_column(purl_responders_df)
+    purl_responders_df = ck.drop_duplicate_keys(purl_responders_df, ['Reference ID', 'Zip', 'Debt Amount'])
+    final_purl_responders_df = gi.create_gender_column(purl_responders_df, 'First')
 
     # Contains all leads that fully completed the form
     final_purl_responders_df['purl_fully_completed'] = final_purl_responders_df.apply(check_completed, axis=1)
@@ -1,33 +1,30 @@
 import pandas as pd
 import numpy as np
-import uuid
+import composite_keys as ck
 import reusable_functions as rf
+import normalization as nz
 from logger import Logger
-from typing import Set
 from Aggregate_data.config.__init__ import Config
 from Aggregate_data.config.config_utils import ConfigUtils
 
 
-def generate_unique_id(existing_ids: Set[int]) -> int:
-    new_id = np.random.randint(1000000000, 9999999999, 1)[0]
-    while new_id in existing_ids:
-        new_id = np.random.randint(1000000000, 9999999999, 1)[0]
-    return new_id
+# The columns that identify a lead. A prospect to be scored can have the same name, zip and debt as a lead of the PDR
+# files, so New_lead is part of the identity as well.
+ENTITY_COLUMNS = ['First Name', 'Last Name', 'Address', 'City', 'State', 'Zip', 'Debt Amount', 'DM Reference ID',
+                  'New_lead']
 
 
-def give_prospects_a_unique_id_new(df: pd.DataFrame) -> pd.DataFrame:
-    existing_ids = set(df['DM Reference ID'].values)
-    empty_cells = df['DM Reference ID'] == ''
-    for i, cell in enumerate(df.loc[empty_cells, 'DM Reference ID']):
-        new_value = generate_unique_id(existing_ids)
-        df.loc[empty_cells, 'DM Reference ID'].iloc[i] = new_value
-        existing_ids.add(new_value)
-    return df
-
-
-def remove_non_digits(s) -> str:
-    # Define function to remove non-digit characters from string
-    return ''.join(filter(str.isdigit, str(s)))
+def create_entity_keys(df: pd.DataFrame) -> np.ndarray:
+    """
+    Description: The key of every lead (the UUID column), derived from its identity instead of a random uuid4, so a
+    lead keeps its key from run to run and the stages can cache and join on it. The texts are compared stripped and in
+    upper case and the debt as a number.
+    :param df: The unified prospects and PDR leads
+    :return: An int64 key for every lead
+    """
+    normalized = pd.DataFrame({column: df[column].astype(np.float64) if pd.api.types.is_numeric_dtype(df[column])
+                               else nz.upper_case_text(df[column]) for column in ENTITY_COLUMNS})
+    return ck.stable_unique_keys(normalized, ENTITY_COLUMNS)
 
 
 def handle_inconsistent_zipcodes(df: pd.DataFrame) -> pd.DataFrame:
@@ -38,7 +35,7 @@ def handle_inconsistent_zipcodes(df: pd.DataFrame) -> pd.DataFrame:
     :param df: The initial dataframe
     :return: The dataframe with the right form of Zipcode column
     """
-    df['Zip'] = df['Zip'].apply(remove_non_digits)
+    df['Zip'] = nz.digits_only(df['Zip'])
     return df
 
 
@@ -59,7 +56,7 @@ def helper_concatenation_function(conf: Config, logger: Logger):
     # this will ensure that rows with missing DM Reference ID values are considered duplicates
     # and will be removed when removing duplicates
     fixed_zipcode['DM Reference ID'].replace('', np.nan, inplace=True)
-    print('phase 1', fixed_zipcode.New_lead.value_counts())
+    logger.info(f"New_lead values before dropping duplicates: {fixed_zipcode.New_lead.value_counts().to_dict()}")
 
     # create a new dataframe that contains only the rows with 'to_be_Scored' in the 'New_lead' column
     to_be_scored_df = fixed_zipcode[fixed_zipcode['New_lead'] == 'to_be_Scored']
@@ -71,30 +68,27 @@ def helper_concatenation_function(conf: Config, logger: Logger):
     # keeping the first occurrence after sorting by 'DM Reference ID'
     # this will remove duplicate rows and keep the first occurrence of each unique row
     # after sorting by 'DM Reference ID'
-    other_df.drop_duplicates(subset=['First Name', 'Last Name', 'Zip', 'Debt Amount'], keep='first', inplace=True)
+    other_df = ck.drop_duplicate_keys(other_df, ['First Name', 'Last Name', 'Zip', 'Debt Amount'])
 
     # merge the two dataframes
     fixed_zipcode = pd.concat([other_df, to_be_scored_df])
 
-    print('phase 2', fixed_zipcode.New_lead.value_counts())
+    logger.info(f"New_lead values after dropping duplicates: {fixed_zipcode.New_lead.value_counts().to_dict()}")
 
     # replace NaN values in 'DM Reference ID' column with empty strings
     # this will ensure that the final dataframe has empty strings instead of NaN values
     # for the DM Reference ID column
     fixed_zipcode['DM Reference ID'].replace(np.nan, '', inplace=True)
 
-    # We need to use this function to secure that all of our clients has an uuid
-    # give_uuid_to_all_clients = give_prospects_a_unique_id_new(fixed_zipcode)
-
-    # Create a new column named 'UUID' with a unique identifier for each row
-    fixed_zipcode['UUID'] = [uuid.uuid4() for _ in range(len(fixed_zipcode))]
+    fixed_zipcode['UUID'] = create_entity_keys(fixed_zipcode)
 
-    # Create new dataframe with only the 'Name' and 'UUID' columns
-    uuid_reference_id = fixed_zipcode[['UUID', 'DM Reference ID']]
-    # from new dataframe keep only the rows that have a value in DM Reference ID
-    uuid_reference_id = uuid_reference_id[uuid_reference_id['DM Reference ID'].str.isdigit()]
+    # lead_reference_lookup maps the key of every lead (UUID, int64) to its 'DM Reference ID' (10 digits, as a string).
+    # It has one row per lead that has a reference id, and since the keys are stable, a lookup stored by an earlier run
+    # still matches the leads of this one. The status, phone and purl stages join on it.
+    lead_reference_lookup = fixed_zipcode[['UUID', 'DM Reference ID']]
+    lead_reference_lookup = lead_reference_lookup[lead_reference_lookup['DM Reference ID'].str.isdigit()]
 
     # drop 'DM Reference ID' column
     df_without_reference_id = fixed_zipcode.drop(['DM Reference ID'], axis=1)
     rf.store_df_in_pickle_format(ConfigUtils.conf, prospects_pdr_files=df_without_reference_id,
-                                 lead_reference_lookup=uuid_reference_id)
+                                 lead_reference_lookup=lead_reference_lookup)